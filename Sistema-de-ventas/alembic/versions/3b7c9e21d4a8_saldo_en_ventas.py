@@ -0,0 +1,34 @@
+"""saldo en ventas"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c9e21d4a8'
+down_revision = 'f14454f200fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ventas', sa.Column('total_pagado', sa.Numeric(10, 2), server_default='0', nullable=False))
+    op.add_column('ventas', sa.Column('saldo_pendiente', sa.Numeric(10, 2), server_default='0', nullable=False))
+
+    # Cargar los valores iniciales desde los pagos existentes
+    op.execute(
+        """
+        UPDATE ventas
+        SET total_pagado = COALESCE(
+                (SELECT SUM(p.monto) FROM pagos p WHERE p.id_venta = ventas.id_venta), 0
+            ),
+            saldo_pendiente = total - COALESCE(
+                (SELECT SUM(p.monto) FROM pagos p WHERE p.id_venta = ventas.id_venta), 0
+            )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('ventas', 'saldo_pendiente')
+    op.drop_column('ventas', 'total_pagado')
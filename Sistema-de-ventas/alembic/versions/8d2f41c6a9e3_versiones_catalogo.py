@@ -0,0 +1,25 @@
+"""versiones catalogo"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f41c6a9e3'
+down_revision = '3b7c9e21d4a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versiones = op.create_table(
+        'versiones_catalogo',
+        sa.Column('nombre', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('nombre'),
+    )
+    op.bulk_insert(versiones, [{'nombre': 'productos', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('versiones_catalogo')
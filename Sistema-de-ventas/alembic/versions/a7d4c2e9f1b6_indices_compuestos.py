@@ -0,0 +1,36 @@
+"""indices compuestos"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4c2e9f1b6'
+down_revision = 'e3f8a1c4b7d2'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas): claves foráneas y columnas de filtro/orden de
+# saldos, resúmenes y reportes. Los compuestos empiezan por la clave foránea,
+# así que también sirven para los JOIN y filtros sólo por ella.
+INDICES = (
+    ('ix_ventas_cliente_fecha', 'ventas', ['id_cliente', 'fecha_venta']),
+    ('ix_ventas_fecha_venta', 'ventas', ['fecha_venta']),
+    # Cubre SUM(monto) GROUP BY id_venta sin leer las filas de pagos
+    ('ix_pagos_venta_monto', 'pagos', ['id_venta', 'monto']),
+    ('ix_detalles_venta_id_venta', 'detalles_venta', ['id_venta']),
+    ('ix_detalles_venta_id_producto', 'detalles_venta', ['id_producto']),
+    ('ix_clientes_nombre', 'clientes', ['nombre']),
+    # El modelo declara email único, pero la tabla original no tiene la
+    # restricción; el índice no es único para no fallar con duplicados existentes
+    ('ix_clientes_email', 'clientes', ['email']),
+)
+
+
+def upgrade():
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas)
+
+
+def downgrade():
+    for nombre, tabla, columnas in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
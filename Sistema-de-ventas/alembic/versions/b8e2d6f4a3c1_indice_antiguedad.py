@@ -0,0 +1,23 @@
+"""indice antiguedad de saldos"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2d6f4a3c1'
+down_revision = 'a7d4c2e9f1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cubre el reporte de antigüedad: recorre las ventas a crédito ya en orden
+    # de cliente (GROUP BY sin ordenar) y sin leer las filas de ventas
+    op.create_index(
+        'ix_ventas_credito_saldo', 'ventas',
+        ['tipo_venta', 'id_cliente', 'saldo_pendiente', 'fecha_venta', 'estado'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_ventas_credito_saldo', table_name='ventas')
@@ -0,0 +1,27 @@
+"""marcas modificacion"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a1e7f3b902'
+down_revision = '8d2f41c6a9e3'
+branch_labels = None
+depends_on = None
+
+MARCA = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def upgrade():
+    for tabla in ('ventas', 'pagos'):
+        op.add_column(tabla, sa.Column('actualizado_en', MARCA, nullable=True))
+        op.execute(f"UPDATE {tabla} SET actualizado_en = CURRENT_TIMESTAMP")
+        op.create_index(f'ix_{tabla}_actualizado_en', tabla, ['actualizado_en'])
+
+
+def downgrade():
+    for tabla in ('pagos', 'ventas'):
+        op.drop_index(f'ix_{tabla}_actualizado_en', table_name=tabla)
+        op.drop_column(tabla, 'actualizado_en')
@@ -0,0 +1,20 @@
+"""indice pagos por fecha"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f1a9c3e7b2'
+down_revision = 'b8e2d6f4a3c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Búsqueda de pagos por rango de fecha_pago; con método y monto el índice
+    # cubre los totales por método y por período sin leer las filas
+    op.create_index('ix_pagos_fecha_metodo_monto', 'pagos', ['fecha_pago', 'metodo_pago', 'monto'])
+
+
+def downgrade():
+    op.drop_index('ix_pagos_fecha_metodo_monto', table_name='pagos')
@@ -0,0 +1,38 @@
+"""ventas diarias"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f8a1c4b7d2'
+down_revision = 'c5a1e7f3b902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ventas_diarias',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('tipo_venta', sa.Enum('contado', 'credito', name='tipo_venta_enum'), nullable=False),
+        sa.Column('estado', sa.Enum('pendiente', 'pagada', 'cancelada', name='estado_enum'), nullable=False),
+        sa.Column('cantidad', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total', sa.Float(), server_default='0', nullable=False),
+        sa.Column('total_pagado', sa.Float(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('dia', 'tipo_venta', 'estado'),
+    )
+
+    # Carga inicial desde las ventas existentes
+    op.execute("""
+        INSERT INTO ventas_diarias (dia, tipo_venta, estado, cantidad, total, total_pagado)
+        SELECT DATE(fecha_venta), tipo_venta, COALESCE(estado, 'pendiente'),
+               COUNT(*), SUM(total), SUM(total_pagado)
+        FROM ventas
+        WHERE fecha_venta IS NOT NULL
+        GROUP BY DATE(fecha_venta), tipo_venta, COALESCE(estado, 'pendiente')
+    """)
+
+
+def downgrade():
+    op.drop_table('ventas_diarias')
@@ -0,0 +1,22 @@
+"""version datos reportes"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7b3d9e5a2c4'
+down_revision = 'd5f1a9c3e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Versión de ventas, pagos y clientes para el sello de la caché de
+    # reportes: la incrementa cada escritura en lugar de contar filas
+    versiones = sa.table('versiones_catalogo', sa.column('nombre', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(versiones, [{'nombre': 'ventas', 'version': 0}])
+
+
+def downgrade():
+    op.execute("DELETE FROM versiones_catalogo WHERE nombre = 'ventas'")
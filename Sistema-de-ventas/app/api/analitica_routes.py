@@ -0,0 +1,101 @@
+# app/api/analitica_routes.py
+from typing import List, Literal, Optional
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.metricas import RutaMedida
+from app.db.session import SessionLocal
+from app.schemas.analitica import (
+    EstadoAnalitica, PagosPorMetodo, VentasPorCliente, VentasPorPeriodo, VentasPorProducto,
+)
+from app.schemas.venta import EstadoVenta, TipoVenta
+from app.services import analitica_service, columnar_service
+
+# Ninguna ruta consulta la base transaccional: todas leen la instantánea
+router = APIRouter(route_class=RutaMedida)
+
+def _instantanea():
+    instantanea = columnar_service.obtener()
+    if instantanea is None:
+        raise HTTPException(
+            status_code=503,
+            detail="La instantánea de analítica se está construyendo",
+            headers={"Retry-After": "30"},
+        )
+    return instantanea
+
+def _valor(enum) -> Optional[str]:
+    return enum.value if enum is not None else None
+
+@router.get("/ventas-por-producto", response_model=List[VentasPorProducto])
+def get_ventas_por_producto(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[TipoVenta] = None,
+    estado: Optional[EstadoVenta] = None,
+    orden: Literal["monto", "cantidad"] = "monto",
+    limit: Optional[int] = Query(100, ge=1),
+):
+    """
+    Productos más vendidos por monto o por unidades
+    """
+    return analitica_service.ventas_por_producto(
+        _instantanea(), fecha_inicio, fecha_fin, _valor(tipo_venta), _valor(estado), orden, limit
+    )
+
+@router.get("/ventas-por-cliente", response_model=List[VentasPorCliente])
+def get_ventas_por_cliente(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[TipoVenta] = None,
+    estado: Optional[EstadoVenta] = None,
+    orden: Literal["total", "cantidad", "saldo"] = "total",
+    limit: Optional[int] = Query(100, ge=1),
+):
+    """
+    Clientes con más compras, ventas o saldo pendiente
+    """
+    return analitica_service.ventas_por_cliente(
+        _instantanea(), fecha_inicio, fecha_fin, _valor(tipo_venta), _valor(estado), orden, limit
+    )
+
+@router.get("/ventas-por-periodo", response_model=List[VentasPorPeriodo])
+def get_ventas_por_periodo(
+    periodo: Literal["dia", "semana", "mes"] = "dia",
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[TipoVenta] = None,
+    estado: Optional[EstadoVenta] = None,
+):
+    """
+    Ventas por día, semana o mes, con el desglose contado/crédito
+    """
+    return analitica_service.ventas_por_periodo(
+        _instantanea(), periodo, fecha_inicio, fecha_fin, _valor(tipo_venta), _valor(estado)
+    )
+
+@router.get("/pagos-por-metodo", response_model=List[PagosPorMetodo])
+def get_pagos_por_metodo(fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """
+    Pagos recibidos por método de pago
+    """
+    return analitica_service.pagos_por_metodo(_instantanea(), fecha_inicio, fecha_fin)
+
+@router.get("/estado", response_model=EstadoAnalitica)
+def get_estado_analitica():
+    """
+    Filas, marcas de agua y antigüedad de la instantánea publicada
+    """
+    return columnar_service.estadisticas()
+
+@router.post("/refrescar", response_model=EstadoAnalitica)
+def refrescar_analitica(completo: bool = False):
+    """
+    Refresca la instantánea ahora (completo=true la reconstruye desde cero)
+
+    Es la única ruta que lee la base transaccional.
+    """
+    with SessionLocal() as db:
+        if not columnar_service.refrescar(db, completo):
+            raise HTTPException(status_code=409, detail="Ya hay un refresco en curso")
+    return columnar_service.estadisticas()
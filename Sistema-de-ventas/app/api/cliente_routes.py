@@ -1,26 +1,40 @@
 # app/api/cliente_routes.py
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_read_db
 from app.db.session import get_db
-from app.crud import cliente_crud
+from app.crud import cliente_crud, venta_crud
 from app.schemas.cliente import Cliente, ClienteCreate, ClienteUpdate
 from app.schemas.resumen import ResumenCliente
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 @router.get("/", response_model=List[Cliente])
 def read_clientes(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     nombre: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: Session = Depends(get_read_db)
 ):
-    if nombre:
-        clientes = cliente_crud.search_clientes(db, nombre=nombre)
-    else:
-        clientes = cliente_crud.get_clientes(db, skip=skip, limit=limit)
+    try:
+        if nombre:
+            clientes = cliente_crud.search_clientes(
+                db, nombre=nombre, skip=skip, limit=limit, cursor=cursor
+            )
+        else:
+            clientes = cliente_crud.get_clientes(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = cliente_crud.count_clientes(db, nombre=nombre) if incluir_total else None
+    escribir_encabezados(response, clientes, cliente_crud.ORDEN_CLIENTES, limit, total)
     return clientes
 
 @router.post("/", response_model=Cliente)
@@ -30,9 +44,20 @@ def create_cliente(cliente: ClienteCreate, db: Session = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/buscar", response_model=List[Cliente])
+def buscar_clientes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    sin_acentos: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Autocompletado por nombre, email o teléfono, ordenado por relevancia
+    """
+    return cliente_crud.buscar_clientes(db, q, limit=limit, sin_acentos=sin_acentos)
 
 @router.get("/{cliente_id}", response_model=Cliente)
-def read_cliente(cliente_id: int, db: Session = Depends(get_db)):
+def read_cliente(cliente_id: int, db: Session = Depends(get_read_db)):
     db_cliente = cliente_crud.get_cliente(db, cliente_id=cliente_id)
     if db_cliente is None:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
@@ -53,8 +78,8 @@ def delete_cliente(cliente_id: int, db: Session = Depends(get_db)):
     return {"message": "Cliente eliminado correctamente"}
 
 @router.get("/{cliente_id}/resumen", response_model=ResumenCliente)
-def get_resumen_cliente(cliente_id: int, db: Session = Depends(get_db)):
-    resumen = cliente_crud.get_resumen_cliente(db, cliente_id=cliente_id)
+def get_resumen_cliente(cliente_id: int, db: Session = Depends(get_read_db)):
+    resumen = venta_crud.get_resumen_cliente(db, cliente_id=cliente_id)
     if resumen is None:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     return resumen
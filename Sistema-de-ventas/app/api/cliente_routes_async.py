@@ -0,0 +1,86 @@
+# app/api/cliente_routes_async.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_async_read_db
+from app.db.session import get_async_db
+from app.crud import cliente_crud, cliente_crud_async, venta_crud_async
+from app.schemas.cliente import Cliente, ClienteCreate, ClienteUpdate
+from app.schemas.resumen import ResumenCliente
+
+router = APIRouter(route_class=RutaMedida)
+
+@router.get("/", response_model=List[Cliente])
+async def read_clientes(
+    response: Response,
+    skip: int = 0, 
+    limit: int = 100, 
+    nombre: Optional[str] = None,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        if nombre:
+            clientes = await cliente_crud_async.search_clientes(
+                db, nombre=nombre, skip=skip, limit=limit, cursor=cursor
+            )
+        else:
+            clientes = await cliente_crud_async.get_clientes(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = await cliente_crud_async.count_clientes(db, nombre=nombre) if incluir_total else None
+    escribir_encabezados(response, clientes, cliente_crud.ORDEN_CLIENTES, limit, total)
+    return clientes
+
+@router.post("/", response_model=Cliente)
+async def create_cliente(cliente: ClienteCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        return await cliente_crud_async.create_cliente(db=db, cliente=cliente)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/buscar", response_model=List[Cliente])
+async def buscar_clientes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    sin_acentos: bool = True,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Autocompletado por nombre, email o teléfono, ordenado por relevancia
+    """
+    return await cliente_crud_async.buscar_clientes(db, q, limit=limit, sin_acentos=sin_acentos)
+
+@router.get("/{cliente_id}", response_model=Cliente)
+async def read_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    db_cliente = await cliente_crud_async.get_cliente(db, cliente_id=cliente_id)
+    if db_cliente is None:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    return db_cliente
+
+@router.put("/{cliente_id}", response_model=Cliente)
+async def update_cliente(cliente_id: int, cliente: ClienteUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_cliente = await cliente_crud_async.update_cliente(db, cliente_id=cliente_id, cliente=cliente)
+    if db_cliente is None:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    return db_cliente
+
+@router.delete("/{cliente_id}")
+async def delete_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await cliente_crud_async.delete_cliente(db, cliente_id=cliente_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    return {"message": "Cliente eliminado correctamente"}
+
+@router.get("/{cliente_id}/resumen", response_model=ResumenCliente)
+async def get_resumen_cliente(cliente_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    resumen = await venta_crud_async.get_resumen_cliente(db, cliente_id=cliente_id)
+    if resumen is None:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+    return resumen
+
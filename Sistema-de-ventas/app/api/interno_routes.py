@@ -0,0 +1,31 @@
+# app/api/interno_routes.py
+from fastapi import APIRouter
+
+from app.core.metricas import RutaMedida
+from app.core.metricas_pool import estado_pool
+from app.db import replica, session
+from app.services import cache_reportes_service
+
+router = APIRouter(route_class=RutaMedida)
+
+@router.get("/pool")
+def get_estado_pool():
+    """
+    Estado del pool de conexiones: en uso, overflow, histograma de espera y fallos
+    """
+    estado = {"sync": estado_pool(session.engine.pool)}
+    if session.async_engine is not None:
+        estado["async"] = estado_pool(session.async_engine.sync_engine.pool)
+    if session.replica_engine is not None:
+        estado["replica"] = estado_pool(session.replica_engine.pool)
+        estado["replica"]["lecturas"] = replica.estado_replica()
+    if session.async_replica_engine is not None:
+        estado["replica_async"] = estado_pool(session.async_replica_engine.sync_engine.pool)
+    return estado
+
+@router.get("/cache-reportes")
+def get_estado_cache_reportes():
+    """
+    Aciertos, fallos, guardados y desalojos de la caché de reportes (por proceso)
+    """
+    return cache_reportes_service.estadisticas()
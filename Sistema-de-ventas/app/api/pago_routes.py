@@ -1,33 +1,117 @@
 # app/api/pago_routes.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
+from app.core.json_rapido import RespuestaJSON
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_read_db
 from app.db.session import get_db
 from app.crud import pago_crud
-from app.schemas.pago import Pago, PagoCreate, PagoUpdate
+from app.core.config import settings
+from app.schemas.pago import Pago, PagoCreate, PagoUpdate, PagoBulkResultado, PagoTotales
+from app.services.importacion_service import leer_pagos_csv
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
+
+def filtros_pagos(
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    metodo_pago: Optional[str] = None,
+    monto_minimo: Optional[float] = None,
+    monto_maximo: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Filtros de búsqueda comunes al listado y a los totales de pagos
+    """
+    return {
+        "cliente_id": cliente_id,
+        "nombre": nombre,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "metodo_pago": metodo_pago,
+        "monto_minimo": monto_minimo,
+        "monto_maximo": monto_maximo,
+    }
 
 @router.get("/", response_model=List[Pago])
 def read_pagos(
     skip: int = 0, 
     limit: int = 100, 
     venta_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    descendente: bool = False,
+    incluir_total: bool = False,
+    filtros: Dict[str, Any] = Depends(filtros_pagos),
+    db: Session = Depends(get_read_db)
+):
+    # Proyección plana serializada directamente: el response_model sólo documenta
+    try:
+        pagos = pago_crud.get_pagos_planos(
+            db, venta_id=venta_id, skip=skip, limit=limit, cursor=cursor,
+            filtros=filtros, descendente=descendente
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = pago_crud.count_pagos(db, venta_id=venta_id, filtros=filtros) if incluir_total else None
+    respuesta = RespuestaJSON(pagos)
+    escribir_encabezados(respuesta, pagos, pago_crud.ORDEN_PAGOS, limit, total)
+    return respuesta
+
+@router.get("/totales", response_model=PagoTotales)
+def read_totales_pagos(
+    venta_id: Optional[int] = None,
+    periodo: Literal["dia", "mes"] = "mes",
+    filtros: Dict[str, Any] = Depends(filtros_pagos),
+    db: Session = Depends(get_read_db)
 ):
-    if venta_id:
-        pagos = pago_crud.get_pagos_venta(db, venta_id=venta_id)
-    else:
-        pagos = pago_crud.get_pagos(db, skip=skip, limit=limit)
-    return pagos
+    """
+    Cantidad y monto de los pagos que cumplen los filtros: en total, por
+    método de pago y por día o mes
+    """
+    return pago_crud.get_totales(db, venta_id=venta_id, filtros=filtros, periodo=periodo)
 
 @router.post("/", response_model=Pago)
 def create_pago(pago: PagoCreate, db: Session = Depends(get_db)):
-    return pago_crud.create_pago(db=db, pago=pago)
+    db_pago = pago_crud.create_pago(db=db, pago=pago)
+    if db_pago is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return db_pago
+
+def validar_tamano_bulk(cantidad: int) -> None:
+    """
+    413 si la importación trae más de PAGOS_BULK_MAXIMO pagos
+    """
+    if cantidad > settings.PAGOS_BULK_MAXIMO:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Se aceptan hasta {settings.PAGOS_BULK_MAXIMO} pagos por petición"
+        )
+
+@router.post("/bulk", response_model=PagoBulkResultado)
+def create_pagos_bulk(pagos: List[PagoCreate], db: Session = Depends(get_db)):
+    validar_tamano_bulk(len(pagos))
+    return pago_crud.create_pagos_bulk(db, pagos)
+
+@router.post("/bulk/csv", response_model=PagoBulkResultado)
+def importar_pagos_csv(archivo: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Importa un archivo de conciliación (columnas id_venta, monto, metodo_pago, observaciones)
+    """
+    try:
+        pagos, errores = leer_pagos_csv(archivo.file.read())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    validar_tamano_bulk(len(pagos))
+    return pago_crud.create_pagos_bulk(db, pagos, errores)
 
 @router.get("/{pago_id}", response_model=Pago)
-def read_pago(pago_id: int, db: Session = Depends(get_db)):
+def read_pago(pago_id: int, db: Session = Depends(get_read_db)):
     db_pago = pago_crud.get_pago(db, pago_id=pago_id)
     if db_pago is None:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
@@ -0,0 +1,99 @@
+# app/api/pago_routes_async.py
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pago_routes import filtros_pagos, validar_tamano_bulk
+from app.core.json_rapido import RespuestaJSON
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_async_read_db
+from app.db.session import get_async_db
+from app.crud import pago_crud, pago_crud_async
+from app.schemas.pago import Pago, PagoCreate, PagoUpdate, PagoBulkResultado, PagoTotales
+from app.services.importacion_service import leer_pagos_csv
+
+router = APIRouter(route_class=RutaMedida)
+
+@router.get("/", response_model=List[Pago])
+async def read_pagos(
+    skip: int = 0, 
+    limit: int = 100, 
+    venta_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descendente: bool = False,
+    incluir_total: bool = False,
+    filtros: Dict[str, Any] = Depends(filtros_pagos),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    # Proyección plana serializada directamente: el response_model sólo documenta
+    try:
+        pagos = await pago_crud_async.get_pagos_planos(
+            db, venta_id=venta_id, skip=skip, limit=limit, cursor=cursor,
+            filtros=filtros, descendente=descendente
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = await pago_crud_async.count_pagos(db, venta_id=venta_id, filtros=filtros) if incluir_total else None
+    respuesta = RespuestaJSON(pagos)
+    escribir_encabezados(respuesta, pagos, pago_crud.ORDEN_PAGOS, limit, total)
+    return respuesta
+
+@router.get("/totales", response_model=PagoTotales)
+async def read_totales_pagos(
+    venta_id: Optional[int] = None,
+    periodo: Literal["dia", "mes"] = "mes",
+    filtros: Dict[str, Any] = Depends(filtros_pagos),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Cantidad y monto de los pagos que cumplen los filtros: en total, por
+    método de pago y por día o mes
+    """
+    return await pago_crud_async.get_totales(db, venta_id=venta_id, filtros=filtros, periodo=periodo)
+
+@router.post("/", response_model=Pago)
+async def create_pago(pago: PagoCreate, db: AsyncSession = Depends(get_async_db)):
+    db_pago = await pago_crud_async.create_pago(db=db, pago=pago)
+    if db_pago is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return db_pago
+
+@router.post("/bulk", response_model=PagoBulkResultado)
+async def create_pagos_bulk(pagos: List[PagoCreate], db: AsyncSession = Depends(get_async_db)):
+    validar_tamano_bulk(len(pagos))
+    return await db.run_sync(pago_crud.create_pagos_bulk, pagos)
+
+@router.post("/bulk/csv", response_model=PagoBulkResultado)
+async def importar_pagos_csv(
+    archivo: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        pagos, errores = leer_pagos_csv(await archivo.read())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    validar_tamano_bulk(len(pagos))
+    return await db.run_sync(pago_crud.create_pagos_bulk, pagos, errores)
+
+@router.get("/{pago_id}", response_model=Pago)
+async def read_pago(pago_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    db_pago = await pago_crud_async.get_pago(db, pago_id=pago_id)
+    if db_pago is None:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+    return db_pago
+
+@router.put("/{pago_id}", response_model=Pago)
+async def update_pago(pago_id: int, pago: PagoUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_pago = await pago_crud_async.update_pago(db, pago_id=pago_id, pago=pago)
+    if db_pago is None:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+    return db_pago
+
+@router.delete("/{pago_id}")
+async def delete_pago(pago_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await pago_crud_async.delete_pago(db, pago_id=pago_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+    return {"message": "Pago eliminado correctamente"}
\ No newline at end of file
@@ -1,38 +1,116 @@
 # app/api/producto_routes.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
+from app.core.cache_http import coincide_if_none_match, escribir_etag, etag_fuerte, no_modificado
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
 from app.db.session import get_db
 from app.crud import producto_crud
 from app.schemas.producto import Producto, ProductoCreate, ProductoUpdate
+from app.services import catalogo_service
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
+
+def listar_catalogo(
+    response: Response,
+    snapshot: catalogo_service.Snapshot,
+    parametros: Tuple[Any, ...],
+) -> List[Producto]:
+    """
+    Página del catálogo en memoria con sus encabezados de paginación y ETag
+
+    Args:
+        parametros: (skip, limit, activo, cursor, incluir_total), los mismos
+            con los que se calculó el ETag comparado contra If-None-Match
+    """
+    skip, limit, activo, cursor, incluir_total = parametros
+    try:
+        productos = catalogo_service.listar(snapshot, skip, limit, activo, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = catalogo_service.contar(snapshot, activo) if incluir_total else None
+    escribir_encabezados(response, productos, producto_crud.ORDEN_PRODUCTOS, limit, total)
+    escribir_etag(response, etag_fuerte(snapshot.version, *parametros))
+    return productos
+
+def producto_del_catalogo(
+    response: Response, snapshot: catalogo_service.Snapshot, producto_id: int
+) -> Producto:
+    """
+    Producto del catálogo en memoria con su ETag, o 404
+    """
+    db_producto = snapshot.por_id.get(producto_id)
+    if db_producto is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    escribir_etag(response, etag_fuerte(snapshot.version, producto_id))
+    return db_producto
 
 @router.get("/", response_model=List[Producto])
 def read_productos(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     activo: Optional[bool] = None,
     nombre: Optional[str] = None,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
     db: Session = Depends(get_db)
 ):
     if nombre:
-        productos = producto_crud.search_productos(db, nombre=nombre)
-    else:
-        productos = producto_crud.get_productos(db, skip=skip, limit=limit, activo=activo)
-    return productos
+        try:
+            productos = producto_crud.search_productos(
+                db, nombre=nombre, skip=skip, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total = producto_crud.count_productos(db, nombre=nombre) if incluir_total else None
+        escribir_encabezados(response, productos, producto_crud.ORDEN_PRODUCTOS, limit, total)
+        return productos
+
+    # Sin búsqueda se responde desde el catálogo en memoria; el ETag depende
+    # sólo de la versión y los parámetros, así que el 304 no consulta la base
+    parametros = (skip, limit, activo, cursor, incluir_total)
+    etag = etag_fuerte(catalogo_service.version_actual(db), *parametros)
+    if coincide_if_none_match(request, etag):
+        return no_modificado(etag)
+
+    return listar_catalogo(response, catalogo_service.obtener_snapshot(db), parametros)
 
 @router.post("/", response_model=Producto)
 def create_producto(producto: ProductoCreate, db: Session = Depends(get_db)):
     return producto_crud.create_producto(db=db, producto=producto)
 
+@router.get("/buscar", response_model=List[Producto])
+def buscar_productos(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    sin_acentos: bool = True,
+    activo: Optional[bool] = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Autocompletado por nombre o descripción, ordenado por relevancia
+    """
+    return producto_crud.buscar_productos(
+        db, q, limit=limit, sin_acentos=sin_acentos, activo=activo
+    )
+
 @router.get("/{producto_id}", response_model=Producto)
-def read_producto(producto_id: int, db: Session = Depends(get_db)):
-    db_producto = producto_crud.get_producto(db, producto_id=producto_id)
-    if db_producto is None:
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
-    return db_producto
+def read_producto(
+    producto_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    etag = etag_fuerte(catalogo_service.version_actual(db), producto_id)
+    if coincide_if_none_match(request, etag):
+        return no_modificado(etag)
+
+    return producto_del_catalogo(response, catalogo_service.obtener_snapshot(db), producto_id)
 
 @router.put("/{producto_id}", response_model=Producto)
 def update_producto(producto_id: int, producto: ProductoUpdate, db: Session = Depends(get_db)):
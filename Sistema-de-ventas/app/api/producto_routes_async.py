@@ -0,0 +1,93 @@
+# app/api/producto_routes_async.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.producto_routes import listar_catalogo, producto_del_catalogo
+from app.core.cache_http import coincide_if_none_match, etag_fuerte, no_modificado
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.session import get_async_db
+from app.crud import producto_crud, producto_crud_async
+from app.schemas.producto import Producto, ProductoCreate, ProductoUpdate
+from app.services import catalogo_service
+
+router = APIRouter(route_class=RutaMedida)
+
+@router.get("/", response_model=List[Producto])
+async def read_productos(
+    request: Request,
+    response: Response,
+    skip: int = 0, 
+    limit: int = 100, 
+    activo: Optional[bool] = None,
+    nombre: Optional[str] = None,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if nombre:
+        try:
+            productos = await producto_crud_async.search_productos(
+                db, nombre=nombre, skip=skip, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total = await producto_crud_async.count_productos(db, nombre=nombre) if incluir_total else None
+        escribir_encabezados(response, productos, producto_crud.ORDEN_PRODUCTOS, limit, total)
+        return productos
+
+    # Sin búsqueda se responde desde el catálogo en memoria; el ETag depende
+    # sólo de la versión y los parámetros, así que el 304 no consulta la base
+    parametros = (skip, limit, activo, cursor, incluir_total)
+    etag = etag_fuerte(await db.run_sync(catalogo_service.version_actual), *parametros)
+    if coincide_if_none_match(request, etag):
+        return no_modificado(etag)
+
+    return listar_catalogo(response, await db.run_sync(catalogo_service.obtener_snapshot), parametros)
+
+@router.post("/", response_model=Producto)
+async def create_producto(producto: ProductoCreate, db: AsyncSession = Depends(get_async_db)):
+    return await producto_crud_async.create_producto(db=db, producto=producto)
+
+@router.get("/buscar", response_model=List[Producto])
+async def buscar_productos(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    sin_acentos: bool = True,
+    activo: Optional[bool] = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Autocompletado por nombre o descripción, ordenado por relevancia
+    """
+    return await producto_crud_async.buscar_productos(
+        db, q, limit=limit, sin_acentos=sin_acentos, activo=activo
+    )
+
+@router.get("/{producto_id}", response_model=Producto)
+async def read_producto(
+    producto_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    etag = etag_fuerte(await db.run_sync(catalogo_service.version_actual), producto_id)
+    if coincide_if_none_match(request, etag):
+        return no_modificado(etag)
+
+    return producto_del_catalogo(response, await db.run_sync(catalogo_service.obtener_snapshot), producto_id)
+
+@router.put("/{producto_id}", response_model=Producto)
+async def update_producto(producto_id: int, producto: ProductoUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_producto = await producto_crud_async.update_producto(db, producto_id=producto_id, producto=producto)
+    if db_producto is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return db_producto
+
+@router.delete("/{producto_id}")
+async def delete_producto(producto_id: int, db: AsyncSession = Depends(get_async_db)):
+    result = await producto_crud_async.delete_producto(db, producto_id=producto_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return {"message": "Producto desactivado correctamente"}
\ No newline at end of file
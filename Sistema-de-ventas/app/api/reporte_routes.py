@@ -1,72 +1,355 @@
 # app/api/reporte_routes.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 
-from app.db.session import get_db
-from app.services.reporte_service import generar_reporte_cliente, generar_reporte_ventas
+from app.core.cache_http import coincide_if_none_match, no_modificado
+from app.core.config import settings
+from app.core.json_rapido import RespuestaJSON
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados, siguiente_cursor
+from app.db.replica import escribio_hace_poco, get_read_db, sesion_lectura
+from app.crud import antiguedad_crud, resumen_diario_crud, saldo_crud
+from app.schemas.reporte import (
+    AntiguedadClienteOut,
+    ReporteSaldosOut,
+    ResumenDiarioOut,
+    TrabajoReporteCreate,
+    TrabajoReporteOut,
+)
+from app.services import cache_reportes_service, trabajos_reportes_service
+from app.services.reporte_service import (
+    generar_reporte_antiguedad,
+    generar_reporte_cliente,
+    generar_reporte_ventas,
+)
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
+
+def _en_sesion_propia(
+    request: Request, generar: Callable[[Session], Tuple[Iterator[bytes], str]]
+) -> Tuple[Iterator[bytes], str]:
+    """
+    Genera el reporte con una sesión de lectura que se cierra al terminar de enviarlo
+
+    El contenido se consume después de que la ruta responde, cuando la sesión
+    de get_read_db ya puede estar cerrada (FastAPI < 0.118 cierra las
+    dependencias con yield antes de enviar el cuerpo).
+    """
+    db = sesion_lectura(escribio_hace_poco(request))
+    try:
+        contenido, content_type = generar(db)
+    except BaseException:
+        db.close()
+        raise
+
+    def enviar() -> Iterator[bytes]:
+        try:
+            yield from contenido
+        finally:
+            db.close()
+
+    return enviar(), content_type
+
+def _responder_reporte(
+    request: Request,
+    db: Session,
+    tipo: str,
+    filtros: Dict[str, Any],
+    formato: str,
+    filename: str,
+    generar: Callable[[Session], Tuple[Iterator[bytes], str]],
+):
+    """
+    Sirve el reporte desde la caché de artefactos o lo genera y lo guarda
+
+    Un acierto cuesta la consulta del sello de datos y la lectura del archivo.
+    Un fallo envía el reporte mientras se genera y lo copia a la caché a la
+    vez, así que esa respuesta no lleva ETag ni Content-Length. generar
+    recibe la sesión con la que debe leer las filas.
+    """
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if not settings.REPORTES_CACHE:
+        contenido, content_type = _en_sesion_propia(request, generar)
+        return StreamingResponse(contenido, media_type=content_type, headers=headers)
+
+    clave = cache_reportes_service.clave(
+        tipo, filtros, formato, cache_reportes_service.sello_datos(db)
+    )
+    artefacto = cache_reportes_service.obtener(clave)
+    if artefacto is None:
+        contenido, content_type = _en_sesion_propia(request, generar)
+        return StreamingResponse(
+            cache_reportes_service.guardar_al_enviar(clave, contenido, content_type),
+            media_type=content_type,
+            headers=headers,
+        )
+
+    if coincide_if_none_match(request, artefacto.etag):
+        artefacto.archivo.close()
+        return no_modificado(artefacto.etag)
+
+    headers.update({"Content-Length": str(artefacto.tamano), "ETag": artefacto.etag})
+    return StreamingResponse(
+        cache_reportes_service.leer_en_bloques(artefacto.archivo),
+        media_type=artefacto.content_type,
+        headers=headers,
+    )
+
+def _rango_fechas(fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> Tuple[date, date]:
+    # Si no se especifica fecha_fin, usar la fecha actual
+    if fecha_fin is None:
+        fecha_fin = date.today()
+    
+    # Si no se especifica fecha_inicio, usar 30 días antes de fecha_fin
+    if fecha_inicio is None:
+        fecha_inicio = fecha_fin - timedelta(days=30)
+    return fecha_inicio, fecha_fin
 
 @router.get("/cliente/{cliente_id}")
 def get_reporte_cliente(
+    request: Request,
     cliente_id: int, 
     formato: str = "pdf",
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Genera un reporte de facturación para un cliente específico
     """
     try:
-        reporte_bytes, content_type = generar_reporte_cliente(db, cliente_id, formato)
-        
         # Configurar la respuesta con el archivo de reporte
         filename = f"reporte_cliente_{cliente_id}_{datetime.now().strftime('%Y%m%d')}.{formato}"
-        return Response(
-            content=reporte_bytes,
-            media_type=content_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        return _responder_reporte(
+            request, db, "cliente", {"cliente_id": cliente_id}, formato, filename,
+            lambda sesion: generar_reporte_cliente(sesion, cliente_id, formato),
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ventas")
 def get_reporte_ventas(
+    request: Request,
     fecha_inicio: Optional[date] = None,
     fecha_fin: Optional[date] = None,
     tipo_venta: Optional[str] = None,
     estado: Optional[str] = None,
     formato: str = "pdf",
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Genera un reporte de ventas según los filtros especificados
     """
-    # Si no se especifica fecha_fin, usar la fecha actual
-    if fecha_fin is None:
-        fecha_fin = date.today()
-    
-    # Si no se especifica fecha_inicio, usar 30 días antes de fecha_fin
-    if fecha_inicio is None:
-        fecha_inicio = fecha_fin - timedelta(days=30)
-    
+    fecha_inicio, fecha_fin = _rango_fechas(fecha_inicio, fecha_fin)
+    filtros = {
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "tipo_venta": tipo_venta,
+        "estado": estado,
+    }
     try:
-        reporte_bytes, content_type = generar_reporte_ventas(
-            db, 
-            fecha_inicio, 
-            fecha_fin, 
-            tipo_venta, 
-            estado, 
-            formato
-        )
-        
         # Configurar la respuesta con el archivo de reporte
         filename = f"reporte_ventas_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.{formato}"
-        return Response(
-            content=reporte_bytes,
-            media_type=content_type,
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        return _responder_reporte(
+            request, db, "ventas", filtros, formato, filename,
+            lambda sesion: generar_reporte_ventas(
+                sesion, 
+                fecha_inicio, 
+                fecha_fin, 
+                tipo_venta, 
+                estado, 
+                formato
+            ),
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/resumen-diario", response_model=List[ResumenDiarioOut])
+def get_resumen_diario(
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Totales de ventas por día (cantidad, total, pagado, contado y crédito),
+    leídos de la tabla de resumen diario
+    """
+    fecha_inicio, fecha_fin = _rango_fechas(fecha_inicio, fecha_fin)
+    return resumen_diario_crud.get_resumen_diario(db, fecha_inicio, fecha_fin, tipo_venta, estado)
+
+@router.get("/saldos", response_model=ReporteSaldosOut)
+def get_saldos(
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    tipo_venta: Optional[Literal["contado", "credito"]] = None,
+    estado_pago: Optional[Literal["Pagado", "Pendiente"]] = None,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    saldo_minimo: Optional[float] = None,
+    orden: str = "id_venta",
+    descendente: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Saldo de cada venta filtrado, ordenado y paginado en la base
+
+    Devuelve una página de ventas, el cursor de la siguiente (también en
+    X-Next-Cursor) y, en la primera página, los totales de todas las ventas
+    que cumplen los filtros.
+    """
+    filtros = {
+        "cliente_id": cliente_id,
+        "nombre": nombre,
+        "tipo_venta": tipo_venta,
+        "estado_pago": estado_pago,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "saldo_minimo": saldo_minimo,
+    }
+    try:
+        items = saldo_crud.get_saldos(db, filtros, orden, descendente, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    columnas = saldo_crud.columnas_orden(orden)
+    respuesta = RespuestaJSON({
+        "items": items,
+        "totales": saldo_crud.get_totales(db, filtros) if cursor is None else None,
+        "siguiente_cursor": siguiente_cursor(items, columnas, limit),
+    })
+    escribir_encabezados(respuesta, items, columnas, limit)
+    return respuesta
+
+@router.get("/antiguedad", response_model=List[AntiguedadClienteOut])
+def get_reporte_antiguedad(
+    request: Request,
+    corte: Optional[date] = None,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    saldo_minimo: Optional[float] = None,
+    tramo: Optional[str] = None,
+    orden: str = "saldo_total",
+    descendente: bool = True,
+    formato: str = "json",
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Antigüedad de saldos de las ventas a crédito por cliente (0-30, 31-60,
+    61-90 y más de 90 días desde corte, por defecto hoy)
+
+    En JSON devuelve una página con el cursor siguiente en X-Next-Cursor; en
+    pdf, csv o xlsx exporta todos los clientes que cumplen los filtros.
+    """
+    if corte is None:
+        corte = date.today()
+    filtros = {"cliente_id": cliente_id, "nombre": nombre, "saldo_minimo": saldo_minimo, "tramo": tramo}
+
+    if formato == "json":
+        try:
+            filas, columnas = antiguedad_crud.get_antiguedad(
+                db, corte, orden=orden, descendente=descendente, limit=limit, cursor=cursor, **filtros
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        respuesta = RespuestaJSON(filas)
+        escribir_encabezados(respuesta, filas, columnas, limit)
+        return respuesta
+
+    try:
+        filename = f"antiguedad_saldos_{corte.strftime('%Y%m%d')}.{formato}"
+        return _responder_reporte(
+            request, db, "antiguedad",
+            {"corte": corte, "orden": orden, "descendente": descendente, **filtros}, formato, filename,
+            lambda sesion: generar_reporte_antiguedad(sesion, corte, filtros, orden, descendente, formato),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/jobs", response_model=TrabajoReporteOut, status_code=202)
+def crear_trabajo_reporte(trabajo_in: TrabajoReporteCreate, response: Response):
+    """
+    Encola un reporte para generarlo en un proceso aparte
+
+    Devuelve de inmediato el trabajo; su estado se consulta en /jobs/{id} y
+    el archivo se descarga en /jobs/{id}/descarga cuando esté completado.
+    """
+    if trabajo_in.tipo == "cliente":
+        if trabajo_in.cliente_id is None:
+            raise HTTPException(status_code=400, detail="cliente_id es obligatorio para reportes de cliente")
+        parametros = {"cliente_id": trabajo_in.cliente_id}
+        filename = f"reporte_cliente_{trabajo_in.cliente_id}_{datetime.now().strftime('%Y%m%d')}.{trabajo_in.formato}"
+    else:
+        fecha_inicio, fecha_fin = _rango_fechas(trabajo_in.fecha_inicio, trabajo_in.fecha_fin)
+        parametros = {
+            "fecha_inicio": fecha_inicio,
+            "fecha_fin": fecha_fin,
+            "tipo_venta": trabajo_in.tipo_venta,
+            "estado": trabajo_in.estado,
+        }
+        filename = f"reporte_ventas_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.{trabajo_in.formato}"
+
+    try:
+        trabajo = trabajos_reportes_service.encolar(
+            trabajo_in.tipo, parametros, trabajo_in.formato, filename
+        )
+    except trabajos_reportes_service.ColaLlena:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados reportes en cola, intente más tarde",
+            headers={"Retry-After": "30"},
+        )
+    response.headers["Location"] = f"/api/reportes/jobs/{trabajo.id}"
+    return trabajos_reportes_service.describir(trabajo)
+
+@router.get("/jobs", response_model=List[TrabajoReporteOut])
+def listar_trabajos_reporte():
+    """
+    Lista los trabajos (de todos los workers) que aún no expiraron
+    """
+    return [trabajos_reportes_service.describir(t) for t in trabajos_reportes_service.listar()]
+
+@router.get("/jobs/{trabajo_id}", response_model=TrabajoReporteOut)
+def get_trabajo_reporte(trabajo_id: str):
+    """
+    Estado y avance (bytes generados) de un trabajo de reporte
+    """
+    trabajo = trabajos_reportes_service.obtener(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o expirado")
+    return trabajos_reportes_service.describir(trabajo)
+
+@router.get("/jobs/{trabajo_id}/descarga")
+def descargar_trabajo_reporte(trabajo_id: str):
+    """
+    Descarga el archivo de un trabajo completado
+    """
+    trabajo = trabajos_reportes_service.obtener(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o expirado")
+    archivo = trabajos_reportes_service.abrir_resultado(trabajo)
+    if archivo is None:
+        raise HTTPException(status_code=409, detail=f"El trabajo está {trabajo.estado}")
+    return StreamingResponse(
+        cache_reportes_service.leer_en_bloques(archivo),
+        media_type=trabajo.content_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={trabajo.filename}",
+            "Content-Length": str(trabajo.tamano),
+        },
+    )
+
+@router.delete("/jobs/{trabajo_id}", response_model=TrabajoReporteOut)
+def cancelar_trabajo_reporte(trabajo_id: str):
+    """
+    Cancela un trabajo pendiente o en curso, o descarta el resultado de uno terminado
+    """
+    trabajo = trabajos_reportes_service.cancelar(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado o expirado")
+    return trabajos_reportes_service.describir(trabajo)
@@ -3,32 +3,68 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.core.json_rapido import RespuestaJSON
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_read_db
 from app.db.session import get_db
 from app.crud import venta_crud
-from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaConSaldo
+from app.core.config import settings
+from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaConSaldo, VentaBulkResultado
 from app.schemas.resumen import ResumenVenta
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
+
+def validar_tamano_bulk(cantidad: int) -> None:
+    """
+    413 si la carga trae más de VENTAS_BULK_MAXIMO ventas
+    """
+    if cantidad > settings.VENTAS_BULK_MAXIMO:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Se aceptan hasta {settings.VENTAS_BULK_MAXIMO} ventas por petición"
+        )
 
 @router.get("/", response_model=List[Venta])
 def read_ventas(
     skip: int = 0, 
     limit: int = 100, 
     cliente_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: Session = Depends(get_read_db)
 ):
-    if cliente_id:
-        ventas = venta_crud.get_ventas_cliente(db, cliente_id=cliente_id)
-    else:
-        ventas = venta_crud.get_ventas(db, skip=skip, limit=limit)
-    return ventas
+    # Proyección plana serializada directamente: el response_model sólo documenta
+    try:
+        ventas = venta_crud.get_ventas_planas(
+            db, cliente_id=cliente_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = venta_crud.count_ventas(db, cliente_id=cliente_id) if incluir_total else None
+    respuesta = RespuestaJSON(ventas)
+    escribir_encabezados(respuesta, ventas, venta_crud.ORDEN_VENTAS, limit, total)
+    return respuesta
 
 @router.post("/", response_model=Venta)
 def create_venta(venta: VentaCreate, db: Session = Depends(get_db)):
     return venta_crud.create_venta(db=db, venta=venta)
 
+@router.post("/bulk", response_model=VentaBulkResultado)
+def create_ventas_bulk(
+    ventas: List[VentaCreate],
+    lote: Optional[int] = Query(None, ge=1),
+    transaccion_unica: bool = False,
+    db: Session = Depends(get_db)
+):
+    validar_tamano_bulk(len(ventas))
+    return venta_crud.create_ventas_bulk(
+        db, ventas, lote=lote, transaccion_unica=transaccion_unica
+    )
+
 @router.get("/{venta_id}", response_model=Venta)
-def read_venta(venta_id: int, db: Session = Depends(get_db)):
+def read_venta(venta_id: int, db: Session = Depends(get_read_db)):
     db_venta = venta_crud.get_venta(db, venta_id=venta_id)
     if db_venta is None:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
@@ -42,7 +78,7 @@ def update_venta(venta_id: int, venta: VentaUpdate, db: Session = Depends(get_db
     return db_venta
 
 @router.get("/{venta_id}/saldo", response_model=VentaConSaldo)
-def get_venta_con_saldo(venta_id: int, db: Session = Depends(get_db)):
+def get_venta_con_saldo(venta_id: int, db: Session = Depends(get_read_db)):
     resultado = venta_crud.get_venta_con_saldo(db, venta_id=venta_id)
     if resultado is None:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
@@ -51,28 +87,27 @@ def get_venta_con_saldo(venta_id: int, db: Session = Depends(get_db)):
 @router.get("/con-saldo/", response_model=List[VentaConSaldo])
 def get_ventas_con_saldo(
     cliente_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    return venta_crud.get_ventas_con_saldo(db, cliente_id=cliente_id)
+    return RespuestaJSON(venta_crud.get_ventas_con_saldo_planas(db, cliente_id=cliente_id))
 
 @router.get("/{venta_id}/resumen", response_model=ResumenVenta)
-def get_resumen_venta(venta_id: int, db: Session = Depends(get_db)):
+def get_resumen_venta(venta_id: int, db: Session = Depends(get_read_db)):
     from app.crud import pago_crud
     
     # Obtener la venta con saldo
-    venta_con_saldo = venta_crud.get_venta_con_saldo(db, venta_id=venta_id)
-    if venta_con_saldo is None:
+    venta = venta_crud.get_venta_con_saldo(db, venta_id=venta_id)
+    if venta is None:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
     
     # Obtener los detalles de la venta
-    venta = venta_con_saldo["venta"]
     detalles = venta.detalles
     
     # Obtener los pagos de la venta
     pagos = pago_crud.get_pagos_venta(db, venta_id=venta_id)
     
     return {
-        "venta": venta_con_saldo,
+        "venta": venta,
         "detalles": detalles,
         "pagos": pagos
     }
@@ -0,0 +1,108 @@
+# app/api/venta_routes_async.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.venta_routes import validar_tamano_bulk
+from app.core.json_rapido import RespuestaJSON
+from app.core.metricas import RutaMedida
+from app.core.paginacion import escribir_encabezados
+from app.db.replica import get_async_read_db
+from app.db.session import get_async_db
+from app.crud import venta_crud, venta_crud_async, pago_crud_async
+from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaConSaldo, VentaBulkResultado
+from app.schemas.resumen import ResumenVenta
+
+router = APIRouter(route_class=RutaMedida)
+
+@router.get("/", response_model=List[Venta])
+async def read_ventas(
+    skip: int = 0, 
+    limit: int = 100, 
+    cliente_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    incluir_total: bool = False,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    # Proyección plana serializada directamente: el response_model sólo documenta
+    try:
+        ventas = await venta_crud_async.get_ventas_planas(
+            db, cliente_id=cliente_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = await venta_crud_async.count_ventas(db, cliente_id=cliente_id) if incluir_total else None
+    respuesta = RespuestaJSON(ventas)
+    escribir_encabezados(respuesta, ventas, venta_crud.ORDEN_VENTAS, limit, total)
+    return respuesta
+
+@router.post("/", response_model=Venta)
+async def create_venta(venta: VentaCreate, db: AsyncSession = Depends(get_async_db)):
+    return await venta_crud_async.create_venta(db=db, venta=venta)
+
+@router.post("/bulk", response_model=VentaBulkResultado)
+async def create_ventas_bulk(
+    ventas: List[VentaCreate],
+    lote: Optional[int] = Query(None, ge=1),
+    transaccion_unica: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    validar_tamano_bulk(len(ventas))
+    # La inserción masiva es la misma que en modo síncrono, sobre la conexión async
+    return await db.run_sync(
+        venta_crud.create_ventas_bulk, ventas, lote=lote, transaccion_unica=transaccion_unica
+    )
+
+@router.get("/{venta_id}", response_model=Venta)
+async def read_venta(venta_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    db_venta = await venta_crud_async.get_venta(db, venta_id=venta_id)
+    if db_venta is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return db_venta
+
+@router.put("/{venta_id}", response_model=Venta)
+async def update_venta(venta_id: int, venta: VentaUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_venta = await venta_crud_async.update_venta(db, venta_id=venta_id, venta=venta)
+    if db_venta is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return db_venta
+
+@router.get("/{venta_id}/saldo", response_model=VentaConSaldo)
+async def get_venta_con_saldo(venta_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    resultado = await venta_crud_async.get_venta_con_saldo(db, venta_id=venta_id)
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return resultado
+
+@router.get("/con-saldo/", response_model=List[VentaConSaldo])
+async def get_ventas_con_saldo(
+    cliente_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return RespuestaJSON(await venta_crud_async.get_ventas_con_saldo_planas(db, cliente_id=cliente_id))
+
+@router.get("/{venta_id}/resumen", response_model=ResumenVenta)
+async def get_resumen_venta(venta_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    # Obtener la venta con saldo
+    venta = await venta_crud_async.get_venta_con_saldo(db, venta_id=venta_id)
+    if venta is None:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    
+    # Obtener los detalles de la venta
+    detalles = venta.detalles
+    
+    # Obtener los pagos de la venta
+    pagos = await pago_crud_async.get_pagos_venta(db, venta_id=venta_id)
+    
+    return {
+        "venta": venta,
+        "detalles": detalles,
+        "pagos": pagos
+    }
+@router.delete("/{venta_id}")
+async def delete_venta(venta_id: int, db: AsyncSession = Depends(get_async_db)):
+    eliminado = await venta_crud_async.delete_venta(db, venta_id)
+    if not eliminado:
+        raise HTTPException(status_code=404, detail="Venta no encontrada")
+    return {"message": "Venta eliminada correctamente"}
\ No newline at end of file
@@ -0,0 +1,34 @@
+# app/commands/reconstruir_resumen_diario.py
+"""
+Recalcula la tabla ventas_diarias a partir de las ventas
+
+Uso:
+    python -m app.commands.reconstruir_resumen_diario [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD]
+"""
+import argparse
+import sys
+from datetime import date
+
+from app.crud import resumen_diario_crud
+from app.db import base  # noqa: F401  registra todos los modelos antes de mapear
+from app.db.session import SessionLocal
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--desde", type=date.fromisoformat, help="primer día a recalcular (inclusive)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="último día a recalcular (inclusive)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        filas = resumen_diario_crud.reconstruir(db, args.desde, args.hasta)
+    finally:
+        db.close()
+
+    print(f"{filas} filas de resumen diario reconstruidas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# app/commands/verificar_saldos.py
+"""
+Detecta ventas cuyo total_pagado/saldo_pendiente/estado no coincide con sus pagos
+
+Uso:
+    python -m app.commands.verificar_saldos [--corregir]
+"""
+import argparse
+import sys
+
+from app.crud import pago_crud
+from app.db.session import SessionLocal
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--corregir",
+        action="store_true",
+        help="recalcula saldos y estado con los valores calculados desde pagos",
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        diferencias = pago_crud.verificar_saldos(db, corregir=args.corregir)
+    finally:
+        db.close()
+
+    for item in diferencias:
+        print(
+            f"venta {item['id_venta']}: "
+            f"pagado {item['total_pagado']:.2f} (real {item['total_pagado_real']:.2f}), "
+            f"saldo {item['saldo_pendiente']:.2f} (real {item['saldo_pendiente_real']:.2f}), "
+            f"estado {item['estado']} (real {item['estado_real']})"
+        )
+
+    if not diferencias:
+        print("Saldos consistentes")
+        return 0
+    if args.corregir:
+        print(f"{len(diferencias)} ventas corregidas")
+        return 0
+    print(f"{len(diferencias)} ventas con diferencias")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
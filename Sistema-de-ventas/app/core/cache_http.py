@@ -0,0 +1,40 @@
+# app/core/cache_http.py
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def etag_fuerte(*partes: Any) -> str:
+    """
+    ETag fuerte a partir de valores que determinan por completo el contenido
+    (versión de los datos, parámetros de la consulta, formato...)
+    """
+    crudo = json.dumps(partes, default=str, separators=(",", ":")).encode()
+    return '"' + hashlib.sha256(crudo).hexdigest()[:32] + '"'
+
+
+def coincide_if_none_match(request: Request, etag: str) -> bool:
+    """
+    True si el cliente ya tiene esta representación (If-None-Match)
+
+    If-None-Match usa comparación débil: se ignora el prefijo W/.
+    """
+    encabezado = request.headers.get("if-none-match")
+    if not encabezado:
+        return False
+    if encabezado.strip() == "*":
+        return True
+    candidatos = [valor.strip() for valor in encabezado.split(",")]
+    return etag in (c[2:] if c.startswith("W/") else c for c in candidatos)
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def escribir_etag(response: Response, etag: str) -> None:
+    # no-cache: el navegador guarda la respuesta pero revalida con If-None-Match
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
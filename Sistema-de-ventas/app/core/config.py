@@ -1,5 +1,7 @@
+import os
+import tempfile
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 
@@ -9,6 +11,76 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Sistema de Ventas"
     CORS_ORIGINS: List[str] = ["http://localhost:5173"]  # frontend de Vite
 
+    # Modo asíncrono (opcional): AsyncEngine + rutas async def
+    DB_ASYNC: bool = False
+    # Si no se indica, se deriva de SQLALCHEMY_DATABASE_URI (aiomysql / aiosqlite)
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    # Pool de conexiones (no aplica a SQLite en memoria)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # menor que wait_timeout de MySQL
+    DB_POOL_PRE_PING: bool = True  # evita "MySQL server has gone away" tras inactividad
+
+    # Réplica de lectura (opcional): GET de listados, detalle y reportes
+    SQLALCHEMY_REPLICA_URI: Optional[str] = None
+    SQLALCHEMY_ASYNC_REPLICA_URI: Optional[str] = None  # si no se indica, se deriva como la del primario
+    REPLICA_LEER_PROPIAS: int = 5  # segundos tras una escritura en que ese cliente lee del primario
+    REPLICA_REINTENTO: int = 30  # segundos leyendo del primario tras un fallo de conexión a la réplica
+
+    # Arranque del worker
+    # verificar: la base debe estar en la revisión head de Alembic (alembic upgrade head)
+    # crear: create_all como antes, sólo para desarrollo; nada: sin comprobación
+    DB_ESQUEMA: str = "verificar"
+    DB_CALENTAR: int = 0  # conexiones del pool abiertas antes de aceptar peticiones (hasta DB_POOL_SIZE)
+
+    # Paginación
+    CONTEO_CACHE_TTL: int = 60  # segundos que se reutiliza el total aproximado
+    CONTEO_CACHE_MAX: int = 10000  # totales guardados por proceso (las claves incluyen filtros)
+
+    # Diagnóstico: cantidad de sentencias SQL por petición en X-Consultas-SQL
+    CONSULTAS_CONTAR: bool = False
+    # Métricas por ruta en /metrics (Prometheus) y encabezado Server-Timing, por proceso
+    METRICAS: bool = True
+
+    # Búsqueda (índice en memoria de trigramas para clientes y productos)
+    BUSQUEDA_INDICE: bool = True
+    BUSQUEDA_RECARGA: int = 600  # segundos antes de reconstruir el índice desde la base
+    BUSQUEDA_MAX_CANDIDATOS: int = 20000  # documentos verificados por consulta de autocompletado
+
+    # Catálogo de productos en memoria (ETag / 304)
+    # Versión compartida entre workers vía versiones_catalogo; en False cada
+    # proceso lleva su contador (sólo correcto con un único worker)
+    CATALOGO_VERSION_DB: bool = True
+    CATALOGO_VERSION_TTL: float = 1.0  # segundos entre lecturas de la fila de versión
+
+    # Caché de reportes generados (disco, LRU)
+    REPORTES_CACHE: bool = True
+    REPORTES_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "sistema_ventas_reportes")
+    REPORTES_CACHE_MAX_MB: int = 512
+    REPORTES_CACHE_TTL: int = 24 * 3600  # segundos; acota cambios que el sello no detecta (escrituras fuera del crud)
+
+    # Trabajos de reportes en procesos aparte (POST /api/reportes/jobs)
+    REPORTES_JOBS_WORKERS: int = 2  # procesos que renderizan a la vez
+    REPORTES_JOBS_MAX_COLA: int = 20  # trabajos pendientes + en curso; el resto recibe 429
+    REPORTES_JOBS_DIR: str = os.path.join(tempfile.gettempdir(), "sistema_ventas_trabajos")
+    REPORTES_JOBS_TTL: int = 3600  # segundos que se conserva un resultado terminado
+
+    # Analítica sobre instantáneas columnares (GET /api/analytics/*)
+    ANALITICA: bool = True  # abrir y refrescar la instantánea al iniciar
+    ANALITICA_DIR: str = os.path.join(tempfile.gettempdir(), "sistema_ventas_analitica")
+    ANALITICA_RECARGA: int = 300  # segundos entre refrescos incrementales
+    ANALITICA_LOTE: int = 50000  # filas por lectura al refrescar
+
+    # Ingesta masiva de ventas (POST /api/ventas/bulk)
+    VENTAS_BULK_LOTE: int = 500  # ventas por INSERT de varias filas
+    VENTAS_BULK_MAXIMO: int = 10000  # ventas aceptadas por petición
+
+    # Importación masiva de pagos (POST /api/pagos/bulk)
+    PAGOS_BULK_LOTE: int = 1000  # pagos por executemany y ventas por UPDATE
+    PAGOS_BULK_MAXIMO: int = 50000  # pagos aceptados por petición
+
     class Config:
         case_sensitive = True
 
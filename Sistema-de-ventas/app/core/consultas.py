@@ -0,0 +1,70 @@
+# app/core/consultas.py
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+# Encabezado con la cantidad de sentencias SQL de la petición (CONSULTAS_CONTAR)
+ENCABEZADO_CONSULTAS = "X-Consultas-SQL"
+
+
+class Contador:
+    """
+    Sentencias SQL ejecutadas dentro de un bloque contar_consultas() y el
+    tiempo acumulado que pasaron en la base (desde que se envían hasta que
+    el driver devuelve el cursor; no incluye leer las filas)
+    """
+
+    __slots__ = ("total", "segundos")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.segundos = 0.0
+
+
+_contador: ContextVar[Optional[Contador]] = ContextVar("contador_consultas", default=None)
+
+
+def _antes(conn, *_) -> None:
+    contador = _contador.get()
+    if contador is not None:
+        contador.total += 1
+        # Las sentencias de una conexión son secuenciales: basta un valor
+        conn.info["inicio_consulta"] = time.perf_counter()
+
+
+def _despues(conn, *_) -> None:
+    contador = _contador.get()
+    inicio = conn.info.pop("inicio_consulta", None)
+    if contador is not None and inicio is not None:
+        contador.segundos += time.perf_counter() - inicio
+
+
+def registrar_contador(engine) -> None:
+    """
+    Suma cada sentencia del engine (y su duración) al contador activo, si lo hay
+
+    Args:
+        engine: Engine síncrono (o el sync_engine de un AsyncEngine)
+    """
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _despues)
+
+
+@contextmanager
+def contar_consultas() -> Iterator[Contador]:
+    """
+    Cuenta las sentencias SQL del bloque
+
+    El contador vive en una ContextVar, así que también suma lo que ejecutan
+    las rutas síncronas en el threadpool (Starlette copia el contexto), pero
+    no los hilos o procesos de fondo.
+    """
+    contador = Contador()
+    token = _contador.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador.reset(token)
@@ -0,0 +1,52 @@
+# app/core/json_rapido.py
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa json de la biblioteca estándar
+    orjson = None
+
+# UTC como "Z", igual que pydantic al serializar un response_model
+_OPCIONES_ORJSON = orjson.OPT_UTC_Z if orjson is not None else 0
+
+
+def _por_defecto(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        iso = valor.isoformat()
+        return iso[:-6] + "Z" if iso.endswith("+00:00") else iso
+    if isinstance(valor, Enum):
+        return valor.value
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
+
+
+def serializar(contenido: Any) -> bytes:
+    """
+    JSON compacto en UTF-8 de dicts, listas, números, fechas y enums
+
+    Con orjson serializa en C sin pasar por pydantic; el resultado es el
+    mismo que produciría el response_model para los mismos datos.
+    """
+    if orjson is not None:
+        return orjson.dumps(contenido, option=_OPCIONES_ORJSON)
+    return json.dumps(
+        contenido, default=_por_defecto, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RespuestaJSON(Response):
+    """
+    Respuesta JSON sin validación ni serialización del response_model
+
+    Para listados grandes ya armados como dicts (proyecciones planas del
+    crud). El response_model de la ruta se mantiene sólo para OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
@@ -0,0 +1,273 @@
+# app/core/metricas.py
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.consultas import ENCABEZADO_CONSULTAS, Contador, contar_consultas
+
+# Tipo de contenido del formato de texto de Prometheus
+TIPO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites de los histogramas, acumulativos como los buckets de Prometheus
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+# Etiqueta de las peticiones que no coinciden con ninguna ruta (404)
+SIN_RUTA = "sin_ruta"
+
+
+class Histograma:
+    """
+    Histograma con etiquetas y buckets fijos
+
+    Cada observación cae en un solo bucket (bisect); los acumulados que pide
+    Prometheus se calculan al exportar, no en cada petición.
+    """
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...], limites: Tuple[float, ...]) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        self._lock = threading.Lock()
+        # valores de etiquetas -> [conteos por bucket (+Inf al final), suma]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observar(self, valores: Tuple[str, ...], valor: float) -> None:
+        posicion = bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            series = [(valores, list(conteos), suma) for valores, (conteos, suma) in self._series.items()]
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for valores, conteos, suma in sorted(series):
+            etiquetas = _etiquetas(self.etiquetas, valores)
+            acumulado = 0
+            for limite, cantidad in zip(self.limites + ("+Inf",), conteos):
+                acumulado += cantidad
+                lineas.append(f'{self.nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"{self.nombre}_sum{{{etiquetas}}} {suma}")
+            lineas.append(f"{self.nombre}_count{{{etiquetas}}} {acumulado}")
+        return lineas
+
+
+class ContadorEtiquetado:
+    """
+    Contador monótono con etiquetas (tipo counter de Prometheus)
+    """
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...]) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], int] = {}
+
+    def sumar(self, valores: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + 1
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        for valores, cantidad in series:
+            lineas.append(f"{self.nombre}{{{_etiquetas(self.etiquetas, valores)}}} {cantidad}")
+        return lineas
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...]) -> str:
+    def escapar(valor: str) -> str:
+        return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{nombre}="{escapar(valor)}"' for nombre, valor in zip(nombres, valores))
+
+
+_RUTA = ("metodo", "ruta")
+
+peticion_segundos = Histograma(
+    "sistema_ventas_peticion_segundos", "Duración total de la petición", _RUTA, LIMITES_SEGUNDOS
+)
+db_segundos = Histograma(
+    "sistema_ventas_db_segundos", "Tiempo acumulado en sentencias SQL por petición", _RUTA, LIMITES_SEGUNDOS
+)
+serializacion_segundos = Histograma(
+    "sistema_ventas_serializacion_segundos",
+    "Tiempo entre el fin del endpoint y el inicio de la respuesta (validación y JSON)",
+    _RUTA,
+    LIMITES_SEGUNDOS,
+)
+consultas_peticion = Histograma(
+    "sistema_ventas_consultas", "Sentencias SQL ejecutadas por petición", _RUTA, LIMITES_CONSULTAS
+)
+peticiones_total = ContadorEtiquetado(
+    "sistema_ventas_peticiones_total", "Peticiones atendidas por estado", ("metodo", "ruta", "estado")
+)
+
+_METRICAS = (peticion_segundos, db_segundos, serializacion_segundos, consultas_peticion, peticiones_total)
+
+
+def exportar() -> str:
+    """
+    Métricas de peticiones en el formato de texto de Prometheus
+
+    Son por proceso: con varios workers cada uno expone las suyas.
+    """
+    lineas: List[str] = []
+    for metrica in _METRICAS:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
+
+
+class Medicion:
+    """
+    Tiempos de una petición que sólo conoce el endpoint: cuándo terminó y
+    cuánto tardó, para separar la serialización del resto
+    """
+
+    __slots__ = ("fin_endpoint", "endpoint")
+
+    def __init__(self) -> None:
+        self.fin_endpoint: Optional[float] = None
+        self.endpoint = 0.0
+
+
+_medicion: ContextVar[Optional[Medicion]] = ContextVar("medicion_peticion", default=None)
+
+
+def _medir_endpoint(endpoint: Callable) -> Callable:
+    # La ContextVar llega también al threadpool: el objeto es el mismo
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _anotar(inicio)
+    else:
+        @functools.wraps(endpoint)
+        def medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _anotar(inicio)
+    return medido
+
+
+def _anotar(inicio: float) -> None:
+    medicion = _medicion.get()
+    if medicion is not None:
+        medicion.fin_endpoint = time.perf_counter()
+        medicion.endpoint = medicion.fin_endpoint - inicio
+
+
+class RutaMedida(APIRoute):
+    """
+    APIRoute que anota cuándo termina el endpoint (APIRouter(route_class=RutaMedida))
+
+    Lo que pasa entre ese momento y el inicio de la respuesta es la
+    validación del response_model y la serialización a JSON.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
+        super().__init__(path, _medir_endpoint(endpoint), **kwargs)
+
+
+def plantilla_ruta(scope: Dict[str, Any]) -> str:
+    """
+    Ruta de la petición con los parámetros como {nombre} (/api/ventas/{venta_id})
+
+    Se reconstruye desde path_params porque la ruta resuelta no incluye el
+    prefijo del router; así las etiquetas no crecen con cada id.
+    """
+    if scope.get("route") is None:
+        return SIN_RUTA
+    parametros = {str(valor): nombre for nombre, valor in scope.get("path_params", {}).items()}
+    if not parametros:
+        return scope["path"]
+    return "/".join(
+        "{" + parametros[segmento] + "}" if segmento in parametros else segmento
+        for segmento in scope["path"].split("/")
+    )
+
+
+def _server_timing(contador: Contador, medicion: Medicion, serializacion: float, total: float) -> bytes:
+    partes = [
+        f'db;dur={contador.segundos * 1000:.1f};desc="{contador.total} consultas"',
+        f"app;dur={medicion.endpoint * 1000:.1f}",
+        f"serializacion;dur={serializacion * 1000:.1f}",
+        f"total;dur={total * 1000:.1f}",
+    ]
+    return ", ".join(partes).encode("latin-1")
+
+
+class MedicionMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP: sentencias SQL, tiempo en la
+    base, en el endpoint, en la serialización y total
+
+    Con METRICAS agrega Server-Timing a la respuesta y alimenta los
+    histogramas por ruta de /metrics; con CONSULTAS_CONTAR agrega
+    X-Consultas-SQL. Es ASGI puro (sin BaseHTTPMiddleware) para no copiar
+    el cuerpo ni crear tareas extra por petición. En respuestas en
+    streaming los encabezados sólo ven lo ocurrido antes del primer byte;
+    los histogramas se registran al terminar el cuerpo.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+        estado = 500
+        serializacion = 0.0
+
+        with contar_consultas() as contador:
+            async def enviar(mensaje) -> None:
+                nonlocal estado, serializacion
+                if mensaje["type"] == "http.response.start":
+                    estado = mensaje["status"]
+                    ahora = time.perf_counter()
+                    if medicion.fin_endpoint is not None:
+                        serializacion = ahora - medicion.fin_endpoint
+                    encabezados = list(mensaje.get("headers", []))
+                    if settings.METRICAS:
+                        encabezados.append(
+                            (b"server-timing", _server_timing(contador, medicion, serializacion, ahora - inicio))
+                        )
+                    if settings.CONSULTAS_CONTAR:
+                        encabezados.append((ENCABEZADO_CONSULTAS.lower().encode(), str(contador.total).encode()))
+                    mensaje = {**mensaje, "headers": encabezados}
+                await send(mensaje)
+
+            try:
+                await self.app(scope, receive, enviar)
+            finally:
+                _medicion.reset(token)
+                if settings.METRICAS:
+                    etiquetas = (scope["method"], plantilla_ruta(scope))
+                    peticion_segundos.observar(etiquetas, time.perf_counter() - inicio)
+                    db_segundos.observar(etiquetas, contador.segundos)
+                    serializacion_segundos.observar(etiquetas, serializacion)
+                    consultas_peticion.observar(etiquetas, contador.total)
+                    peticiones_total.sumar(etiquetas + (str(estado),))
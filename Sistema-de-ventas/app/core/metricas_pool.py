@@ -0,0 +1,135 @@
+# app/core/metricas_pool.py
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Límites (segundos) del histograma de espera por una conexión, acumulativos
+# como los buckets de Prometheus
+LIMITES_ESPERA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class MetricasPool:
+    """
+    Contadores de un pool de conexiones, alimentados por sus eventos
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.conexiones_creadas = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidaciones = 0
+        self.fallos_checkout = 0
+        self.buckets_espera = [0] * len(LIMITES_ESPERA)
+        self.espera_total = 0.0
+        self.esperas = 0
+
+    def sumar(self, contador: str) -> None:
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def observar_espera(self, segundos: float) -> None:
+        with self._lock:
+            self.esperas += 1
+            self.espera_total += segundos
+            for i, limite in enumerate(LIMITES_ESPERA):
+                if segundos <= limite:
+                    self.buckets_espera[i] += 1
+
+    def exportar(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets: List[Dict[str, Any]] = [
+                {"le": limite, "count": cantidad}
+                for limite, cantidad in zip(LIMITES_ESPERA, self.buckets_espera)
+            ]
+            buckets.append({"le": "+Inf", "count": self.esperas})
+            return {
+                "conexiones_creadas": self.conexiones_creadas,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidaciones": self.invalidaciones,
+                "fallos_checkout": self.fallos_checkout,
+                "espera": {
+                    "buckets": buckets,
+                    "suma": self.espera_total,
+                    "cantidad": self.esperas,
+                },
+            }
+
+
+class _EsperaMedida:
+    """
+    Mide cuánto espera cada checkout por una conexión libre
+
+    Los eventos del pool se disparan después de obtener la conexión, así que
+    la espera (y los TimeoutError por pool agotado) sólo se ven envolviendo
+    la obtención misma.
+    """
+
+    metricas: MetricasPool
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except Exception:
+            self.metricas.sumar("fallos_checkout")
+            raise
+        self.metricas.observar_espera(time.perf_counter() - inicio)
+        return conexion
+
+    def recreate(self):
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+
+class AsyncQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+
+def registrar_metricas(pool) -> MetricasPool:
+    """
+    Engancha los eventos del pool a un MetricasPool y lo devuelve
+
+    Args:
+        pool: Pool síncrono (engine.pool) o el de un AsyncEngine (sync_engine.pool)
+
+    Returns:
+        MetricasPool asociado al pool
+    """
+    metricas = getattr(pool, "metricas", None) or MetricasPool()
+    pool.metricas = metricas
+
+    event.listen(pool, "connect", lambda *_: metricas.sumar("conexiones_creadas"))
+    event.listen(pool, "checkout", lambda *_: metricas.sumar("checkouts"))
+    event.listen(pool, "checkin", lambda *_: metricas.sumar("checkins"))
+    event.listen(pool, "invalidate", lambda *_: metricas.sumar("invalidaciones"))
+    return metricas
+
+
+def estado_pool(pool) -> Dict[str, Any]:
+    """
+    Foto del pool: tamaño, conexiones en uso, overflow y métricas acumuladas
+    """
+    estado: Dict[str, Any] = {"clase": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        estado.update(
+            tamano=pool.size(),
+            en_uso=pool.checkedout(),
+            libres=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    metricas = getattr(pool, "metricas", None)
+    if metricas is not None:
+        estado["metricas"] = metricas.exportar()
+    return estado
@@ -0,0 +1,169 @@
+# app/core/paginacion.py
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from fastapi import Response
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+from app.core.config import settings
+
+ENCABEZADO_CURSOR = "X-Next-Cursor"
+ENCABEZADO_TOTAL = "X-Total-Count"
+
+# clave -> (vence, total), de la menos a la más recientemente guardada. Las
+# claves llevan los filtros del usuario: se acota a CONTEO_CACHE_MAX entradas
+_conteos: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+_conteos_lock = threading.Lock()
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Convierte los valores de la última fila de una página en un token opaco
+    """
+    serializables = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores]
+    crudo = json.dumps(serializables, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(token: str, columnas: Sequence[Any]) -> List[Any]:
+    """
+    Recupera los valores de un cursor generado por codificar_cursor
+
+    Lanza ValueError si el token no corresponde a las columnas de orden
+    """
+    try:
+        relleno = "=" * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor de paginación inválido")
+    if not isinstance(valores, list) or len(valores) != len(columnas):
+        raise ValueError("Cursor de paginación inválido")
+
+    resultado = []
+    for columna, valor in zip(columnas, valores):
+        tipo = columna.type.python_type
+        if valor is not None and tipo in (date, datetime):
+            valor = tipo.fromisoformat(valor)
+        resultado.append(valor)
+    return resultado
+
+
+def _filtro_keyset(columnas: Sequence[Any], valores: Sequence[Any], descendente: bool = False):
+    # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), expandido para que
+    # MySQL pueda usar el índice compuesto en lugar de un row constructor
+    condiciones = []
+    for i, columna in enumerate(columnas):
+        iguales = [columnas[j] == valores[j] for j in range(i)]
+        siguiente = columna < valores[i] if descendente else columna > valores[i]
+        condiciones.append(and_(*iguales, siguiente))
+    return or_(*condiciones)
+
+
+def paginar(
+    query: Union[Query, Select],
+    columnas: Sequence[Any],
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+    descendente: bool = False,
+) -> Union[Query, Select]:
+    """
+    Ordena la consulta (Query o select()) por las columnas dadas y aplica la paginación
+
+    Con cursor se usa keyset (WHERE sobre las columnas de orden), de modo que
+    el costo no crece con el número de página. Sin cursor se mantiene el
+    OFFSET clásico por compatibilidad. Con descendente todas las columnas se
+    ordenan de mayor a menor.
+    """
+    query = query.order_by(*(columna.desc() if descendente else columna for columna in columnas))
+    if cursor:
+        valores = decodificar_cursor(cursor, columnas)
+        query = query.filter(_filtro_keyset(columnas, valores, descendente))
+    elif skip:
+        query = query.offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def siguiente_cursor(items: Sequence[Any], columnas: Sequence[Any], limit: Optional[int]) -> Optional[str]:
+    """
+    Devuelve el cursor de la página siguiente, o None si ésta fue la última
+    """
+    if not items or limit is None or len(items) < limit:
+        return None
+    ultimo = items[-1]
+    # Los listados planos (dicts) traen las columnas de orden como claves
+    if isinstance(ultimo, dict):
+        return codificar_cursor([ultimo[columna.key] for columna in columnas])
+    return codificar_cursor([getattr(ultimo, columna.key) for columna in columnas])
+
+
+def _conteo_guardado(clave: str) -> Optional[int]:
+    with _conteos_lock:
+        guardado = _conteos.get(clave)
+        if guardado is None:
+            return None
+        if guardado[0] <= time.monotonic():
+            del _conteos[clave]
+            return None
+    return guardado[1]
+
+
+def _guardar_conteo(clave: str, total: int) -> int:
+    ahora = time.monotonic()
+    with _conteos_lock:
+        _conteos[clave] = (ahora + settings.CONTEO_CACHE_TTL, total)
+        _conteos.move_to_end(clave)
+        # Todas duran lo mismo: las primeras son las más viejas, vencidas o no
+        while _conteos and (
+            len(_conteos) > settings.CONTEO_CACHE_MAX or next(iter(_conteos.values()))[0] <= ahora
+        ):
+            _conteos.popitem(last=False)
+    return total
+
+
+def contar_aproximado(query: Query, clave: str) -> int:
+    """
+    Cuenta las filas de la consulta, reutilizando el resultado durante
+    CONTEO_CACHE_TTL segundos para no repetir el COUNT en cada página
+    """
+    total = _conteo_guardado(clave)
+    if total is None:
+        total = _guardar_conteo(clave, query.order_by(None).count())
+    return total
+
+
+async def contar_aproximado_async(db: AsyncSession, stmt: Select, clave: str) -> int:
+    """
+    Igual que contar_aproximado, para un select() ejecutado con AsyncSession
+    """
+    total = _conteo_guardado(clave)
+    if total is None:
+        conteo = select(func.count()).select_from(stmt.order_by(None).subquery())
+        total = _guardar_conteo(clave, (await db.execute(conteo)).scalar_one())
+    return total
+
+
+def escribir_encabezados(
+    response: Response,
+    items: Sequence[Any],
+    columnas: Sequence[Any],
+    limit: Optional[int],
+    total: Optional[int] = None,
+) -> None:
+    """
+    Agrega a la respuesta el cursor de la página siguiente y el total aproximado
+    """
+    cursor = siguiente_cursor(items, columnas, limit)
+    if cursor:
+        response.headers[ENCABEZADO_CURSOR] = cursor
+    if total is not None:
+        response.headers[ENCABEZADO_TOTAL] = str(total)
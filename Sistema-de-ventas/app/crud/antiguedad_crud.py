@@ -0,0 +1,181 @@
+# app/crud/antiguedad_crud.py
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.paginacion import paginar
+from app.crud import cliente_crud
+from app.models.cliente import Cliente
+from app.models.venta import EstadoVenta, TipoVenta, Venta
+
+# (etiqueta, días desde, días hasta) de cada tramo; None = sin límite
+TRAMOS: Tuple[Tuple[str, int, Optional[int]], ...] = (
+    ("saldo_0_30", 0, 30),
+    ("saldo_31_60", 31, 60),
+    ("saldo_61_90", 61, 90),
+    ("saldo_90_mas", 91, None),
+)
+ORDENES = ("saldo_total", "saldo_90_mas", "nombre", "id_cliente", "venta_mas_antigua")
+
+FILAS_POR_LOTE = 1000
+
+
+def _suma_tramo(corte: date, desde: int, hasta: Optional[int]):
+    # Antigüedad en días = corte - fecha de la venta; se compara fecha_venta
+    # contra los límites para que el filtro siga siendo sargable
+    condiciones = []
+    if desde:
+        condiciones.append(Venta.fecha_venta < corte - timedelta(days=desde - 1))
+    if hasta is not None:
+        condiciones.append(Venta.fecha_venta >= corte - timedelta(days=hasta))
+    saldo = case((and_(*condiciones), Venta.saldo_pendiente), else_=0)
+    return func.round(func.sum(saldo), 2, type_=Float)
+
+
+def _agregado(corte: date, cliente_id: Optional[int] = None):
+    """
+    Saldo pendiente por cliente y tramo: un solo GROUP BY con agregación
+    condicional sobre las ventas a crédito con saldo
+    """
+    stmt = (
+        select(
+            Venta.id_cliente.label("id_cliente"),
+            *(_suma_tramo(corte, desde, hasta).label(etiqueta) for etiqueta, desde, hasta in TRAMOS),
+            func.round(func.sum(Venta.saldo_pendiente), 2, type_=Float).label("saldo_total"),
+            func.count().label("ventas"),
+            func.min(Venta.fecha_venta).label("venta_mas_antigua"),
+        )
+        .where(
+            Venta.tipo_venta == TipoVenta.credito,
+            Venta.saldo_pendiente > 0,
+            # fecha_venta < corte + 1 día: incluye el día de corte completo
+            Venta.fecha_venta < corte + timedelta(days=1),
+            or_(Venta.estado.is_(None), Venta.estado != EstadoVenta.cancelada),
+        )
+        .group_by(Venta.id_cliente)
+    )
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    return stmt.subquery("antiguedad")
+
+
+def _consulta(
+    corte: date,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    saldo_minimo: Optional[float] = None,
+    tramo: Optional[str] = None,
+    orden: str = "saldo_total",
+):
+    """
+    Consulta del reporte con sus filtros y las columnas de orden para paginar
+
+    Raises:
+        ValueError: Si el orden o el tramo no existen
+    """
+    if orden not in ORDENES:
+        raise ValueError(f"Orden {orden} no soportado; use uno de {', '.join(ORDENES)}")
+    etiquetas = [etiqueta for etiqueta, _, _ in TRAMOS]
+    if tramo is not None and tramo not in etiquetas:
+        raise ValueError(f"Tramo {tramo} no soportado; use uno de {', '.join(etiquetas)}")
+
+    agregado = _agregado(corte, cliente_id)
+    stmt = select(
+        agregado.c.id_cliente,
+        Cliente.nombre,
+        *(agregado.c[etiqueta] for etiqueta in etiquetas),
+        agregado.c.saldo_total,
+        agregado.c.ventas,
+        agregado.c.venta_mas_antigua,
+    ).join(Cliente, Cliente.id_cliente == agregado.c.id_cliente)
+    if nombre:
+        stmt = stmt.where(cliente_crud.filtro_nombre(nombre))
+    if saldo_minimo is not None:
+        stmt = stmt.where(agregado.c.saldo_total >= saldo_minimo)
+    if tramo is not None:
+        stmt = stmt.where(agregado.c[tramo] > 0)
+
+    # El id del cliente desempata para que el keyset sea estable
+    principal = Cliente.nombre if orden == "nombre" else agregado.c[orden]
+    columnas = (agregado.c.id_cliente,) if orden == "id_cliente" else (principal, agregado.c.id_cliente)
+    return stmt, columnas
+
+
+def get_antiguedad(
+    db: Session,
+    corte: date,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    saldo_minimo: Optional[float] = None,
+    tramo: Optional[str] = None,
+    orden: str = "saldo_total",
+    descendente: bool = True,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Tuple]:
+    """
+    Página del reporte de antigüedad de saldos como dicts de AntiguedadClienteOut
+
+    Args:
+        db: Sesión de base de datos
+        corte: Fecha desde la que se cuentan los días de cada venta
+        cliente_id: Sólo este cliente
+        nombre: Clientes cuyo nombre contiene el texto
+        saldo_minimo: Clientes con al menos este saldo total
+        tramo: Clientes con saldo en este tramo (por ejemplo saldo_90_mas)
+        orden: Columna de orden (ver ORDENES)
+        descendente: De mayor a menor
+        limit: Clientes por página
+        cursor: Cursor de la página anterior (X-Next-Cursor)
+
+    Returns:
+        Tupla con (filas de la página, columnas de orden para el cursor siguiente)
+    """
+    stmt, columnas = _consulta(corte, cliente_id, nombre, saldo_minimo, tramo, orden)
+    filas = db.execute(paginar(stmt, columnas, limit=limit, cursor=cursor, descendente=descendente))
+    return [dict(fila._mapping) for fila in filas], columnas
+
+
+def filas_antiguedad(
+    db: Session,
+    corte: date,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    saldo_minimo: Optional[float] = None,
+    tramo: Optional[str] = None,
+    orden: str = "saldo_total",
+    descendente: bool = True,
+) -> Iterator[Tuple]:
+    """
+    Todas las filas del reporte, leídas con un cursor del lado del servidor
+    para exportarlas
+    """
+    stmt, columnas = _consulta(corte, cliente_id, nombre, saldo_minimo, tramo, orden)
+    stmt = paginar(stmt, columnas, limit=None, descendente=descendente)
+    return iter(db.execute(stmt.execution_options(yield_per=FILAS_POR_LOTE)))
+
+
+def get_totales(
+    db: Session,
+    corte: date,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    saldo_minimo: Optional[float] = None,
+    tramo: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Totales por tramo de los clientes que cumplen los filtros
+    """
+    stmt, _ = _consulta(corte, cliente_id, nombre, saldo_minimo, tramo)
+    filtrado = stmt.subquery()
+    etiquetas = [etiqueta for etiqueta, _, _ in TRAMOS] + ["saldo_total", "ventas"]
+    fila = db.execute(select(
+        func.count().label("clientes"),
+        *(func.coalesce(func.sum(filtrado.c[e]), 0).label(e) for e in etiquetas),
+    )).one()
+    totales = dict(fila._mapping)
+    for etiqueta in etiquetas[:-1]:
+        totales[etiqueta] = round(float(totales[etiqueta]), 2)
+    return totales
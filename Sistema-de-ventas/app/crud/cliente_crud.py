@@ -1,21 +1,66 @@
 # app/crud/cliente_crud.py
-from typing import List, Optional, Dict, Any
+from typing import List, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.paginacion import paginar, contar_aproximado
+from app.crud import resumen_diario_crud
 from app.models.cliente import Cliente
+from app.models.venta import Venta
 from app.schemas.cliente import ClienteCreate, ClienteUpdate
+from app.services import busqueda_service, cache_reportes_service
+
+# Columnas de orden para la paginación por cursor
+ORDEN_CLIENTES = (Cliente.id_cliente,)
 
 def get_cliente(db: Session, cliente_id: int) -> Optional[Cliente]:
     return db.query(Cliente).filter(Cliente.id_cliente == cliente_id).first()
 
 def get_cliente_by_nombre(db: Session, nombre: str) -> Optional[Cliente]:
-    return db.query(Cliente).filter(Cliente.nombre.ilike(f"%{nombre}%")).first()
+    return db.query(Cliente).filter(filtro_nombre(nombre)).first()
+
+def filtro_nombre(nombre: str):
+    """
+    Condición para filtrar clientes por nombre
+
+    Siempre es el LIKE sobre la base y no el índice de búsqueda: el índice es
+    de cada proceso y no ve hasta BUSQUEDA_RECARGA segundos los clientes que
+    crea o renombra otro worker. Sólo lo usa el autocompletado (buscar_clientes).
+    """
+    return Cliente.nombre.ilike(f"%{nombre}%")
+
+def _query_clientes(db: Session, nombre: Optional[str] = None):
+    query = db.query(Cliente)
+    if nombre:
+        query = query.filter(filtro_nombre(nombre))
+    return query
 
-def get_clientes(db: Session, skip: int = 0, limit: int = 100) -> List[Cliente]:
-    return db.query(Cliente).offset(skip).limit(limit).all()
+def get_clientes(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Cliente]:
+    return paginar(_query_clientes(db), ORDEN_CLIENTES, skip, limit, cursor).all()
 
-def search_clientes(db: Session, nombre: str) -> List[Cliente]:
-    return db.query(Cliente).filter(Cliente.nombre.ilike(f"%{nombre}%")).all()
+def search_clientes(
+    db: Session, nombre: str, skip: int = 0, limit: Optional[int] = 100, cursor: Optional[str] = None
+) -> List[Cliente]:
+    return paginar(_query_clientes(db, nombre), ORDEN_CLIENTES, skip, limit, cursor).all()
+
+def buscar_clientes(db: Session, texto: str, limit: int = 20, sin_acentos: bool = True) -> List[Cliente]:
+    """
+    Autocompletado: clientes cuyo nombre, email o teléfono contienen el texto,
+    de más a menos relevante
+    """
+    ids = None
+    if settings.BUSQUEDA_INDICE:
+        ids = busqueda_service.buscar_ids(db, "clientes", texto, limit, sin_acentos)
+    if ids is None:
+        return _query_clientes(db, texto).order_by(Cliente.nombre).limit(limit).all()
+    por_id = {c.id_cliente: c for c in db.query(Cliente).filter(Cliente.id_cliente.in_(ids))}
+    return [por_id[i] for i in ids if i in por_id]
+
+def count_clientes(db: Session, nombre: Optional[str] = None) -> int:
+    return contar_aproximado(_query_clientes(db, nombre), f"clientes:{nombre or ''}")
 
 def create_cliente(db: Session, cliente: ClienteCreate) -> Cliente:
     # Verifica si ya existe un cliente con el mismo nombre y/o correo
@@ -32,6 +77,7 @@ def create_cliente(db: Session, cliente: ClienteCreate) -> Cliente:
     db.add(db_cliente)
     db.commit()
     db.refresh(db_cliente)
+    busqueda_service.indexar_cliente(db_cliente)
     return db_cliente
 
 
@@ -45,14 +91,29 @@ def update_cliente(db: Session, cliente_id: int, cliente: ClienteUpdate) -> Opti
         setattr(db_cliente, field, value)
     
     db.add(db_cliente)
+    # El nombre del cliente aparece en los reportes
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
     db.refresh(db_cliente)
+    busqueda_service.indexar_cliente(db_cliente)
     return db_cliente
 
+def ids_ventas(db: Session, cliente_id: int) -> List[int]:
+    """
+    IDs de las ventas del cliente (se borran en cascada con él)
+    """
+    return list(db.scalars(select(Venta.id_venta).where(Venta.id_cliente == cliente_id)))
+
 def delete_cliente(db: Session, cliente_id: int) -> bool:
     db_cliente = get_cliente(db, cliente_id)
     if not db_cliente:
         return False
+    # Las ventas se borran en cascada: se descuentan de ventas_diarias en la misma transacción
+    ids = ids_ventas(db, cliente_id)
+    antes = resumen_diario_crud.foto_ventas(db, ids, bloquear=True)
     db.delete(db_cliente)
+    resumen_diario_crud.registrar_cambios(db, antes, ids)
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
+    busqueda_service.quitar("clientes", cliente_id)
     return True
\ No newline at end of file
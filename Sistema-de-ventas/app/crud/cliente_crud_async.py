@@ -0,0 +1,89 @@
+# app/crud/cliente_crud_async.py
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.paginacion import paginar, contar_aproximado_async
+from app.crud import cliente_crud, resumen_diario_crud
+from app.crud.cliente_crud import ORDEN_CLIENTES
+from app.models.cliente import Cliente
+from app.schemas.cliente import ClienteCreate, ClienteUpdate
+from app.services import busqueda_service, cache_reportes_service
+
+async def get_cliente(db: AsyncSession, cliente_id: int) -> Optional[Cliente]:
+    return await db.scalar(select(Cliente).where(Cliente.id_cliente == cliente_id))
+
+async def _select_clientes(db: AsyncSession, nombre: Optional[str] = None):
+    stmt = select(Cliente)
+    if nombre:
+        stmt = stmt.where(cliente_crud.filtro_nombre(nombre))
+    return stmt
+
+async def get_clientes(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Cliente]:
+    stmt = paginar(await _select_clientes(db), ORDEN_CLIENTES, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def search_clientes(
+    db: AsyncSession, nombre: str, skip: int = 0, limit: Optional[int] = 100, cursor: Optional[str] = None
+) -> List[Cliente]:
+    stmt = paginar(await _select_clientes(db, nombre), ORDEN_CLIENTES, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def buscar_clientes(
+    db: AsyncSession, texto: str, limit: int = 20, sin_acentos: bool = True
+) -> List[Cliente]:
+    return await db.run_sync(cliente_crud.buscar_clientes, texto, limit, sin_acentos)
+
+async def count_clientes(db: AsyncSession, nombre: Optional[str] = None) -> int:
+    stmt = await _select_clientes(db, nombre)
+    return await contar_aproximado_async(db, stmt, f"clientes:{nombre or ''}")
+
+async def create_cliente(db: AsyncSession, cliente: ClienteCreate) -> Cliente:
+    # Verifica si ya existe un cliente con el mismo nombre y/o correo
+    if cliente.email:
+        existente = await db.scalar(select(Cliente).where(Cliente.email == cliente.email))
+        if existente:
+            raise ValueError("Ya existe un cliente registrado con este correo electrónico.")
+
+    existente_nombre = await db.scalar(select(Cliente).where(Cliente.nombre == cliente.nombre))
+    if existente_nombre:
+        raise ValueError("Ya existe un cliente registrado con este nombre.")
+
+    db_cliente = Cliente(**cliente.dict())
+    db.add(db_cliente)
+    await db.commit()
+    await db.refresh(db_cliente)
+    busqueda_service.indexar_cliente(db_cliente)
+    return db_cliente
+
+async def update_cliente(db: AsyncSession, cliente_id: int, cliente: ClienteUpdate) -> Optional[Cliente]:
+    db_cliente = await get_cliente(db, cliente_id)
+    if not db_cliente:
+        return None
+    
+    update_data = cliente.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_cliente, field, value)
+    
+    # El nombre del cliente aparece en los reportes
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    await db.refresh(db_cliente)
+    busqueda_service.indexar_cliente(db_cliente)
+    return db_cliente
+
+async def delete_cliente(db: AsyncSession, cliente_id: int) -> bool:
+    db_cliente = await get_cliente(db, cliente_id)
+    if not db_cliente:
+        return False
+    # Las ventas se borran en cascada: se descuentan de ventas_diarias en la misma transacción
+    ids = await db.run_sync(cliente_crud.ids_ventas, cliente_id)
+    antes = await db.run_sync(resumen_diario_crud.foto_ventas, ids, True)
+    await db.delete(db_cliente)
+    await db.run_sync(resumen_diario_crud.registrar_cambios, antes, ids)
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    busqueda_service.quitar("clientes", cliente_id)
+    return True
@@ -1,106 +1,469 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy import String, case, false, func, insert, literal, or_, select, update
 
+from app.core.config import settings
+from app.core.paginacion import paginar, contar_aproximado
+from app.crud import cliente_crud, resumen_diario_crud
+from app.crud.venta_crud import COLUMNAS_CLIENTE, COLUMNAS_VENTA, carga_venta, detalles_planos, venta_plana
+from app.models.cliente import Cliente
 from app.models.pago import Pago
-from app.models.venta import Venta
+from app.models.venta import Venta, EstadoVenta
 from app.schemas.pago import PagoCreate, PagoUpdate
+from app.services import cache_reportes_service
+
+# Columnas de orden para la paginación por cursor
+ORDEN_PAGOS = (Pago.id_pago,)
+
+# Diferencia máxima aceptada entre el saldo guardado y el calculado (Float)
+TOLERANCIA_SALDO = 0.005
+
+def carga_pago():
+    """
+    Estrategia de carga de los endpoints que responden schemas.Pago: la venta
+    en el JOIN y, dentro de ella, lo mismo que carga_venta()
+    """
+    return (joinedload(Pago.venta).options(*carga_venta()),)
 
 def get_pago(db: Session, pago_id: int) -> Optional[Pago]:
+    # populate_existing: recarga las relaciones de un pago expirado por el commit
     return (
         db.query(Pago)
-        .options(joinedload(Pago.venta).joinedload(Venta.cliente))
+        .options(*carga_pago())
         .filter(Pago.id_pago == pago_id)
+        .populate_existing()
         .first()
     )
 
-def get_pagos(db: Session, skip: int = 0, limit: int = 100) -> List[Pago]:
-    return (
-        db.query(Pago)
-        .options(joinedload(Pago.venta).joinedload(Venta.cliente))
-        .offset(skip)
-        .limit(limit)
-        .all()
+def get_pagos(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Pago]:
+    query = db.query(Pago).options(*carga_pago())
+    return paginar(query, ORDEN_PAGOS, skip, limit, cursor).all()
+
+def get_pagos_venta(
+    db: Session,
+    venta_id: int,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Pago]:
+    query = db.query(Pago).options(*carga_pago()).filter(Pago.id_venta == venta_id)
+    return paginar(query, ORDEN_PAGOS, skip, limit, cursor).all()
+
+def filtrar_pagos(
+    stmt,
+    venta_id: Optional[int] = None,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    metodo_pago: Optional[str] = None,
+    monto_minimo: Optional[float] = None,
+    monto_maximo: Optional[float] = None,
+):
+    """
+    Aplica los filtros de búsqueda de pagos a un select() o Query
+
+    cliente_id y nombre filtran por columnas de ventas y clientes: la
+    consulta debe incluir esos JOIN (ver unir_venta_cliente).
+    """
+    if venta_id:
+        stmt = stmt.where(Pago.id_venta == venta_id)
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    if nombre:
+        stmt = stmt.where(cliente_crud.filtro_nombre(nombre))
+    # fecha_fin incluye el día completo, igual que los reportes
+    if fecha_inicio:
+        stmt = stmt.where(Pago.fecha_pago >= fecha_inicio)
+    if fecha_fin:
+        stmt = stmt.where(Pago.fecha_pago < fecha_fin + timedelta(days=1))
+    if metodo_pago:
+        stmt = stmt.where(Pago.metodo_pago == metodo_pago)
+    if monto_minimo is not None:
+        stmt = stmt.where(Pago.monto >= monto_minimo)
+    if monto_maximo is not None:
+        stmt = stmt.where(Pago.monto <= monto_maximo)
+    return stmt
+
+def unir_venta_cliente(stmt, filtros: Dict[str, Any]):
+    # Sólo se agregan los JOIN que piden los filtros
+    if filtros.get("cliente_id") or filtros.get("nombre"):
+        stmt = stmt.join(Venta, Venta.id_venta == Pago.id_venta)
+    if filtros.get("nombre"):
+        stmt = stmt.join(Cliente, Cliente.id_cliente == Venta.id_cliente)
+    return stmt
+
+def get_pagos_planos(
+    db: Session,
+    venta_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+    filtros: Optional[Dict[str, Any]] = None,
+    descendente: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Página de pagos como dicts de schemas.Pago (con su venta, cliente y
+    detalles), en dos consultas y sin hidratar objetos ORM
+
+    filtros son los de filtrar_pagos además de venta_id.
+    """
+    stmt = (
+        select(
+            Pago.id_pago, Pago.monto, Pago.metodo_pago, Pago.observaciones, Pago.fecha_pago,
+            *COLUMNAS_VENTA, *COLUMNAS_CLIENTE,
+        )
+        .select_from(Pago)
+        .outerjoin(Venta, Venta.id_venta == Pago.id_venta)
+        .outerjoin(Cliente, Cliente.id_cliente == Venta.id_cliente)
     )
+    stmt = filtrar_pagos(stmt, venta_id, **(filtros or {}))
+    filas = db.execute(paginar(stmt, ORDEN_PAGOS, skip, limit, cursor, descendente)).all()
+    # Las columnas de la venta empiezan después de las 5 del pago
+    detalles = detalles_planos(db, [fila[5] for fila in filas if fila[5] is not None])
+    return [
+        {
+            "id_venta": fila[5],
+            "monto": fila[1],
+            "metodo_pago": fila[2],
+            "observaciones": fila[3],
+            "id_pago": fila[0],
+            "fecha_pago": fila[4],
+            "venta": venta_plana(fila[5:], detalles) if fila[5] is not None else None,
+        }
+        for fila in filas
+    ]
+
+def clave_conteo(venta_id: Optional[int], filtros: Optional[Dict[str, Any]]) -> str:
+    # Un conteo guardado por combinación de filtros
+    activos = sorted((k, str(v)) for k, v in (filtros or {}).items() if v is not None)
+    return f"pagos:{venta_id or ''}" + (f":{activos}" if activos else "")
+
+def count_pagos(db: Session, venta_id: Optional[int] = None, filtros: Optional[Dict[str, Any]] = None) -> int:
+    filtros = filtros or {}
+    query = filtrar_pagos(unir_venta_cliente(db.query(Pago), filtros), venta_id, **filtros)
+    return contar_aproximado(query, clave_conteo(venta_id, filtros))
+
+def _periodo(dialecto: str, periodo: str):
+    """
+    fecha_pago truncada al día (AAAA-MM-DD) o al mes (AAAA-MM), como texto
+    """
+    if periodo not in ("dia", "mes"):
+        raise ValueError(f"Periodo {periodo} no soportado; use dia o mes")
+    if dialecto == "sqlite":
+        formato = "%Y-%m-%d" if periodo == "dia" else "%Y-%m"
+        return func.strftime(formato, Pago.fecha_pago, type_=String)
+    if dialecto == "postgresql":
+        formato = "YYYY-MM-DD" if periodo == "dia" else "YYYY-MM"
+        return func.to_char(Pago.fecha_pago, formato, type_=String)
+    formato = "%Y-%m-%d" if periodo == "dia" else "%Y-%m"
+    return func.date_format(Pago.fecha_pago, formato, type_=String)
+
+def get_totales(
+    db: Session,
+    venta_id: Optional[int] = None,
+    filtros: Optional[Dict[str, Any]] = None,
+    periodo: str = "mes",
+) -> Dict[str, Any]:
+    """
+    Cantidad y suma de los pagos que cumplen los filtros, en total, por
+    método de pago y por día o mes, agregados en la base (dos GROUP BY)
+
+    Raises:
+        ValueError: Si el periodo no es dia ni mes
+    """
+    filtros = filtros or {}
+    expresion = _periodo(db.get_bind().dialect.name, periodo).label("periodo")
+
+    def agrupar(columna):
+        stmt = unir_venta_cliente(select(columna, func.count(), func.sum(Pago.monto)).select_from(Pago), filtros)
+        stmt = filtrar_pagos(stmt, venta_id, **filtros).group_by(columna).order_by(columna)
+        return db.execute(stmt).all()
 
-def get_pagos_venta(db: Session, venta_id: int) -> List[Pago]:
+    metodos = agrupar(Pago.metodo_pago)
+    return {
+        # El total general sale de los grupos por método: no hace falta otra consulta
+        "cantidad": sum(cantidad for _, cantidad, _ in metodos),
+        "total": round(sum(total or 0 for _, _, total in metodos), 2),
+        "por_metodo": [
+            {"metodo_pago": metodo, "cantidad": cantidad, "total": round(total or 0, 2)}
+            for metodo, cantidad, total in metodos
+        ],
+        "por_periodo": [
+            {"periodo": clave, "cantidad": cantidad, "total": round(total or 0, 2)}
+            for clave, cantidad, total in agrupar(expresion)
+        ],
+    }
+
+# Columnas de la venta que necesita un pago: clave del resumen diario y montos
+COLUMNAS_SALDO = (
+    resumen_diario_crud.DIA, Venta.tipo_venta, resumen_diario_crud.ESTADO,
+    Venta.total, Venta.total_pagado, Venta.saldo_pendiente,
+)
+
+def leer_bloqueado(db: Session, stmt):
+    """
+    Ejecuta un SELECT bloqueando las filas leídas hasta el commit
+
+    En MySQL es SELECT ... FOR UPDATE. SQLite no bloquea filas: una escritura
+    vacía toma antes el bloqueo de escritura de la base, así las transacciones
+    que leen y luego escriben se ejecutan una tras otra.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(update(Venta).where(false()).values(id_venta=Venta.id_venta))
+        return db.execute(stmt)
+    return db.execute(stmt.with_for_update())
+
+def bloquear_pago(db: Session, pago_id: int) -> Optional[Pago]:
+    # populate_existing: el monto leído es el vigente, no el de la identity map
+    stmt = select(Pago).where(Pago.id_pago == pago_id).execution_options(populate_existing=True)
+    return leer_bloqueado(db, stmt).scalars().first()
+
+def estado_tras_pago(estado: EstadoVenta, saldo: float) -> EstadoVenta:
+    # Una venta cancelada no cambia de estado por sus pagos
+    if estado == EstadoVenta.cancelada:
+        return estado
+    return EstadoVenta.pagada if saldo <= 0 else EstadoVenta.pendiente
+
+def estado_esperado(saldo):
+    """
+    Versión SQL de estado_tras_pago: el estado que corresponde a la venta con ese saldo
+    """
+    return case(
+        (Venta.estado == EstadoVenta.cancelada, Venta.estado),
+        (saldo <= 0, literal(EstadoVenta.pagada, Venta.estado.type)),
+        else_=literal(EstadoVenta.pendiente, Venta.estado.type),
+    )
+
+def sentencia_saldo(venta_id: int, delta: float, estado: EstadoVenta):
+    """
+    UPDATE que suma delta al total pagado de la venta, lo resta del saldo y
+    fija el estado (calculado con la venta bloqueada)
+    """
     return (
-        db.query(Pago)
-        .options(joinedload(Pago.venta).joinedload(Venta.cliente))
-        .filter(Pago.id_venta == venta_id)
-        .all()
+        update(Venta)
+        .where(Venta.id_venta == venta_id)
+        .values({
+            Venta.estado: estado,
+            Venta.total_pagado: Venta.total_pagado + delta,
+            Venta.saldo_pendiente: Venta.saldo_pendiente - delta,
+        })
+        .execution_options(synchronize_session=False)
     )
 
-def create_pago(db: Session, pago: PagoCreate) -> Pago:
+def aplicar_monto(db: Session, venta_id: int, delta: float) -> bool:
+    """
+    Traslada delta al saldo de la venta y al resumen diario, con la venta bloqueada
+
+    Una sola lectura (SELECT ... FOR UPDATE) da el estado previo; el nuevo
+    se calcula aquí, así que bastan un UPDATE de la venta y uno del resumen.
+    Los pagos concurrentes sobre la misma venta esperan al commit de este.
+
+    Returns:
+        False si la venta no existe
+    """
+    fila = leer_bloqueado(db, select(*COLUMNAS_SALDO).where(Venta.id_venta == venta_id)).first()
+    if fila is None:
+        return False
+    dia, tipo_venta, estado, total, pagado, saldo = fila
+    nuevo_estado = estado_tras_pago(estado, (saldo or 0) - delta)
+    db.execute(sentencia_saldo(venta_id, delta, nuevo_estado))
+    if dia is not None:
+        resumen_diario_crud.sumar_diferencia(
+            db,
+            {(dia, tipo_venta, estado): [1, total or 0, pagado or 0]},
+            {(dia, tipo_venta, nuevo_estado): [1, total or 0, (pagado or 0) + delta]},
+        )
+    return True
+
+def create_pago(db: Session, pago: PagoCreate) -> Optional[Pago]:
+    """
+    Registra el pago y actualiza saldo y estado de la venta en una transacción
+
+    Returns:
+        El pago creado, o None si la venta no existe
+    """
+    if not aplicar_monto(db, pago.id_venta, pago.monto):
+        db.rollback()
+        return None
     db_pago = Pago(**pago.dict())
     db.add(db_pago)
-    
-    # Verificar si la venta está completamente pagada después de este abono
-    total_venta = db.query(Venta.total).filter(Venta.id_venta == pago.id_venta).scalar()
-    total_pagado = (
-        db.query(func.sum(Pago.monto))
-        .filter(Pago.id_venta == pago.id_venta)
-        .scalar() or 0
-    ) + pago.monto
-    
-    # Si está completamente pagada, actualizar el estado de la venta
-    if total_pagado >= total_venta:
-        db_venta = db.query(Venta).filter(Venta.id_venta == pago.id_venta).first()
-        db_venta.estado = "pagada"
-        db.add(db_venta)
-    
+    # El id sale del INSERT: leerlo tras el commit recargaría el pago expirado
+    db.flush()
+    pago_id = db_pago.id_pago
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
-    db.refresh(db_pago)
-    return db_pago
+    return get_pago(db, pago_id)
 
 def update_pago(db: Session, pago_id: int, pago: PagoUpdate) -> Optional[Pago]:
-    db_pago = get_pago(db, pago_id)
+    # El pago queda bloqueado: dos ediciones concurrentes no parten del mismo monto
+    db_pago = bloquear_pago(db, pago_id)
     if not db_pago:
+        db.rollback()
         return None
     
+    monto_anterior = db_pago.monto
+    
     # Actualizar los campos del pago
     update_data = pago.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_pago, field, value)
     
-    db.add(db_pago)
-    
-    # Si se actualizó el monto, verificar el estado de la venta
-    if "monto" in update_data:
-        venta_id = db_pago.id_venta
-        total_venta = db.query(Venta.total).filter(Venta.id_venta == venta_id).scalar()
-        total_pagado = db.query(func.sum(Pago.monto)).filter(Pago.id_venta == venta_id).scalar() or 0
-        
-        db_venta = db.query(Venta).filter(Venta.id_venta == venta_id).first()
-        if total_pagado >= total_venta:
-            db_venta.estado = "pagada"
-        else:
-            db_venta.estado = "pendiente"
-        
-        db.add(db_venta)
+    # Si cambió el monto, trasladar la diferencia al saldo de la venta
+    if "monto" in update_data and db_pago.monto != monto_anterior:
+        aplicar_monto(db, db_pago.id_venta, db_pago.monto - monto_anterior)
     
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
-    db.refresh(db_pago)
-    return db_pago
+    return get_pago(db, pago_id)
 
 def delete_pago(db: Session, pago_id: int) -> bool:
-    db_pago = get_pago(db, pago_id)
+    db_pago = bloquear_pago(db, pago_id)
     if not db_pago:
+        db.rollback()
         return False
     
-    venta_id = db_pago.id_venta
-    
+    aplicar_monto(db, db_pago.id_venta, -db_pago.monto)
     db.delete(db_pago)
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
     
-    # Recalcular el estado de la venta después de eliminar el pago
-    total_venta = db.query(Venta.total).filter(Venta.id_venta == venta_id).scalar()
-    total_pagado = db.query(func.sum(Pago.monto)).filter(Pago.id_venta == venta_id).scalar() or 0
-    
-    db_venta = db.query(Venta).filter(Venta.id_venta == venta_id).first()
-    if db_venta:
-        db_venta.estado = "pagada" if total_pagado >= total_venta else "pendiente"
-        db.add(db_venta)
-        db.commit()
-    
     return True
+
+def sentencia_recalcular_saldos(ventas_ids: List[int]):
+    """
+    UPDATE ... JOIN que recalcula total pagado, saldo y estado de varias
+    ventas a partir de SUM(pagos.monto), en una sola sentencia
+
+    Las ventas sin pagos quedan con total pagado 0 y el saldo igual al total.
+    """
+    venta = aliased(Venta)
+    pagado = (
+        select(venta.id_venta, func.coalesce(func.sum(Pago.monto), 0).label("monto"))
+        .outerjoin(Pago, Pago.id_venta == venta.id_venta)
+        .where(venta.id_venta.in_(ventas_ids))
+        .group_by(venta.id_venta)
+        .subquery()
+    )
+    return (
+        update(Venta)
+        .where(Venta.id_venta == pagado.c.id_venta)
+        .values({
+            Venta.estado: estado_esperado(Venta.total - pagado.c.monto),
+            Venta.total_pagado: pagado.c.monto,
+            Venta.saldo_pendiente: Venta.total - pagado.c.monto,
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+def create_pagos_bulk(
+    db: Session,
+    pagos: List[PagoCreate],
+    errores: Optional[Dict[int, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Importa muchos pagos en una transacción
+
+    Los pagos se insertan por lotes con executemany y luego un único UPDATE
+    por lote recalcula las ventas afectadas, sin consultas por fila.
+
+    Args:
+        db: Sesión de base de datos
+        pagos: Pagos a registrar
+        errores: Errores previos por índice (p. ej. filas del CSV que no se
+            pudieron leer); esos índices se omiten
+
+    Returns:
+        Diccionario con recibidos, creados, ventas_actualizadas y errores
+    """
+    errores = dict(errores or {})
+    lote = settings.PAGOS_BULK_LOTE
+    validos = [(i, pago) for i, pago in enumerate(pagos) if pago is not None and i not in errores]
+
+    existentes = set()
+    ids_ventas = sorted({pago.id_venta for _, pago in validos})
+    for inicio in range(0, len(ids_ventas), lote):
+        existentes.update(db.scalars(
+            select(Venta.id_venta).where(Venta.id_venta.in_(ids_ventas[inicio:inicio + lote]))
+        ))
+
+    filas = []
+    for i, pago in validos:
+        if pago.id_venta not in existentes:
+            errores[i] = f"Venta {pago.id_venta} no encontrada"
+        elif pago.monto <= 0:
+            errores[i] = "El monto debe ser mayor que cero"
+        else:
+            filas.append(pago.model_dump())
+
+    afectadas = sorted({fila["id_venta"] for fila in filas})
+    antes = resumen_diario_crud.foto_ventas(db, afectadas, bloquear=True)
+    for inicio in range(0, len(filas), lote):
+        db.execute(insert(Pago.__table__), filas[inicio:inicio + lote])
+    for inicio in range(0, len(afectadas), lote):
+        db.execute(sentencia_recalcular_saldos(afectadas[inicio:inicio + lote]))
+    resumen_diario_crud.registrar_cambios(db, antes, afectadas)
+    cache_reportes_service.registrar_cambio(db)
+    db.commit()
+
+    return {
+        "recibidos": len(pagos),
+        "creados": len(filas),
+        "ventas_actualizadas": len(afectadas),
+        "errores": [{"indice": i, "error": errores[i]} for i in sorted(errores)],
+    }
+
+def verificar_saldos(db: Session, corregir: bool = False) -> List[dict]:
+    """
+    Compara total_pagado/saldo_pendiente/estado de cada venta contra SUM(pagos.monto)
+
+    Devuelve las ventas con diferencias y, si corregir es True, las recalcula
+    con sentencia_recalcular_saldos (el mismo UPDATE que la importación de pagos).
+    """
+    pagado = (
+        db.query(Pago.id_venta, func.sum(Pago.monto).label("monto"))
+        .group_by(Pago.id_venta)
+        .subquery()
+    )
+    real = func.coalesce(pagado.c.monto, 0)
+    estado_real = estado_esperado(Venta.total - real)
+    filas = (
+        db.query(
+            Venta.id_venta, Venta.total, Venta.total_pagado, Venta.saldo_pendiente, Venta.estado,
+            real.label("real"), estado_real.label("estado_real"),
+        )
+        .outerjoin(pagado, pagado.c.id_venta == Venta.id_venta)
+        .filter(or_(
+            func.abs(Venta.total_pagado - real) > TOLERANCIA_SALDO,
+            func.abs(Venta.saldo_pendiente - (Venta.total - real)) > TOLERANCIA_SALDO,
+            Venta.estado != estado_real,
+        ))
+        .all()
+    )
+
+    diferencias = [
+        {
+            "id_venta": fila.id_venta,
+            "total_pagado": fila.total_pagado,
+            "saldo_pendiente": fila.saldo_pendiente,
+            "estado": fila.estado.value,
+            "total_pagado_real": fila.real,
+            "saldo_pendiente_real": fila.total - fila.real,
+            "estado_real": fila.estado_real.value,
+        }
+        for fila in filas
+    ]
+
+    if corregir and diferencias:
+        ids = [item["id_venta"] for item in diferencias]
+        antes = resumen_diario_crud.foto_ventas(db, ids, bloquear=True)
+        for inicio in range(0, len(ids), settings.PAGOS_BULK_LOTE):
+            db.execute(sentencia_recalcular_saldos(ids[inicio:inicio + settings.PAGOS_BULK_LOTE]))
+        resumen_diario_crud.registrar_cambios(db, antes, ids)
+        cache_reportes_service.registrar_cambio(db)
+        db.commit()
+
+    return diferencias
@@ -0,0 +1,118 @@
+# app/crud/pago_crud_async.py
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.paginacion import paginar, contar_aproximado_async
+from app.crud import pago_crud
+from app.crud.pago_crud import ORDEN_PAGOS, carga_pago
+from app.models.pago import Pago
+from app.schemas.pago import PagoCreate, PagoUpdate
+from app.services import cache_reportes_service
+
+def _select_pagos(venta_id: Optional[int] = None):
+    # La venta de cada pago se serializa con su cliente y detalles
+    stmt = select(Pago).options(*carga_pago())
+    if venta_id:
+        stmt = stmt.where(Pago.id_venta == venta_id)
+    return stmt
+
+async def get_pago(db: AsyncSession, pago_id: int) -> Optional[Pago]:
+    return await db.scalar(_select_pagos().where(Pago.id_pago == pago_id))
+
+async def get_pagos(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Pago]:
+    stmt = paginar(_select_pagos(), ORDEN_PAGOS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def get_pagos_planos(
+    db: AsyncSession,
+    venta_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+    filtros: Optional[Dict[str, Any]] = None,
+    descendente: bool = False,
+) -> List[Dict[str, Any]]:
+    # La proyección plana de pago_crud, sobre la conexión asíncrona
+    return await db.run_sync(
+        pago_crud.get_pagos_planos, venta_id, skip, limit, cursor, filtros, descendente
+    )
+
+async def get_totales(
+    db: AsyncSession,
+    venta_id: Optional[int] = None,
+    filtros: Optional[Dict[str, Any]] = None,
+    periodo: str = "mes",
+) -> Dict[str, Any]:
+    return await db.run_sync(pago_crud.get_totales, venta_id, filtros, periodo)
+
+async def get_pagos_venta(
+    db: AsyncSession,
+    venta_id: int,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Pago]:
+    stmt = paginar(_select_pagos(venta_id), ORDEN_PAGOS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def count_pagos(
+    db: AsyncSession, venta_id: Optional[int] = None, filtros: Optional[Dict[str, Any]] = None
+) -> int:
+    filtros = filtros or {}
+    stmt = pago_crud.unir_venta_cliente(select(Pago), filtros)
+    stmt = pago_crud.filtrar_pagos(stmt, venta_id, **filtros)
+    return await contar_aproximado_async(db, stmt, pago_crud.clave_conteo(venta_id, filtros))
+
+async def create_pago(db: AsyncSession, pago: PagoCreate) -> Optional[Pago]:
+    # Igual que pago_crud.create_pago: la venta bloqueada una vez, un UPDATE
+    # de saldo y estado y uno del resumen diario
+    if not await db.run_sync(pago_crud.aplicar_monto, pago.id_venta, pago.monto):
+        await db.rollback()
+        return None
+    db_pago = Pago(**pago.dict())
+    db.add(db_pago)
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    return await _recargar(db, db_pago.id_pago)
+
+async def update_pago(db: AsyncSession, pago_id: int, pago: PagoUpdate) -> Optional[Pago]:
+    db_pago = await db.run_sync(pago_crud.bloquear_pago, pago_id)
+    if not db_pago:
+        await db.rollback()
+        return None
+    
+    monto_anterior = db_pago.monto
+    
+    # Actualizar los campos del pago
+    update_data = pago.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_pago, field, value)
+    
+    # Si cambió el monto, trasladar la diferencia al saldo de la venta
+    if "monto" in update_data and db_pago.monto != monto_anterior:
+        await db.run_sync(pago_crud.aplicar_monto, db_pago.id_venta, db_pago.monto - monto_anterior)
+    
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    return await _recargar(db, pago_id)
+
+async def delete_pago(db: AsyncSession, pago_id: int) -> bool:
+    db_pago = await db.run_sync(pago_crud.bloquear_pago, pago_id)
+    if not db_pago:
+        await db.rollback()
+        return False
+    
+    await db.run_sync(pago_crud.aplicar_monto, db_pago.id_venta, -db_pago.monto)
+    await db.delete(db_pago)
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    
+    return True
+
+async def _recargar(db: AsyncSession, pago_id: int) -> Optional[Pago]:
+    # El UPDATE de saldo no sincroniza la sesión: se vuelve a leer la venta
+    stmt = _select_pagos().where(Pago.id_pago == pago_id).execution_options(populate_existing=True)
+    return await db.scalar(stmt)
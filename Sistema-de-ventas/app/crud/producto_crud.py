@@ -2,26 +2,75 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.paginacion import paginar, contar_aproximado
 from app.models.producto import Producto
 from app.schemas.producto import ProductoCreate, ProductoUpdate
+from app.services import busqueda_service, catalogo_service
+
+# Columnas de orden para la paginación por cursor
+ORDEN_PRODUCTOS = (Producto.id_producto,)
 
 def get_producto(db: Session, producto_id: int) -> Optional[Producto]:
     return db.query(Producto).filter(Producto.id_producto == producto_id).first()
 
-def get_productos(db: Session, skip: int = 0, limit: int = 100, activo: Optional[bool] = None) -> List[Producto]:
+def filtro_nombre(nombre: str):
+    """
+    Condición para filtrar productos por nombre; LIKE sobre la base, igual
+    que cliente_crud.filtro_nombre (el índice es sólo para buscar_productos)
+    """
+    return Producto.nombre.ilike(f"%{nombre}%")
+
+def _query_productos(db: Session, activo: Optional[bool] = None, nombre: Optional[str] = None):
     query = db.query(Producto)
     if activo is not None:
         query = query.filter(Producto.activo == activo)
-    return query.offset(skip).limit(limit).all()
+    if nombre:
+        query = query.filter(filtro_nombre(nombre))
+    return query
+
+def get_productos(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    activo: Optional[bool] = None,
+    cursor: Optional[str] = None,
+) -> List[Producto]:
+    return paginar(_query_productos(db, activo), ORDEN_PRODUCTOS, skip, limit, cursor).all()
+
+def search_productos(
+    db: Session, nombre: str, skip: int = 0, limit: Optional[int] = 100, cursor: Optional[str] = None
+) -> List[Producto]:
+    return paginar(_query_productos(db, nombre=nombre), ORDEN_PRODUCTOS, skip, limit, cursor).all()
+
+def buscar_productos(
+    db: Session, texto: str, limit: int = 20, sin_acentos: bool = True, activo: Optional[bool] = True
+) -> List[Producto]:
+    """
+    Autocompletado: productos cuyo nombre o descripción contienen el texto,
+    de más a menos relevante
+    """
+    ids = None
+    if settings.BUSQUEDA_INDICE:
+        filtro = None if activo is None else (lambda es_activo: bool(es_activo) == activo)
+        ids = busqueda_service.buscar_ids(db, "productos", texto, limit, sin_acentos, filtro=filtro)
+    if ids is None:
+        return _query_productos(db, activo, texto).order_by(Producto.nombre).limit(limit).all()
+    por_id = {p.id_producto: p for p in db.query(Producto).filter(Producto.id_producto.in_(ids))}
+    return [por_id[i] for i in ids if i in por_id]
 
-def search_productos(db: Session, nombre: str) -> List[Producto]:
-    return db.query(Producto).filter(Producto.nombre.ilike(f"%{nombre}%")).all()
+def count_productos(db: Session, activo: Optional[bool] = None, nombre: Optional[str] = None) -> int:
+    clave = f"productos:{activo}:{nombre or ''}"
+    return contar_aproximado(_query_productos(db, activo, nombre), clave)
 
 def create_producto(db: Session, producto: ProductoCreate) -> Producto:
     db_producto = Producto(**producto.dict())
     db.add(db_producto)
+    catalogo_service.registrar_cambio(db)
     db.commit()
+    catalogo_service.invalidar()
     db.refresh(db_producto)
+    busqueda_service.indexar_producto(db_producto)
     return db_producto
 
 def update_producto(db: Session, producto_id: int, producto: ProductoUpdate) -> Optional[Producto]:
@@ -34,8 +83,11 @@ def update_producto(db: Session, producto_id: int, producto: ProductoUpdate) ->
         setattr(db_producto, field, value)
     
     db.add(db_producto)
+    catalogo_service.registrar_cambio(db)
     db.commit()
+    catalogo_service.invalidar()
     db.refresh(db_producto)
+    busqueda_service.indexar_producto(db_producto)
     return db_producto
 
 def delete_producto(db: Session, producto_id: int) -> bool:
@@ -46,5 +98,8 @@ def delete_producto(db: Session, producto_id: int) -> bool:
     # En lugar de eliminar físicamente, marcamos como inactivo
     db_producto.activo = False
     db.add(db_producto)
+    catalogo_service.registrar_cambio(db)
     db.commit()
+    catalogo_service.invalidar()
+    busqueda_service.indexar_producto(db_producto)
     return True
\ No newline at end of file
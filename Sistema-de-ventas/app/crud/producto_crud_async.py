@@ -0,0 +1,90 @@
+# app/crud/producto_crud_async.py
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.paginacion import paginar, contar_aproximado_async
+from app.crud import producto_crud
+from app.crud.producto_crud import ORDEN_PRODUCTOS
+from app.models.producto import Producto
+from app.schemas.producto import ProductoCreate, ProductoUpdate
+from app.services import busqueda_service, catalogo_service
+
+async def get_producto(db: AsyncSession, producto_id: int) -> Optional[Producto]:
+    return await db.scalar(select(Producto).where(Producto.id_producto == producto_id))
+
+async def _select_productos(
+    db: AsyncSession, activo: Optional[bool] = None, nombre: Optional[str] = None
+):
+    stmt = select(Producto)
+    if activo is not None:
+        stmt = stmt.where(Producto.activo == activo)
+    if nombre:
+        stmt = stmt.where(producto_crud.filtro_nombre(nombre))
+    return stmt
+
+async def get_productos(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    activo: Optional[bool] = None,
+    cursor: Optional[str] = None,
+) -> List[Producto]:
+    stmt = paginar(await _select_productos(db, activo), ORDEN_PRODUCTOS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def search_productos(
+    db: AsyncSession, nombre: str, skip: int = 0, limit: Optional[int] = 100, cursor: Optional[str] = None
+) -> List[Producto]:
+    stmt = paginar(await _select_productos(db, nombre=nombre), ORDEN_PRODUCTOS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def count_productos(
+    db: AsyncSession, activo: Optional[bool] = None, nombre: Optional[str] = None
+) -> int:
+    clave = f"productos:{activo}:{nombre or ''}"
+    return await contar_aproximado_async(db, await _select_productos(db, activo, nombre), clave)
+
+async def buscar_productos(
+    db: AsyncSession, texto: str, limit: int = 20, sin_acentos: bool = True, activo: Optional[bool] = True
+) -> List[Producto]:
+    return await db.run_sync(producto_crud.buscar_productos, texto, limit, sin_acentos, activo)
+
+async def create_producto(db: AsyncSession, producto: ProductoCreate) -> Producto:
+    db_producto = Producto(**producto.dict())
+    db.add(db_producto)
+    await db.run_sync(catalogo_service.registrar_cambio)
+    await db.commit()
+    catalogo_service.invalidar()
+    await db.refresh(db_producto)
+    busqueda_service.indexar_producto(db_producto)
+    return db_producto
+
+async def update_producto(db: AsyncSession, producto_id: int, producto: ProductoUpdate) -> Optional[Producto]:
+    db_producto = await get_producto(db, producto_id)
+    if not db_producto:
+        return None
+    
+    update_data = producto.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_producto, field, value)
+    
+    await db.run_sync(catalogo_service.registrar_cambio)
+    await db.commit()
+    catalogo_service.invalidar()
+    await db.refresh(db_producto)
+    busqueda_service.indexar_producto(db_producto)
+    return db_producto
+
+async def delete_producto(db: AsyncSession, producto_id: int) -> bool:
+    db_producto = await get_producto(db, producto_id)
+    if not db_producto:
+        return False
+    
+    # En lugar de eliminar físicamente, marcamos como inactivo
+    db_producto.activo = False
+    await db.run_sync(catalogo_service.registrar_cambio)
+    await db.commit()
+    catalogo_service.invalidar()
+    busqueda_service.indexar_producto(db_producto)
+    return True
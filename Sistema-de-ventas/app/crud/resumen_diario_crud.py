@@ -0,0 +1,224 @@
+# app/crud/resumen_diario_crud.py
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, case, delete, func, insert, literal, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.venta import Venta, TipoVenta, EstadoVenta
+from app.models.venta_diaria import VentaDiaria
+
+# Ids por consulta al tomar la foto de muchas ventas
+LOTE_IDS = 1000
+
+# (dia, tipo_venta, estado) -> [cantidad, total, total_pagado]
+Clave = Tuple[date, TipoVenta, EstadoVenta]
+Aportes = Dict[Clave, List[float]]
+
+DIA = func.date(Venta.fecha_venta, type_=Date)
+# Una venta con estado NULL cuenta como pendiente (el default del modelo)
+ESTADO = func.coalesce(Venta.estado, literal(EstadoVenta.pendiente, Venta.estado.type))
+
+
+def _agregados():
+    return select(
+        DIA, Venta.tipo_venta, ESTADO,
+        func.count(), func.sum(Venta.total), func.sum(Venta.total_pagado),
+    ).where(Venta.fecha_venta.isnot(None)).group_by(DIA, Venta.tipo_venta, ESTADO)
+
+
+def foto_ventas(db: Session, ids: Iterable[int], bloquear: bool = False) -> Aportes:
+    """
+    Aporte actual de las ventas dadas a cada fila de ventas_diarias
+
+    Se toma antes y después de modificar las ventas; la diferencia es lo que
+    hay que sumar al resumen.
+
+    Args:
+        db: Sesión de base de datos
+        ids: IDs de las ventas que se van a modificar (o que se acaban de crear)
+        bloquear: Bloquear las ventas (SELECT ... FOR UPDATE) hasta el commit,
+            para que dos escrituras concurrentes no partan de la misma foto
+
+    Returns:
+        Diccionario (dia, tipo_venta, estado) -> [cantidad, total, total_pagado]
+    """
+    ids = sorted(set(ids))
+    aportes: Aportes = {}
+    for inicio in range(0, len(ids), LOTE_IDS):
+        parte = ids[inicio:inicio + LOTE_IDS]
+        if bloquear and db.get_bind().dialect.name != "sqlite":
+            db.execute(select(Venta.id_venta).where(Venta.id_venta.in_(parte)).with_for_update())
+        for dia, tipo_venta, estado, cantidad, total, pagado in db.execute(
+            _agregados().where(Venta.id_venta.in_(parte))
+        ):
+            acumulado = aportes.setdefault((dia, tipo_venta, estado), [0, 0.0, 0.0])
+            acumulado[0] += cantidad
+            acumulado[1] += total or 0
+            acumulado[2] += pagado or 0
+    return aportes
+
+
+def _sentencia_sumar(db: Session, filas: List[Dict[str, Any]]):
+    # INSERT ... ON DUPLICATE KEY / ON CONFLICT que suma sobre la fila existente
+    tabla = VentaDiaria.__table__
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "mysql":
+        stmt = mysql.insert(tabla).values(filas)
+        nuevos = stmt.inserted
+        return stmt.on_duplicate_key_update(
+            cantidad=tabla.c.cantidad + nuevos.cantidad,
+            total=tabla.c.total + nuevos.total,
+            total_pagado=tabla.c.total_pagado + nuevos.total_pagado,
+        )
+    insertar = sqlite.insert if dialecto == "sqlite" else postgresql.insert
+    stmt = insertar(tabla).values(filas)
+    return stmt.on_conflict_do_update(
+        index_elements=[tabla.c.dia, tabla.c.tipo_venta, tabla.c.estado],
+        set_={
+            "cantidad": tabla.c.cantidad + stmt.excluded.cantidad,
+            "total": tabla.c.total + stmt.excluded.total,
+            "total_pagado": tabla.c.total_pagado + stmt.excluded.total_pagado,
+        },
+    )
+
+
+def registrar_cambios(db: Session, antes: Aportes, ids: Iterable[int]) -> None:
+    """
+    Suma a ventas_diarias la diferencia entre la foto previa y el estado actual
+    de las ventas, en la transacción en curso
+
+    Args:
+        db: Sesión de base de datos
+        antes: Resultado de foto_ventas antes de la escritura ({} para ventas nuevas)
+        ids: IDs de las ventas modificadas, creadas o borradas
+    """
+    db.flush()
+    sumar_diferencia(db, antes, foto_ventas(db, ids))
+
+
+def sumar_diferencia(db: Session, antes: Aportes, despues: Aportes) -> None:
+    """
+    Suma a ventas_diarias la diferencia entre dos fotos, en una sola sentencia
+
+    Para quien ya conoce el estado previo y el nuevo de las ventas (p. ej.
+    un pago con la venta bloqueada) y no necesita volver a leerlas.
+    """
+    diferencia: Dict[Clave, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    for signo, aportes in ((-1, antes), (1, despues)):
+        for clave, (cantidad, total, pagado) in aportes.items():
+            acumulado = diferencia[clave]
+            acumulado[0] += signo * cantidad
+            acumulado[1] += signo * total
+            acumulado[2] += signo * pagado
+
+    filas = [
+        {"dia": dia, "tipo_venta": tipo, "estado": estado, "cantidad": c, "total": t, "total_pagado": p}
+        for (dia, tipo, estado), (c, t, p) in sorted(diferencia.items(), key=lambda item: str(item[0]))
+        if c or t or p
+    ]
+    if filas:
+        db.execute(_sentencia_sumar(db, filas))
+
+
+def _rango(query, columna, fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    if fecha_inicio:
+        query = query.where(columna >= fecha_inicio)
+    if fecha_fin:
+        query = query.where(columna <= fecha_fin)
+    return query
+
+
+def reconstruir(db: Session, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> int:
+    """
+    Recalcula ventas_diarias desde la tabla de ventas, para todo el historial
+    o sólo para los días del rango (ambos inclusive)
+
+    Returns:
+        Cantidad de filas (día, tipo, estado) escritas
+    """
+    tabla = VentaDiaria.__table__
+    db.execute(_rango(delete(tabla), tabla.c.dia, fecha_inicio, fecha_fin))
+
+    # El rango se aplica sobre fecha_venta (no sobre DATE(...)) para usar su índice
+    agregados = _agregados()
+    if fecha_inicio:
+        agregados = agregados.where(Venta.fecha_venta >= fecha_inicio)
+    if fecha_fin:
+        agregados = agregados.where(Venta.fecha_venta < fecha_fin + timedelta(days=1))
+    resultado = db.execute(insert(tabla).from_select(
+        ["dia", "tipo_venta", "estado", "cantidad", "total", "total_pagado"], agregados
+    ))
+    db.commit()
+    return resultado.rowcount
+
+
+def _filtrar(query, fecha_inicio, fecha_fin, tipo_venta, estado):
+    query = _rango(query, VentaDiaria.dia, fecha_inicio, fecha_fin)
+    if tipo_venta:
+        query = query.where(VentaDiaria.tipo_venta == tipo_venta)
+    if estado:
+        query = query.where(VentaDiaria.estado == estado)
+    return query
+
+
+def _sumas():
+    return (
+        func.coalesce(func.sum(VentaDiaria.cantidad), 0),
+        func.coalesce(func.sum(VentaDiaria.total), 0),
+        func.coalesce(func.sum(VentaDiaria.total_pagado), 0),
+        func.coalesce(func.sum(case((VentaDiaria.tipo_venta == TipoVenta.contado, VentaDiaria.total), else_=0)), 0),
+        func.coalesce(func.sum(case((VentaDiaria.tipo_venta == TipoVenta.credito, VentaDiaria.total), else_=0)), 0),
+    )
+
+
+def get_resumen_diario(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Totales por día del rango (ambos inclusive), leídos del resumen
+
+    El costo depende de la cantidad de días, no de la de ventas.
+    """
+    query = _filtrar(select(VentaDiaria.dia, *_sumas()), fecha_inicio, fecha_fin, tipo_venta, estado)
+    filas = db.execute(query.group_by(VentaDiaria.dia).order_by(VentaDiaria.dia))
+    return [
+        {
+            "dia": dia,
+            "cantidad": cantidad,
+            "total": total,
+            "total_pagado": pagado,
+            "saldo_pendiente": total - pagado,
+            "total_contado": contado,
+            "total_credito": credito,
+        }
+        for dia, cantidad, total, pagado, contado, credito in filas
+        if cantidad
+    ]
+
+
+def get_totales(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Totales del rango completo (ambos inclusive), como los usa el reporte de ventas
+    """
+    query = _filtrar(select(*_sumas()), fecha_inicio, fecha_fin, tipo_venta, estado)
+    cantidad, total, pagado, contado, credito = db.execute(query).one()
+    return {
+        "cantidad": cantidad,
+        "total_ventas": total,
+        "total_pagado": pagado,
+        "total_contado": contado,
+        "total_credito": credito,
+    }
@@ -0,0 +1,124 @@
+# app/crud/saldo_crud.py
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.paginacion import paginar
+from app.crud import cliente_crud
+from app.models.cliente import Cliente
+from app.models.venta import Venta
+
+# Columnas de ReporteSaldoOut: las etiquetas son las claves de cada dict y
+# también sirven como columnas de orden del cursor
+ESTADO_PAGO = case((Venta.saldo_pendiente <= 0, "Pagado"), else_="Pendiente").label("estado_pago")
+COLUMNAS_SALDOS = (
+    Venta.id_venta,
+    Venta.id_cliente,
+    Cliente.nombre.label("nombre_cliente"),
+    Venta.fecha_venta,
+    Venta.tipo_venta,
+    Venta.total.label("total_venta"),
+    Venta.total_pagado,
+    Venta.saldo_pendiente,
+    ESTADO_PAGO,
+)
+ORDENES = {columna.key: columna for columna in COLUMNAS_SALDOS[:-1] if columna.key != "tipo_venta"}
+
+
+def _filtrar(
+    stmt,
+    cliente_id: Optional[int] = None,
+    nombre: Optional[str] = None,
+    tipo_venta: Optional[str] = None,
+    estado_pago: Optional[str] = None,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    saldo_minimo: Optional[float] = None,
+):
+    """
+    Aplica los filtros del reporte de saldos; todos son condiciones sobre
+    columnas de ventas o clientes que pueden usar sus índices
+    """
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    if nombre:
+        stmt = stmt.where(cliente_crud.filtro_nombre(nombre))
+    if tipo_venta:
+        stmt = stmt.where(Venta.tipo_venta == tipo_venta)
+    # Se filtra por el saldo y no por la etiqueta calculada
+    if estado_pago == "Pagado":
+        stmt = stmt.where(Venta.saldo_pendiente <= 0)
+    elif estado_pago == "Pendiente":
+        stmt = stmt.where(Venta.saldo_pendiente > 0)
+    elif estado_pago is not None:
+        raise ValueError(f"Estado de pago {estado_pago} no soportado; use Pagado o Pendiente")
+    # fecha_fin incluye el día completo, igual que el reporte de ventas
+    if fecha_inicio:
+        stmt = stmt.where(Venta.fecha_venta >= fecha_inicio)
+    if fecha_fin:
+        stmt = stmt.where(Venta.fecha_venta < fecha_fin + timedelta(days=1))
+    if saldo_minimo is not None:
+        stmt = stmt.where(Venta.saldo_pendiente >= saldo_minimo)
+    return stmt
+
+
+def columnas_orden(orden: str = "id_venta") -> Tuple:
+    """
+    Columnas de orden del cursor; id_venta desempata
+
+    Raises:
+        ValueError: Si el orden no existe
+    """
+    if orden not in ORDENES:
+        raise ValueError(f"Orden {orden} no soportado; use uno de {', '.join(ORDENES)}")
+    if orden == "id_venta":
+        return (Venta.id_venta,)
+    return (ORDENES[orden], Venta.id_venta)
+
+
+def get_saldos(
+    db: Session,
+    filtros: Dict[str, Any],
+    orden: str = "id_venta",
+    descendente: bool = False,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Página de saldos por venta como dicts de ReporteSaldoOut
+
+    Args:
+        db: Sesión de base de datos
+        filtros: cliente_id, nombre, tipo_venta, estado_pago, fecha_inicio,
+            fecha_fin y saldo_minimo (ver _filtrar)
+        orden: Columna de orden (ver ORDENES)
+        descendente: De mayor a menor
+        limit: Ventas por página
+        cursor: Cursor de la página anterior (X-Next-Cursor)
+    """
+    columnas = columnas_orden(orden)
+    stmt = _filtrar(select(*COLUMNAS_SALDOS).join(Cliente, Venta.id_cliente == Cliente.id_cliente), **filtros)
+    filas = db.execute(paginar(stmt, columnas, limit=limit, cursor=cursor, descendente=descendente))
+    return [dict(fila._mapping) for fila in filas]
+
+
+def get_totales(db: Session, filtros: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Totales de todas las ventas que cumplen los filtros (pie del reporte)
+    """
+    stmt = select(
+        func.count().label("ventas"),
+        func.coalesce(func.sum(Venta.total), 0).label("total_venta"),
+        func.coalesce(func.sum(Venta.total_pagado), 0).label("total_pagado"),
+        func.coalesce(func.sum(Venta.saldo_pendiente), 0).label("saldo_pendiente"),
+    )
+    # El JOIN con clientes sólo hace falta para filtrar por nombre
+    if filtros.get("nombre"):
+        stmt = stmt.join(Cliente, Venta.id_cliente == Cliente.id_cliente)
+    fila = db.execute(_filtrar(stmt, **filtros)).one()
+    totales = dict(fila._mapping)
+    for clave in ("total_venta", "total_pagado", "saldo_pendiente"):
+        totales[clave] = round(float(totales[clave]), 2)
+    return totales
@@ -1,25 +1,198 @@
 # app/crud/venta_crud.py
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from typing import List, Optional, Dict, Any, Sequence
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import Select, insert, select, text
 
-from app.models.venta import Venta, TipoVenta, EstadoVenta
+from app.core.config import settings
+from app.core.paginacion import paginar, contar_aproximado
+from app.crud import resumen_diario_crud
+from app.models.venta import Venta, EstadoVenta
 from app.models.detalle_venta import DetalleVenta
-from app.models.pago import Pago
 from app.models.cliente import Cliente
+from app.models.producto import Producto
 from app.schemas.venta import VentaCreate, VentaUpdate
+from app.services import cache_reportes_service
 
-def get_ventas(db: Session, skip: int = 0, limit: int = 100) -> List[Venta]:
-    return db.query(Venta).options(joinedload(Venta.cliente)).offset(skip).limit(limit).all()
+# Columnas de orden para la paginación por cursor
+ORDEN_VENTAS = (Venta.id_venta,)
+
+def carga_venta():
+    """
+    Estrategia de carga de los endpoints que responden schemas.Venta
+
+    Lo que serializa el response_model (cliente, detalles y el producto de
+    cada detalle) se trae por adelantado, en una cantidad de consultas que no
+    depende del tamaño de la página: el cliente en el JOIN (muchos a uno) y
+    los detalles con su producto en un SELECT ... IN aparte, para no
+    multiplicar las filas de cada venta.
+    """
+    return (
+        joinedload(Venta.cliente),
+        selectinload(Venta.detalles).joinedload(DetalleVenta.producto),
+    )
+
+def get_ventas(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Venta]:
+    query = db.query(Venta).options(*carga_venta())
+    return paginar(query, ORDEN_VENTAS, skip, limit, cursor).all()
 
 def get_venta(db: Session, venta_id: int) -> Optional[Venta]:
-    return db.query(Venta).filter(Venta.id_venta == venta_id).first()
+    # populate_existing: tras un commit la venta sigue en la sesión (expirada)
+    # y sin esto sus relaciones se volverían a cargar de forma perezosa
+    return (
+        db.query(Venta)
+        .options(*carga_venta())
+        .filter(Venta.id_venta == venta_id)
+        .populate_existing()
+        .first()
+    )
+
+def get_ventas_cliente(
+    db: Session,
+    cliente_id: int,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Venta]:
+    query = db.query(Venta).options(*carga_venta()).filter(Venta.id_cliente == cliente_id)
+    return paginar(query, ORDEN_VENTAS, skip, limit, cursor).all()
+
+# Proyecciones planas de los listados grandes: columnas sueltas en lugar de
+# objetos ORM y dicts con la forma (y el orden de claves) de los schemas,
+# listos para json_rapido.serializar sin pasar por el response_model
+
+# Ventas por SELECT ... IN al traer los detalles (como selectinload)
+LOTE_IN = 500
+
+COLUMNAS_VENTA = (
+    Venta.id_venta, Venta.id_cliente, Venta.fecha_venta, Venta.tipo_venta, Venta.estado,
+    Venta.total, Venta.total_pagado, Venta.saldo_pendiente,
+)
+COLUMNAS_CLIENTE = (
+    Cliente.id_cliente, Cliente.nombre, Cliente.telefono, Cliente.email, Cliente.direccion,
+    Cliente.fecha_registro,
+)
+_COLUMNAS_DETALLE = (
+    DetalleVenta.id_detalle, DetalleVenta.id_venta, DetalleVenta.id_producto, DetalleVenta.cantidad,
+    DetalleVenta.precio_unitario, DetalleVenta.subtotal, DetalleVenta.fecha_entrega,
+    Producto.id_producto, Producto.nombre, Producto.descripcion, Producto.precio_unitario, Producto.activo,
+)
+
+def select_ventas_planas() -> Select:
+    """
+    SELECT de las columnas de la venta y de su cliente, en el orden que espera venta_plana
+    """
+    return (
+        select(*COLUMNAS_VENTA, *COLUMNAS_CLIENTE)
+        .select_from(Venta)
+        .outerjoin(Cliente, Cliente.id_cliente == Venta.id_cliente)
+    )
+
+def detalles_planos(db: Session, ids_ventas: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Detalles (con su producto) de las ventas dadas, agrupados por venta
+
+    Returns:
+        Diccionario id_venta -> lista de detalles con la forma de schemas.DetalleVenta
+    """
+    por_venta: Dict[int, List[Dict[str, Any]]] = {}
+    ids = sorted(set(ids_ventas))
+    for inicio in range(0, len(ids), LOTE_IN):
+        stmt = (
+            select(*_COLUMNAS_DETALLE)
+            .outerjoin(Producto, Producto.id_producto == DetalleVenta.id_producto)
+            .where(DetalleVenta.id_venta.in_(ids[inicio:inicio + LOTE_IN]))
+            .order_by(DetalleVenta.id_detalle)
+        )
+        for (
+            id_detalle, id_venta, id_producto, cantidad, precio_unitario, subtotal, fecha_entrega,
+            p_id, p_nombre, p_descripcion, p_precio, p_activo,
+        ) in db.execute(stmt).tuples():
+            por_venta.setdefault(id_venta, []).append({
+                "id_producto": id_producto,
+                "cantidad": cantidad,
+                "precio_unitario": precio_unitario,
+                "subtotal": subtotal,
+                "fecha_entrega": fecha_entrega,
+                "id_detalle": id_detalle,
+                "id_venta": id_venta,
+                "producto": None if p_id is None else {
+                    "nombre": p_nombre,
+                    "descripcion": p_descripcion,
+                    "precio_unitario": p_precio,
+                    "activo": p_activo,
+                    "id_producto": p_id,
+                },
+            })
+    return por_venta
 
-def get_ventas(db: Session, skip: int = 0, limit: int = 100) -> List[Venta]:
-    return db.query(Venta).offset(skip).limit(limit).all()
+def venta_plana(fila: Sequence[Any], detalles: Dict[int, List[Dict[str, Any]]], con_saldo: bool = False) -> Dict[str, Any]:
+    """
+    Arma el dict de schemas.Venta (o VentaConSaldo) desde las columnas
+    COLUMNAS_VENTA + COLUMNAS_CLIENTE de una fila
+    """
+    (
+        id_venta, id_cliente, fecha_venta, tipo_venta, estado, total, total_pagado, saldo_pendiente,
+        c_id, c_nombre, c_telefono, c_email, c_direccion, c_fecha_registro,
+    ) = fila
+    venta = {
+        "id_cliente": id_cliente,
+        "tipo_venta": tipo_venta.value,
+        "estado": estado.value if estado is not None else None,
+        "total": total,
+        "id_venta": id_venta,
+        "fecha_venta": fecha_venta,
+        "cliente": None if c_id is None else {
+            "nombre": c_nombre,
+            "telefono": c_telefono,
+            "email": c_email,
+            "direccion": c_direccion,
+            "id_cliente": c_id,
+            "fecha_registro": c_fecha_registro,
+        },
+        "detalles": detalles.get(id_venta, []),
+    }
+    if con_saldo:
+        venta["total_pagado"] = total_pagado
+        venta["saldo_pendiente"] = saldo_pendiente
+        venta["estado_pago"] = "Pagado" if saldo_pendiente <= 0 else "Pendiente"
+    return venta
 
-def get_ventas_cliente(db: Session, cliente_id: int) -> List[Venta]:
-    return db.query(Venta).filter(Venta.id_cliente == cliente_id).all()
+def get_ventas_planas(
+    db: Session,
+    cliente_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Página de ventas como dicts de schemas.Venta, en dos consultas (ventas
+    con cliente, detalles con producto) y sin hidratar objetos ORM
+    """
+    stmt = select_ventas_planas()
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    filas = db.execute(paginar(stmt, ORDEN_VENTAS, skip, limit, cursor)).all()
+    detalles = detalles_planos(db, [fila[0] for fila in filas])
+    return [venta_plana(fila, detalles) for fila in filas]
+
+def get_ventas_con_saldo_planas(db: Session, cliente_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Igual que get_ventas_con_saldo, como dicts de schemas.VentaConSaldo
+    """
+    stmt = select_ventas_planas()
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    filas = db.execute(stmt.order_by(*ORDEN_VENTAS)).all()
+    detalles = detalles_planos(db, [fila[0] for fila in filas])
+    return [venta_plana(fila, detalles, con_saldo=True) for fila in filas]
+
+def count_ventas(db: Session, cliente_id: Optional[int] = None) -> int:
+    query = db.query(Venta)
+    if cliente_id:
+        query = query.filter(Venta.id_cliente == cliente_id)
+    return contar_aproximado(query, f"ventas:{cliente_id or ''}")
 
 def create_venta(db: Session, venta: VentaCreate) -> Venta:
     # Crear la venta
@@ -31,120 +204,204 @@ def create_venta(db: Session, venta: VentaCreate) -> Venta:
     )
     db.add(db_venta)
     db.flush()  # Para obtener el ID antes de hacer commit
+    venta_id = db_venta.id_venta
     
-    # Crear los detalles de la venta
-    for detalle in venta.detalles:
-        db_detalle = DetalleVenta(
-            id_venta=db_venta.id_venta,
-            id_producto=detalle.id_producto,
-            cantidad=detalle.cantidad,
-            precio_unitario=detalle.precio_unitario,
-            subtotal=detalle.subtotal,
-            fecha_entrega=detalle.fecha_entrega
+    # Crear los detalles de la venta: un solo executemany, no un INSERT
+    # por detalle (el ORM no agrupa los INSERT ... RETURNING en SQLite)
+    if venta.detalles:
+        db.execute(
+            insert(DetalleVenta.__table__),
+            [{"id_venta": venta_id, **detalle.model_dump()} for detalle in venta.detalles],
         )
-        db.add(db_detalle)
     
+    resumen_diario_crud.registrar_cambios(db, {}, [venta_id])
+    cache_reportes_service.registrar_cambio(db)
+    db.commit()
+    return get_venta(db, venta_id)
+
+def _validar_bulk(db: Session, ventas: List[VentaCreate]) -> Dict[int, str]:
+    """
+    Revisa clientes y productos de todo el lote con dos consultas
+
+    Returns:
+        Diccionario índice -> mensaje de error de las ventas rechazadas
+    """
+    ids_clientes = {venta.id_cliente for venta in ventas}
+    ids_productos = {detalle.id_producto for venta in ventas for detalle in venta.detalles}
+    clientes = set(db.scalars(select(Cliente.id_cliente).where(Cliente.id_cliente.in_(ids_clientes))))
+    productos = set(db.scalars(select(Producto.id_producto).where(Producto.id_producto.in_(ids_productos))))
+
+    errores = {}
+    for indice, venta in enumerate(ventas):
+        if venta.id_cliente not in clientes:
+            errores[indice] = f"Cliente {venta.id_cliente} no encontrado"
+        elif not venta.detalles:
+            errores[indice] = "La venta no tiene detalles"
+        else:
+            faltantes = sorted({d.id_producto for d in venta.detalles} - productos)
+            if faltantes:
+                errores[indice] = f"Productos no encontrados: {faltantes}"
+    return errores
+
+def _fila_venta(venta: VentaCreate) -> Dict[str, Any]:
+    return {
+        "id_cliente": venta.id_cliente,
+        "tipo_venta": venta.tipo_venta,
+        "estado": venta.estado or EstadoVenta.pendiente,
+        "total": venta.total,
+        "total_pagado": 0,
+        "saldo_pendiente": venta.total,
+    }
+
+def _ids_consecutivos(db: Session) -> bool:
+    # En MySQL un INSERT de varias filas sólo garantiza ids consecutivos
+    # (a partir de LAST_INSERT_ID) con innodb_autoinc_lock_mode 0 o 1
+    modo = db.execute(text("SELECT @@innodb_autoinc_lock_mode")).scalar()
+    return int(modo) in (0, 1)
+
+def _insertar_ventas(db: Session, filas: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserta las ventas y devuelve sus ids en el mismo orden que las filas
+    """
+    dialecto = db.get_bind().dialect
+    if dialecto.insert_executemany_returning_sort_by_parameter_order:
+        # SQLite / MariaDB: INSERT ... VALUES (...), (...) RETURNING en lotes
+        stmt = insert(Venta.__table__).returning(Venta.id_venta, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, filas))
+    if dialecto.name == "mysql" and _ids_consecutivos(db):
+        resultado = db.execute(insert(Venta.__table__).values(filas))
+        return list(range(resultado.lastrowid, resultado.lastrowid + len(filas)))
+    # Sin garantía de ids consecutivos: una sentencia por venta, misma transacción
+    return [db.execute(insert(Venta.__table__), fila).inserted_primary_key[0] for fila in filas]
+
+def _insertar_lote(db: Session, ventas: List[VentaCreate]) -> List[int]:
+    ids = _insertar_ventas(db, [_fila_venta(venta) for venta in ventas])
+    detalles = [
+        {"id_venta": id_venta, **detalle.model_dump()}
+        for id_venta, venta in zip(ids, ventas)
+        for detalle in venta.detalles
+    ]
+    # executemany: el driver lo reescribe como INSERT de varias filas
+    db.execute(insert(DetalleVenta.__table__), detalles)
+    return ids
+
+def create_ventas_bulk(
+    db: Session,
+    ventas: List[VentaCreate],
+    lote: Optional[int] = None,
+    transaccion_unica: bool = False,
+) -> Dict[str, Any]:
+    """
+    Registra muchas ventas con INSERTs de varias filas
+
+    Las ventas con cliente o productos inexistentes se rechazan sin afectar
+    al resto. Cada lote corre en un SAVEPOINT; si la base lo rechaza, sus
+    ventas se reintentan de a una para aislar las que fallan.
+
+    Args:
+        db: Sesión de base de datos
+        ventas: Ventas a registrar
+        lote: Ventas por INSERT (por defecto VENTAS_BULK_LOTE)
+        transaccion_unica: Un solo COMMIT al final en lugar de uno por lote
+
+    Returns:
+        Diccionario con recibidas, creadas, ids (por índice, None si falló) y errores
+    """
+    lote = lote or settings.VENTAS_BULK_LOTE
+    errores = _validar_bulk(db, ventas)
+    ids: List[Optional[int]] = [None] * len(ventas)
+    validas = [i for i in range(len(ventas)) if i not in errores]
+
+    for inicio in range(0, len(validas), lote):
+        indices = validas[inicio:inicio + lote]
+        try:
+            with db.begin_nested():
+                nuevos = _insertar_lote(db, [ventas[i] for i in indices])
+        except Exception:
+            nuevos = []
+            for i in indices:
+                try:
+                    with db.begin_nested():
+                        nuevos.append(_insertar_lote(db, [ventas[i]])[0])
+                except Exception as e:
+                    errores[i] = str(getattr(e, "orig", None) or e)
+                    nuevos.append(None)
+        for i, id_venta in zip(indices, nuevos):
+            ids[i] = id_venta
+        resumen_diario_crud.registrar_cambios(db, {}, [id_venta for id_venta in nuevos if id_venta])
+        cache_reportes_service.registrar_cambio(db)
+        if not transaccion_unica:
+            db.commit()
     db.commit()
-    db.refresh(db_venta)
-    return db_venta
+
+    return {
+        "recibidas": len(ventas),
+        "creadas": sum(1 for id_venta in ids if id_venta is not None),
+        "ids": ids,
+        "errores": [{"indice": i, "error": errores[i]} for i in sorted(errores)],
+    }
 
 def update_venta(db: Session, venta_id: int, venta: VentaUpdate) -> Optional[Venta]:
-    db_venta = get_venta(db, venta_id)
+    db_venta = db.get(Venta, venta_id)
     if not db_venta:
         return None
     
+    antes = resumen_diario_crud.foto_ventas(db, [venta_id], bloquear=True)
     update_data = venta.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_venta, field, value)
     
     db.add(db_venta)
+    resumen_diario_crud.registrar_cambios(db, antes, [venta_id])
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
-    db.refresh(db_venta)
-    return db_venta
+    return get_venta(db, venta_id)
 
-def get_venta_con_saldo(db: Session, venta_id: int) -> Optional[Dict]:
-    # Obtener la venta
-    venta = db.query(Venta).filter(Venta.id_venta == venta_id).first()
-    if not venta:
-        return None
-    
-    # Obtener el total pagado
-    total_pagado = db.query(func.sum(Pago.monto)).filter(Pago.id_venta == venta_id).scalar() or 0
-    
-    # Calcular el saldo pendiente
-    saldo_pendiente = venta.total - total_pagado
-    
-    # Determinar el estado de pago
-    estado_pago = "Pagado" if saldo_pendiente <= 0 else "Pendiente"
-    
-    return {
-        "venta": venta,
-        "total_pagado": total_pagado,
-        "saldo_pendiente": saldo_pendiente,
-        "estado_pago": estado_pago
-    }
+def get_venta_con_saldo(db: Session, venta_id: int) -> Optional[Venta]:
+    # total_pagado y saldo_pendiente se mantienen en la propia venta
+    return get_venta(db, venta_id)
 
-def get_ventas_con_saldo(db: Session, cliente_id: Optional[int] = None) -> List[Dict]:
-    # Base query
-    query = db.query(
-        Venta,
-        Cliente.nombre.label("nombre_cliente"),
-        func.coalesce(func.sum(Pago.monto), 0).label("total_pagado")
-    ).join(Cliente, Venta.id_cliente == Cliente.id_cliente) \
-     .outerjoin(Pago, Venta.id_venta == Pago.id_venta)
+def get_ventas_con_saldo(
+    db: Session, cliente_id: Optional[int] = None, carga: Optional[Sequence[Any]] = None
+) -> List[Venta]:
+    # carga: opciones de carga en lugar de carga_venta() (p. ej. () si no se serializan relaciones)
+    query = db.query(Venta).options(*(carga_venta() if carga is None else carga))
     
     # Filtrar por cliente si se proporciona el ID
     if cliente_id:
         query = query.filter(Venta.id_cliente == cliente_id)
     
-    # Agrupar por venta
-    query = query.group_by(Venta.id_venta, Cliente.nombre)
-    
-    # Ejecutar consulta
-    ventas = query.all()
-    
-    # Formatear resultados
-    resultados = []
-    for venta, nombre_cliente, total_pagado in ventas:
-        saldo_pendiente = venta.total - total_pagado
-        estado_pago = "Pagado" if saldo_pendiente <= 0 else "Pendiente"
-        
-        resultados.append({
-            "venta": venta,
-            "nombre_cliente": nombre_cliente,
-            "total_pagado": total_pagado,
-            "saldo_pendiente": saldo_pendiente,
-            "estado_pago": estado_pago
-        })
-    
-    return resultados
+    return query.order_by(*ORDEN_VENTAS).all()
 
-def get_resumen_cliente(db: Session, cliente_id: int) -> Optional[Dict]:
+def get_resumen_cliente(
+    db: Session, cliente_id: int, carga: Optional[Sequence[Any]] = None
+) -> Optional[Dict]:
     # Verificar que el cliente existe
     cliente = db.query(Cliente).filter(Cliente.id_cliente == cliente_id).first()
     if not cliente:
         return None
     
     # Obtener ventas con saldo del cliente
-    ventas_con_saldo = get_ventas_con_saldo(db, cliente_id)
-    
-    # Calcular totales
-    total_compras = sum(item["venta"].total for item in ventas_con_saldo)
-    total_pagado = sum(item["total_pagado"] for item in ventas_con_saldo)
-    saldo_total = sum(item["saldo_pendiente"] for item in ventas_con_saldo)
+    ventas = get_ventas_con_saldo(db, cliente_id, carga)
     
     return {
         "cliente": cliente,
-        "ventas_con_saldo": ventas_con_saldo,
-        "total_compras": total_compras,
-        "total_pagado": total_pagado,
-        "saldo_total": saldo_total
+        "id_cliente": cliente.id_cliente,
+        "nombre": cliente.nombre,
+        "ventas": ventas,
+        "total_compras": sum(venta.total for venta in ventas),
+        "total_pagado": sum(venta.total_pagado for venta in ventas),
+        "saldo_total": sum(venta.saldo_pendiente for venta in ventas)
     }
+
 def delete_venta(db: Session, venta_id: int) -> bool:
-    venta = get_venta(db, venta_id)
+    venta = db.get(Venta, venta_id)
     if not venta:
         return False
 
+    antes = resumen_diario_crud.foto_ventas(db, [venta_id], bloquear=True)
     db.delete(venta)
+    resumen_diario_crud.registrar_cambios(db, antes, [venta_id])
+    cache_reportes_service.registrar_cambio(db)
     db.commit()
     return True
@@ -0,0 +1,138 @@
+# app/crud/venta_crud_async.py
+from typing import Any, List, Optional, Dict
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.paginacion import paginar, contar_aproximado_async
+from app.crud import resumen_diario_crud, venta_crud
+from app.crud.venta_crud import ORDEN_VENTAS, carga_venta
+from app.models.venta import Venta
+from app.models.detalle_venta import DetalleVenta
+from app.models.cliente import Cliente
+from app.schemas.venta import VentaCreate, VentaUpdate
+from app.services import cache_reportes_service
+
+# En modo asíncrono no hay carga implícita: todo lo que serializa el
+# response_model se carga por adelantado con carga_venta() (la misma
+# estrategia que las rutas síncronas)
+
+def _select_ventas(cliente_id: Optional[int] = None):
+    stmt = select(Venta).options(*carga_venta())
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    return stmt
+
+async def get_ventas(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Venta]:
+    stmt = paginar(_select_ventas(), ORDEN_VENTAS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def get_ventas_planas(
+    db: AsyncSession,
+    cliente_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # La proyección plana de venta_crud, sobre la conexión asíncrona
+    return await db.run_sync(venta_crud.get_ventas_planas, cliente_id, skip, limit, cursor)
+
+async def get_venta(db: AsyncSession, venta_id: int) -> Optional[Venta]:
+    return await db.scalar(_select_ventas().where(Venta.id_venta == venta_id))
+
+async def get_ventas_cliente(
+    db: AsyncSession,
+    cliente_id: int,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Venta]:
+    stmt = paginar(_select_ventas(cliente_id), ORDEN_VENTAS, skip, limit, cursor)
+    return list(await db.scalars(stmt))
+
+async def count_ventas(db: AsyncSession, cliente_id: Optional[int] = None) -> int:
+    stmt = select(Venta)
+    if cliente_id:
+        stmt = stmt.where(Venta.id_cliente == cliente_id)
+    return await contar_aproximado_async(db, stmt, f"ventas:{cliente_id or ''}")
+
+async def create_venta(db: AsyncSession, venta: VentaCreate) -> Venta:
+    # Crear la venta
+    db_venta = Venta(
+        id_cliente=venta.id_cliente,
+        tipo_venta=venta.tipo_venta,
+        estado=venta.estado,
+        total=venta.total
+    )
+    db.add(db_venta)
+    await db.flush()  # Para obtener el ID antes de hacer commit
+    
+    # Crear los detalles de la venta en un solo executemany (ver venta_crud)
+    if venta.detalles:
+        await db.execute(
+            insert(DetalleVenta.__table__),
+            [{"id_venta": db_venta.id_venta, **detalle.model_dump()} for detalle in venta.detalles],
+        )
+    
+    await db.run_sync(resumen_diario_crud.registrar_cambios, {}, [db_venta.id_venta])
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    return await get_venta(db, db_venta.id_venta)
+
+async def update_venta(db: AsyncSession, venta_id: int, venta: VentaUpdate) -> Optional[Venta]:
+    db_venta = await get_venta(db, venta_id)
+    if not db_venta:
+        return None
+    
+    antes = await db.run_sync(resumen_diario_crud.foto_ventas, [venta_id], True)
+    update_data = venta.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_venta, field, value)
+    
+    await db.run_sync(resumen_diario_crud.registrar_cambios, antes, [venta_id])
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    return db_venta
+
+async def get_venta_con_saldo(db: AsyncSession, venta_id: int) -> Optional[Venta]:
+    # total_pagado y saldo_pendiente se mantienen en la propia venta
+    return await get_venta(db, venta_id)
+
+async def get_ventas_con_saldo(db: AsyncSession, cliente_id: Optional[int] = None) -> List[Venta]:
+    stmt = _select_ventas(cliente_id).order_by(*ORDEN_VENTAS)
+    return list(await db.scalars(stmt))
+
+async def get_ventas_con_saldo_planas(db: AsyncSession, cliente_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    return await db.run_sync(venta_crud.get_ventas_con_saldo_planas, cliente_id)
+
+async def get_resumen_cliente(db: AsyncSession, cliente_id: int) -> Optional[Dict]:
+    # Verificar que el cliente existe
+    cliente = await db.scalar(select(Cliente).where(Cliente.id_cliente == cliente_id))
+    if not cliente:
+        return None
+    
+    # Obtener ventas con saldo del cliente
+    ventas = await get_ventas_con_saldo(db, cliente_id)
+    
+    return {
+        "cliente": cliente,
+        "id_cliente": cliente.id_cliente,
+        "nombre": cliente.nombre,
+        "ventas": ventas,
+        "total_compras": sum(venta.total for venta in ventas),
+        "total_pagado": sum(venta.total_pagado for venta in ventas),
+        "saldo_total": sum(venta.saldo_pendiente for venta in ventas)
+    }
+
+async def delete_venta(db: AsyncSession, venta_id: int) -> bool:
+    venta = await db.get(Venta, venta_id)
+    if not venta:
+        return False
+
+    antes = await db.run_sync(resumen_diario_crud.foto_ventas, [venta_id], True)
+    await db.delete(venta)
+    await db.run_sync(resumen_diario_crud.registrar_cambios, antes, [venta_id])
+    await db.run_sync(cache_reportes_service.registrar_cambio)
+    await db.commit()
+    return True
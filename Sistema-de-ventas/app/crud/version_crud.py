@@ -0,0 +1,29 @@
+# app/crud/version_crud.py
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.version_catalogo import VersionCatalogo
+
+
+def get_version(db: Session, nombre: str) -> int:
+    """
+    Versión guardada en versiones_catalogo (0 si la fila aún no existe)
+    """
+    return db.scalar(select(VersionCatalogo.version).where(VersionCatalogo.nombre == nombre)) or 0
+
+
+def incrementar(db: Session, nombre: str) -> None:
+    """
+    Incrementa la fila de versión en la transacción en curso
+
+    Llamar al final de la escritura, justo antes del commit: el bloqueo de la
+    fila se mantiene hasta entonces y todas las escrituras la toman en el mismo
+    orden (después de sus propias filas).
+    """
+    resultado = db.execute(
+        update(VersionCatalogo)
+        .where(VersionCatalogo.nombre == nombre)
+        .values(version=VersionCatalogo.version + 1)
+    )
+    if resultado.rowcount == 0:
+        db.add(VersionCatalogo(nombre=nombre, version=1))
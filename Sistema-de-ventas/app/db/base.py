@@ -4,3 +4,5 @@ from app.models.producto import Producto
 from app.models.venta import Venta
 from app.models.detalle_venta import DetalleVenta
 from app.models.pago import Pago
+from app.models.version_catalogo import VersionCatalogo
+from app.models.venta_diaria import VentaDiaria
@@ -0,0 +1,14 @@
+# app/db/marcas.py
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import mysql
+
+# Con microsegundos: dos cambios en el mismo segundo deben dar marcas distintas
+# (DATETIME de MySQL sin fsp trunca a segundos)
+MarcaModificacion = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def ahora() -> datetime:
+    # Se calcula en Python para que también aplique a los INSERT/UPDATE de Core
+    return datetime.now(timezone.utc).replace(tzinfo=None)
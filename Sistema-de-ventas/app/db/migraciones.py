@@ -0,0 +1,82 @@
+# app/db/migraciones.py
+import ast
+import os
+import re
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+# Carpeta de revisiones de Alembic (script_location de alembic.ini)
+DIRECTORIO_VERSIONES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic", "versions"
+)
+
+_ASIGNACION = re.compile(r"^(revision|down_revision)\s*(?::[^=]+)?=\s*(.+?)\s*$", re.MULTILINE)
+
+
+class EsquemaDesactualizado(RuntimeError):
+    """
+    La revisión de la base no coincide con las revisiones head del código
+    """
+
+
+def _como_conjunto(valor) -> Set[str]:
+    if valor is None:
+        return set()
+    if isinstance(valor, str):
+        return {valor}
+    return set(valor)
+
+
+def revisiones_head(directorio: str = DIRECTORIO_VERSIONES) -> Set[str]:
+    """
+    Revisiones head del historial de migraciones, como `alembic heads`
+
+    Lee revision y down_revision de cada archivo sin importar alembic ni los
+    módulos de migración: cuesta un par de milisegundos en el arranque.
+    """
+    revisiones: Set[str] = set()
+    anteriores: Set[str] = set()
+    for nombre in os.listdir(directorio):
+        if not nombre.endswith(".py"):
+            continue
+        with open(os.path.join(directorio, nombre), encoding="utf-8") as archivo:
+            valores = {clave: ast.literal_eval(valor) for clave, valor in _ASIGNACION.findall(archivo.read())}
+        if "revision" in valores:
+            revisiones.add(valores["revision"])
+            anteriores |= _como_conjunto(valores.get("down_revision"))
+    return revisiones - anteriores
+
+
+def revisiones_base(conexion) -> Set[str]:
+    """
+    Revisiones registradas en la tabla alembic_version (vacío si no existe)
+    """
+    try:
+        return {fila[0] for fila in conexion.execute(text("SELECT version_num FROM alembic_version"))}
+    except DBAPIError:
+        # Tabla inexistente: la base nunca se migró
+        conexion.rollback()
+        return set()
+
+
+def verificar_revision(engine, heads: Optional[Iterable[str]] = None) -> None:
+    """
+    Comprueba que la base esté en la revisión head de Alembic
+
+    Reemplaza a create_all en el arranque: una sola consulta en lugar de
+    reflejar cada tabla contra MySQL. El esquema lo aplica `alembic upgrade head`
+    en el despliegue, no cada worker.
+
+    Raises:
+        EsquemaDesactualizado: Si la revisión de la base no es la esperada
+    """
+    esperadas = set(heads) if heads is not None else revisiones_head()
+    with engine.connect() as conexion:
+        actuales = revisiones_base(conexion)
+    if actuales != esperadas:
+        raise EsquemaDesactualizado(
+            f"La base está en la revisión {', '.join(sorted(actuales)) or '(ninguna)'} "
+            f"y el código espera {', '.join(sorted(esperadas))}; ejecute 'alembic upgrade head'"
+        )
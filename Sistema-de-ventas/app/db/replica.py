@@ -0,0 +1,184 @@
+# app/db/replica.py
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.db import session
+
+# Cookie que marca al cliente que acaba de escribir: vale el instante (epoch)
+# hasta el que sus lecturas van al primario
+COOKIE_PRIMARIO = "leer_primario"
+METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+
+
+class _EstadoReplica:
+    """
+    Disponibilidad de la réplica y conteo de lecturas por destino (por proceso)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.caida_hasta = 0.0
+        self.conteos = {"replica": 0, "primario_propias": 0, "primario_caida": 0, "fallos": 0}
+
+    def disponible(self) -> bool:
+        return time.monotonic() >= self.caida_hasta
+
+    def sumar(self, clave: str) -> None:
+        with self._lock:
+            self.conteos[clave] += 1
+
+    def marcar_caida(self) -> None:
+        with self._lock:
+            self.conteos["fallos"] += 1
+            self.caida_hasta = time.monotonic() + settings.REPLICA_REINTENTO
+
+    def exportar(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "disponible": self.disponible(),
+                "reintento_en": max(round(self.caida_hasta - time.monotonic(), 1), 0.0),
+                **self.conteos,
+            }
+
+
+_estado = _EstadoReplica()
+
+
+def estado_replica() -> Optional[Dict[str, object]]:
+    """
+    Disponibilidad y lecturas por destino, o None si no hay réplica configurada
+    """
+    if session.replica_engine is None:
+        return None
+    return _estado.exportar()
+
+
+def escribio_hace_poco(request: Request) -> bool:
+    """
+    True si el cliente escribió dentro de REPLICA_LEER_PROPIAS segundos
+    """
+    valor = request.cookies.get(COOKIE_PRIMARIO)
+    try:
+        return valor is not None and float(valor) > time.time()
+    except ValueError:
+        return False
+
+
+def _abrir_replica():
+    """
+    Sesión de la réplica con su conexión ya abierta, o None si no está disponible
+
+    Se abre la conexión al crear la sesión para detectar la caída antes de la
+    primera consulta; tras un fallo la réplica no se intenta durante
+    REPLICA_REINTENTO segundos.
+    """
+    if not _estado.disponible():
+        _estado.sumar("primario_caida")
+        return None
+    db = session.SessionReplicaLocal()
+    try:
+        db.connection()
+    except DBAPIError:
+        db.close()
+        _estado.marcar_caida()
+        _estado.sumar("primario_caida")
+        return None
+    _estado.sumar("replica")
+    return db
+
+
+async def _abrir_replica_async():
+    if not _estado.disponible():
+        _estado.sumar("primario_caida")
+        return None
+    db = session.AsyncSessionReplicaLocal()
+    try:
+        await db.connection()
+    except DBAPIError:
+        await db.close()
+        _estado.marcar_caida()
+        _estado.sumar("primario_caida")
+        return None
+    _estado.sumar("replica")
+    return db
+
+
+def sesion_lectura(pegado: bool = False):
+    """
+    Sesión para consultas de sólo lectura: la réplica si está configurada y
+    responde, si no el primario
+
+    Args:
+        pegado: El cliente escribió hace poco y debe leer sus propios cambios
+    """
+    if session.SessionReplicaLocal is not None:
+        if pegado:
+            _estado.sumar("primario_propias")
+        else:
+            db = _abrir_replica()
+            if db is not None:
+                return db
+    return session.SessionLocal()
+
+
+def get_read_db(request: Request):
+    """
+    Dependencia de las rutas de sólo lectura (equivalente a get_db)
+    """
+    db = sesion_lectura(escribio_hace_poco(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """
+    Dependencia de las rutas de sólo lectura en modo DB_ASYNC
+    """
+    db = None
+    if session.AsyncSessionReplicaLocal is not None:
+        if escribio_hace_poco(request):
+            _estado.sumar("primario_propias")
+        else:
+            db = await _abrir_replica_async()
+    if db is None:
+        db = session.AsyncSessionLocal()
+    async with db:
+        yield db
+
+
+class LeerPropiasMiddleware:
+    """
+    Marca con COOKIE_PRIMARIO a los clientes que escriben
+
+    Cualquier petición que no sea de lectura y termine sin error deja la
+    cookie por REPLICA_LEER_PROPIAS segundos; mientras tanto, get_read_db lee
+    del primario para ese cliente y no ve datos atrasados de la réplica.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in METODOS_LECTURA:
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] < 400:
+                ventana = settings.REPLICA_LEER_PROPIAS
+                cookie = SimpleCookie()
+                cookie[COOKIE_PRIMARIO] = f"{time.time() + ventana:.3f}"
+                cookie[COOKIE_PRIMARIO].update({"max-age": ventana, "path": "/", "httponly": True, "samesite": "Lax"})
+                encabezado = cookie.output(header="").strip().encode("latin-1")
+                mensaje["headers"] = list(mensaje.get("headers", [])) + [(b"set-cookie", encabezado)]
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
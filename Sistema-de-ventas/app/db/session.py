@@ -1,13 +1,39 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session
-from contextlib import contextmanager
+from contextlib import AsyncExitStack, ExitStack, contextmanager
 from app.core.config import settings
+from app.core.consultas import registrar_contador
+from app.core.metricas_pool import AsyncQueuePoolMedido, QueuePoolMedido, registrar_metricas
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def opciones_pool(url: str, asincrono: bool = False) -> dict:
+    """
+    Argumentos de create_engine para el pool según Settings
+
+    SQLite en memoria usa un pool de una sola conexión y no admite
+    tamaño ni overflow, así que se deja con la configuración por defecto.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": AsyncQueuePoolMedido if asincrono else QueuePoolMedido,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **opciones_pool(SQLALCHEMY_DATABASE_URL))
+registrar_metricas(engine.pool)
+registrar_contador(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # ✅ Esta es la función que falta:
@@ -17,3 +43,106 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Drivers asíncronos para cada backend soportado
+DRIVERS_ASYNC = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def url_async(url: str) -> str:
+    """
+    Convierte la URL síncrona en su equivalente con driver asíncrono
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASYNC:
+        raise ValueError(f"No hay driver asíncrono configurado para {backend}")
+    return url.set(drivername=DRIVERS_ASYNC[backend]).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    # Sólo se importa (y se exige el driver) cuando el modo está activo
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    _url_async = settings.SQLALCHEMY_ASYNC_DATABASE_URI or url_async(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(_url_async, **opciones_pool(_url_async, asincrono=True))
+    registrar_metricas(async_engine.sync_engine.pool)
+    registrar_contador(async_engine.sync_engine)
+    # expire_on_commit=False: tras el commit no se puede recargar de forma implícita
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Réplica de lectura (opcional); el enrutamiento de lecturas está en app.db.replica
+replica_engine = None
+SessionReplicaLocal = None
+async_replica_engine = None
+AsyncSessionReplicaLocal = None
+
+if settings.SQLALCHEMY_REPLICA_URI:
+    _url_replica = settings.SQLALCHEMY_REPLICA_URI
+    replica_engine = create_engine(_url_replica, **opciones_pool(_url_replica))
+    registrar_metricas(replica_engine.pool)
+    registrar_contador(replica_engine)
+    SessionReplicaLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    if settings.DB_ASYNC:
+        _url_replica_async = settings.SQLALCHEMY_ASYNC_REPLICA_URI or url_async(_url_replica)
+        async_replica_engine = create_async_engine(
+            _url_replica_async, **opciones_pool(_url_replica_async, asincrono=True)
+        )
+        registrar_metricas(async_replica_engine.sync_engine.pool)
+        registrar_contador(async_replica_engine.sync_engine)
+        AsyncSessionReplicaLocal = async_sessionmaker(
+            async_replica_engine, autoflush=False, expire_on_commit=False
+        )
+
+
+def _a_calentar(pool, cantidad: int) -> int:
+    # Más allá de pool_size serían conexiones de overflow, que se cierran al devolverlas
+    tamano = getattr(pool, "size", None)
+    return min(cantidad, tamano()) if callable(tamano) else min(cantidad, 1)
+
+def calentar_pool(cantidad: int, motor=None) -> int:
+    """
+    Abre hasta `cantidad` conexiones del pool síncrono y las devuelve abiertas
+
+    Así las primeras peticiones no pagan la conexión (TCP, autenticación)
+    a la base. Se retienen todas a la vez para que el pool cree conexiones
+    distintas y no reutilice la misma.
+
+    Args:
+        cantidad: Conexiones a abrir
+        motor: Engine a calentar (por defecto el del primario)
+
+    Returns:
+        Conexiones abiertas
+    """
+    motor = motor if motor is not None else engine
+    cantidad = _a_calentar(motor.pool, cantidad)
+    with ExitStack() as pila:
+        for _ in range(cantidad):
+            pila.enter_context(motor.connect())
+    return cantidad
+
+async def calentar_pool_async(cantidad: int, motor=None) -> int:
+    """
+    Igual que calentar_pool, para un AsyncEngine (por defecto el del primario en modo DB_ASYNC)
+    """
+    motor = motor if motor is not None else async_engine
+    if motor is None:
+        return 0
+    cantidad = _a_calentar(motor.sync_engine.pool, cantidad)
+    async with AsyncExitStack() as pila:
+        for _ in range(cantidad):
+            await pila.enter_async_context(motor.connect())
+    return cantidad
@@ -1,9 +1,26 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import cliente_routes, producto_routes, venta_routes, pago_routes, reporte_routes
+from sqlalchemy.exc import DBAPIError
 from app.core.config import settings
-from app.db.session import engine
-from app.db.base import Base
+
+if settings.DB_ASYNC:
+    from app.api import (
+        cliente_routes_async as cliente_routes,
+        producto_routes_async as producto_routes,
+        venta_routes_async as venta_routes,
+        pago_routes_async as pago_routes,
+    )
+else:
+    from app.api import cliente_routes, producto_routes, venta_routes, pago_routes
+# Los reportes son trabajo de CPU (reportlab) y siguen en el threadpool;
+# reportlab y openpyxl se importan con el primer reporte, no al arrancar
+from app.api import reporte_routes, interno_routes, analitica_routes
+from app.core.consultas import ENCABEZADO_CONSULTAS
+from app.core import metricas
+from app.core.paginacion import ENCABEZADO_CURSOR, ENCABEZADO_TOTAL
+from app.db import migraciones, replica, session
+from app.services import busqueda_service, columnar_service, trabajos_reportes_service
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,19 +35,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[ENCABEZADO_CURSOR, ENCABEZADO_TOTAL, ENCABEZADO_CONSULTAS, "Server-Timing"],
 )
 
+# Lecturas de los propios cambios en el primario durante REPLICA_LEER_PROPIAS segundos
+if settings.SQLALCHEMY_REPLICA_URI:
+    app.add_middleware(replica.LeerPropiasMiddleware)
+
+# Agregado después de CORS para quedar por fuera y medir la petición completa
+if settings.METRICAS or settings.CONSULTAS_CONTAR:
+    app.add_middleware(metricas.MedicionMiddleware)
+
 # Incluir rutas
 app.include_router(cliente_routes.router, prefix="/api/clientes", tags=["clientes"])
 app.include_router(producto_routes.router, prefix="/api/productos", tags=["productos"])
 app.include_router(venta_routes.router, prefix="/api/ventas", tags=["ventas"])
 app.include_router(pago_routes.router, prefix="/api/pagos", tags=["pagos"])
 app.include_router(reporte_routes.router, prefix="/api/reportes", tags=["reportes"])
+app.include_router(analitica_routes.router, prefix="/api/analytics", tags=["analitica"])
+app.include_router(interno_routes.router, prefix="/api/_internal", tags=["interno"])
 
 @app.on_event("startup")
 async def startup():
-    # Crear tablas si no existen
-    Base.metadata.create_all(bind=engine)
+    if settings.DB_ESQUEMA == "verificar":
+        # Una consulta a alembic_version en lugar de reflejar todas las tablas
+        migraciones.verificar_revision(session.engine)
+    elif settings.DB_ESQUEMA == "crear":
+        from app.db.base import Base
+
+        Base.metadata.create_all(bind=session.engine)
+    if settings.DB_CALENTAR:
+        # Antes de que el servidor acepte peticiones
+        if session.async_engine is not None:
+            await session.calentar_pool_async(settings.DB_CALENTAR)
+        else:
+            session.calentar_pool(settings.DB_CALENTAR)
+        try:
+            if session.async_replica_engine is not None:
+                await session.calentar_pool_async(settings.DB_CALENTAR, session.async_replica_engine)
+            elif session.replica_engine is not None:
+                session.calentar_pool(settings.DB_CALENTAR, session.replica_engine)
+        except DBAPIError:
+            # Sin réplica el worker arranca igual: las lecturas van al primario
+            pass
+    if settings.BUSQUEDA_INDICE:
+        busqueda_service.precargar()
+    if settings.ANALITICA:
+        columnar_service.precargar()
+
+@app.on_event("shutdown")
+def shutdown():
+    trabajos_reportes_service.cerrar()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metricas():
+    # Por proceso: con varios workers, cada uno expone sus propios histogramas
+    return PlainTextResponse(metricas.exportar(), media_type=metricas.TIPO_PROMETHEUS)
 
 @app.get("/")
 def root():
@@ -1,11 +1,12 @@
 # app/models/cliente.py
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 from sqlalchemy.orm import relationship
 
 class Cliente(Base):
     __tablename__ = "clientes"
+    __table_args__ = (Index("ix_clientes_nombre", "nombre"),)
 
     id_cliente = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(150), nullable=False)
@@ -1,10 +1,14 @@
  #app/models/detalle_venta.py
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class DetalleVenta(Base):
     __tablename__ = "detalles_venta"
+    __table_args__ = (
+        Index("ix_detalles_venta_id_venta", "id_venta"),
+        Index("ix_detalles_venta_id_producto", "id_producto"),
+    )
 
     id_detalle = Column(Integer, primary_key=True, index=True)
     id_venta = Column(Integer, ForeignKey("ventas.id_venta"), nullable=False)
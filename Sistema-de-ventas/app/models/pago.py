@@ -1,11 +1,18 @@
 # app/models/pago.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
+from app.db.marcas import MarcaModificacion, ahora
 
 class Pago(Base):
     __tablename__ = "pagos"
+    __table_args__ = (
+        # Cubre SUM(monto) por venta (saldos) sin leer las filas de pagos
+        Index("ix_pagos_venta_monto", "id_venta", "monto"),
+        # Búsqueda por rango de fechas y totales por método y período
+        Index("ix_pagos_fecha_metodo_monto", "fecha_pago", "metodo_pago", "monto"),
+    )
 
     id_pago = Column(Integer, primary_key=True, index=True)
     id_venta = Column(Integer, ForeignKey("ventas.id_venta"), nullable=False)
@@ -13,6 +20,7 @@ class Pago(Base):
     monto = Column(Float, nullable=False)
     metodo_pago = Column(String(50), nullable=True)
     observaciones = Column(Text, nullable=True)
+    actualizado_en = Column(MarcaModificacion, default=ahora, onupdate=ahora, index=True)
     
     # Relaciones
     venta = relationship("Venta", back_populates="pagos")
\ No newline at end of file
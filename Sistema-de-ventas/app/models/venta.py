@@ -1,8 +1,9 @@
 # app/models/venta.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
+from app.db.marcas import MarcaModificacion, ahora
 import enum
 detalles = relationship("DetalleVenta", back_populates="venta", cascade="all, delete-orphan")
 pagos = relationship("Pago", back_populates="venta", cascade="all, delete-orphan")
@@ -20,6 +21,14 @@ class EstadoVenta(enum.Enum):
 
 class Venta(Base):
     __tablename__ = "ventas"
+    __table_args__ = (
+        Index("ix_ventas_cliente_fecha", "id_cliente", "fecha_venta"),
+        Index("ix_ventas_fecha_venta", "fecha_venta"),
+        Index(
+            "ix_ventas_credito_saldo",
+            "tipo_venta", "id_cliente", "saldo_pendiente", "fecha_venta", "estado",
+        ),
+    )
 
     id_venta = Column(Integer, primary_key=True, index=True)
     id_cliente = Column(Integer, ForeignKey("clientes.id_cliente"), nullable=False)
@@ -27,8 +36,23 @@ class Venta(Base):
     tipo_venta = Column(Enum(TipoVenta), nullable=False)
     estado = Column(Enum(EstadoVenta), default=EstadoVenta.pendiente)
     total = Column(Float, nullable=False)
+
+    # Saldo mantenido por pago_crud en la misma transacción que cada pago
+    total_pagado = Column(Float, nullable=False, default=0, server_default="0")
+    saldo_pendiente = Column(
+        Float,
+        nullable=False,
+        default=lambda context: context.get_current_parameters()["total"],
+    )
+
+    # Marca de modificación: sello de datos de la caché de reportes
+    actualizado_en = Column(MarcaModificacion, default=ahora, onupdate=ahora, index=True)
     
     # Relaciones
     cliente = relationship("Cliente", back_populates="ventas")
     detalles = relationship("DetalleVenta", back_populates="venta", cascade="all, delete-orphan")
-    pagos = relationship("Pago", back_populates="venta", cascade="all, delete-orphan")
\ No newline at end of file
+    pagos = relationship("Pago", back_populates="venta", cascade="all, delete-orphan")
+
+    @property
+    def estado_pago(self) -> str:
+        return "Pagado" if self.saldo_pendiente <= 0 else "Pendiente"
@@ -0,0 +1,16 @@
+# app/models/venta_diaria.py
+from sqlalchemy import Column, Integer, Float, Date, Enum
+from app.db.base_class import Base
+from app.models.venta import TipoVenta, EstadoVenta
+
+class VentaDiaria(Base):
+    __tablename__ = "ventas_diarias"
+
+    # Agregados de ventas por día, tipo y estado; los mantienen venta_crud y
+    # pago_crud en la misma transacción que cada escritura
+    dia = Column(Date, primary_key=True)
+    tipo_venta = Column(Enum(TipoVenta), primary_key=True)
+    estado = Column(Enum(EstadoVenta), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0, server_default="0")
+    total = Column(Float, nullable=False, default=0, server_default="0")
+    total_pagado = Column(Float, nullable=False, default=0, server_default="0")
@@ -0,0 +1,11 @@
+# app/models/version_catalogo.py
+from sqlalchemy import Column, Integer, String
+from app.db.base_class import Base
+
+class VersionCatalogo(Base):
+    __tablename__ = "versiones_catalogo"
+
+    # Una fila por conjunto de datos cacheado ("productos" para el catálogo,
+    # "ventas" para los reportes); la incrementa cada escritura
+    nombre = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,39 @@
+# app/schemas/analitica.py
+from typing import Any, Dict, Optional
+from datetime import date
+from pydantic import BaseModel
+
+class VentasPorProducto(BaseModel):
+    id_producto: int
+    unidades: int
+    monto: float
+    lineas: int
+
+class VentasPorCliente(BaseModel):
+    id_cliente: int
+    ventas: int
+    total: float
+    total_pagado: float
+    saldo_pendiente: float
+
+class VentasPorPeriodo(BaseModel):
+    inicio: date
+    ventas: int
+    total: float
+    total_pagado: float
+    total_contado: float
+    total_credito: float
+
+class PagosPorMetodo(BaseModel):
+    metodo_pago: Optional[str] = None
+    pagos: int
+    monto: float
+
+class EstadoAnalitica(BaseModel):
+    disponible: bool
+    refrescando: bool
+    version: Optional[int] = None
+    generacion: Optional[str] = None
+    antiguedad_segundos: Optional[float] = None
+    tablas: Dict[str, Dict[str, Any]] = {}
+    bytes: Optional[int] = None
@@ -1,14 +1,25 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from app.schemas.venta import Venta
 
+def validar_monto(cls, monto: Optional[float]) -> float:
+    """
+    Mismo criterio en el alta, la edición y la importación: el monto se suma
+    al saldo de la venta, así que debe ser un número mayor que cero
+    """
+    if monto is None or monto <= 0:
+        raise ValueError("El monto debe ser mayor que cero")
+    return monto
+
 class PagoBase(BaseModel):
     id_venta: int
     monto: float
     metodo_pago: Optional[str] = None
     observaciones: Optional[str] = None
 
+    _monto_positivo = field_validator("monto")(validar_monto)
+
 class PagoCreate(PagoBase):
     pass
 
@@ -17,6 +28,9 @@ class PagoUpdate(BaseModel):
     metodo_pago: Optional[str] = None
     observaciones: Optional[str] = None
 
+    # Se puede omitir, pero no enviar null: el monto se traslada al saldo de la venta
+    _monto_positivo = field_validator("monto")(validar_monto)
+
 class PagoInDB(PagoBase):
     id_pago: int
     fecha_pago: datetime
@@ -26,3 +40,31 @@ class PagoInDB(PagoBase):
 
 class Pago(PagoInDB):
     venta: Optional[Venta] = None  # ✅ Relación con Venta (que puede tener Cliente)
+
+
+class PagoBulkError(BaseModel):
+    indice: int
+    error: str
+
+class PagoBulkResultado(BaseModel):
+    recibidos: int
+    creados: int
+    ventas_actualizadas: int
+    errores: List[PagoBulkError] = []
+
+
+class PagoTotalMetodo(BaseModel):
+    metodo_pago: Optional[str] = None
+    cantidad: int
+    total: float
+
+class PagoTotalPeriodo(BaseModel):
+    periodo: str  # AAAA-MM-DD o AAAA-MM
+    cantidad: int
+    total: float
+
+class PagoTotales(BaseModel):
+    cantidad: int
+    total: float
+    por_metodo: List[PagoTotalMetodo] = []
+    por_periodo: List[PagoTotalPeriodo] = []
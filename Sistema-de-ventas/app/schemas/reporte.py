@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Literal
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
 
 class ReporteSaldoOut(BaseModel):
@@ -16,3 +16,62 @@ class ReporteSaldoOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TotalesSaldosOut(BaseModel):
+    ventas: int
+    total_venta: float
+    total_pagado: float
+    saldo_pendiente: float
+
+
+class ReporteSaldosOut(BaseModel):
+    items: List[ReporteSaldoOut]
+    # Sólo en la primera página (sin cursor): no cambia al avanzar
+    totales: Optional[TotalesSaldosOut] = None
+    siguiente_cursor: Optional[str] = None
+
+
+class ResumenDiarioOut(BaseModel):
+    dia: date
+    cantidad: int
+    total: float
+    total_pagado: float
+    saldo_pendiente: float
+    total_contado: float
+    total_credito: float
+
+class AntiguedadClienteOut(BaseModel):
+    id_cliente: int
+    nombre: str
+    saldo_0_30: float
+    saldo_31_60: float
+    saldo_61_90: float
+    saldo_90_mas: float
+    saldo_total: float
+    ventas: int  # ventas a crédito con saldo
+    venta_mas_antigua: datetime
+
+class TrabajoReporteCreate(BaseModel):
+    tipo: Literal["cliente", "ventas"]
+    formato: Literal["pdf", "csv", "xlsx"] = "pdf"
+    cliente_id: Optional[int] = None  # obligatorio si tipo es "cliente"
+    fecha_inicio: Optional[date] = None
+    fecha_fin: Optional[date] = None
+    tipo_venta: Optional[str] = None
+    estado: Optional[str] = None
+
+class TrabajoReporteOut(BaseModel):
+    id: str
+    tipo: str
+    formato: str
+    estado: Literal["pendiente", "en_proceso", "cancelando", "completado", "fallido", "cancelado"]
+    progreso: Optional[float] = None  # 0 a 1; None si no se conoce el total de filas
+    filas_procesadas: int = 0
+    filas_totales: Optional[int] = None
+    bytes_generados: int = 0
+    tamano: Optional[int] = None
+    error: Optional[str] = None
+    creado_en: datetime
+    terminado_en: Optional[datetime] = None
+    expira_en: Optional[datetime] = None
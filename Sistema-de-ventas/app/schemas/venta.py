@@ -42,4 +42,14 @@ class Venta(VentaInDB):
 class VentaConSaldo(Venta):
     total_pagado: float
     saldo_pendiente: float
-    estado_pago: str
\ No newline at end of file
+    estado_pago: str
+
+class VentaBulkError(BaseModel):
+    indice: int
+    error: str
+
+class VentaBulkResultado(BaseModel):
+    recibidas: int
+    creadas: int
+    ids: List[Optional[int]]
+    errores: List[VentaBulkError] = []
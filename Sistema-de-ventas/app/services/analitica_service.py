@@ -0,0 +1,236 @@
+# app/services/analitica_service.py
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.columnar_service import CODIGOS_ESTADO, CODIGOS_TIPO, Instantanea
+from app.models.venta import TipoVenta, EstadoVenta
+
+# Rango máximo de claves para agrupar con bincount directo (sin ordenar)
+RANGO_DENSO = 1 << 24
+
+# 1970-01-05 fue lunes: las semanas empiezan el día 4 + 7k
+LUNES_EPOCA = 4
+
+PERIODOS = ("dia", "semana", "mes")
+
+
+def _dia(fecha: date) -> int:
+    return int(np.datetime64(fecha, "D").astype(np.int64))
+
+
+def _fecha(dia: int) -> date:
+    return np.datetime64(int(dia), "D").astype(date)
+
+
+def mascara(
+    columnas: Dict[str, np.ndarray],
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    **iguales: Optional[int],
+) -> np.ndarray:
+    """
+    Filas cuyo día está en el rango (ambos inclusive) y cuyas columnas
+    coinciden con los valores dados (los None no filtran)
+    """
+    filtro = np.ones(len(columnas["dia"]), dtype=bool)
+    if fecha_inicio is not None:
+        filtro &= columnas["dia"] >= _dia(fecha_inicio)
+    if fecha_fin is not None:
+        filtro &= columnas["dia"] <= _dia(fecha_fin)
+    for nombre, valor in iguales.items():
+        if valor is not None:
+            filtro &= columnas[nombre] == valor
+    return filtro
+
+
+def agrupar(
+    claves: np.ndarray, filtro: np.ndarray, valores: Sequence[np.ndarray] = ()
+) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+    """
+    GROUP BY vectorizado: claves distintas, conteo y suma de cada columna de valores
+
+    Con claves enteras de rango acotado (ids, días) se usa bincount sobre la
+    clave desplazada, que es lineal; si no, np.unique (ordena) y bincount
+    sobre la posición de cada clave.
+    """
+    claves = claves[filtro]
+    if not len(claves):
+        return claves, np.zeros(0, dtype=np.int64), [np.zeros(0) for _ in valores]
+    seleccionados = [v[filtro] for v in valores]
+
+    minimo, maximo = int(claves.min()), int(claves.max())
+    if maximo - minimo < RANGO_DENSO:
+        posicion = claves.astype(np.int64) - minimo
+        conteos = np.bincount(posicion, minlength=maximo - minimo + 1)
+        presentes = np.flatnonzero(conteos)
+        sumas = [
+            np.bincount(posicion, weights=v, minlength=maximo - minimo + 1)[presentes]
+            for v in seleccionados
+        ]
+        return presentes + minimo, conteos[presentes], sumas
+
+    unicas, posicion = np.unique(claves, return_inverse=True)
+    conteos = np.bincount(posicion, minlength=len(unicas))
+    sumas = [np.bincount(posicion, weights=v, minlength=len(unicas)) for v in seleccionados]
+    return unicas, conteos, sumas
+
+
+def _mejores(orden: np.ndarray, limit: Optional[int]) -> np.ndarray:
+    # Índices de los limit valores mayores, de mayor a menor
+    if limit is None or limit >= len(orden):
+        return np.argsort(-orden, kind="stable")
+    candidatos = np.argpartition(-orden, limit)[:limit]
+    return candidatos[np.argsort(-orden[candidatos], kind="stable")]
+
+
+def _codigo_tipo(tipo_venta: Optional[str]) -> Optional[int]:
+    return CODIGOS_TIPO[TipoVenta(tipo_venta)] if tipo_venta else None
+
+
+def _codigo_estado(estado: Optional[str]) -> Optional[int]:
+    return CODIGOS_ESTADO[EstadoVenta(estado)] if estado else None
+
+
+def _venta_de_detalle(instantanea: Instantanea) -> np.ndarray:
+    # Posición en ventas de la venta de cada detalle (ids ordenados: searchsorted)
+    def calcular():
+        ids = instantanea.tablas["ventas"]["id"]
+        id_venta = instantanea.tablas["detalles"]["id_venta"]
+        if not len(ids):
+            return np.full(len(id_venta), -1, dtype=np.int64)
+        posiciones = np.minimum(np.searchsorted(ids, id_venta), len(ids) - 1)
+        posiciones[ids[posiciones] != id_venta] = -1
+        return posiciones
+    return instantanea.derivado("venta_de_detalle", calcular)
+
+
+def ventas_por_producto(
+    instantanea: Instantanea,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+    orden: str = "monto",
+    limit: Optional[int] = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Unidades, monto y líneas vendidas por producto, de mayor a menor
+    """
+    detalles = instantanea.tablas["detalles"]
+    filtro = mascara(detalles, fecha_inicio, fecha_fin)
+    if tipo_venta or estado:
+        ventas = instantanea.tablas["ventas"]
+        posiciones = _venta_de_detalle(instantanea)
+        filtro &= posiciones >= 0
+        de_venta = mascara(ventas, tipo=_codigo_tipo(tipo_venta), estado=_codigo_estado(estado))
+        filtro &= de_venta[np.maximum(posiciones, 0)]
+
+    productos, lineas, (unidades, monto) = agrupar(
+        detalles["id_producto"], filtro, (detalles["cantidad"], detalles["subtotal"])
+    )
+    elegidos = _mejores(unidades if orden == "cantidad" else monto, limit)
+    return [
+        {"id_producto": p, "unidades": int(u), "monto": m, "lineas": n}
+        for p, u, m, n in zip(
+            productos[elegidos].tolist(), unidades[elegidos].tolist(),
+            monto[elegidos].tolist(), lineas[elegidos].tolist(),
+        )
+    ]
+
+
+def ventas_por_cliente(
+    instantanea: Instantanea,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+    orden: str = "total",
+    limit: Optional[int] = 100,
+) -> List[Dict[str, Any]]:
+    """
+    Cantidad de ventas, total, pagado y saldo por cliente, de mayor a menor
+    """
+    ventas = instantanea.tablas["ventas"]
+    filtro = mascara(
+        ventas, fecha_inicio, fecha_fin, tipo=_codigo_tipo(tipo_venta), estado=_codigo_estado(estado)
+    )
+    clientes, cantidad, (total, pagado) = agrupar(
+        ventas["id_cliente"], filtro, (ventas["total"], ventas["total_pagado"])
+    )
+    saldo = total - pagado
+    criterio = {"cantidad": cantidad, "saldo": saldo}.get(orden, total)
+    elegidos = _mejores(criterio, limit)
+    return [
+        {"id_cliente": c, "ventas": n, "total": t, "total_pagado": p, "saldo_pendiente": s}
+        for c, n, t, p, s in zip(
+            clientes[elegidos].tolist(), cantidad[elegidos].tolist(), total[elegidos].tolist(),
+            pagado[elegidos].tolist(), saldo[elegidos].tolist(),
+        )
+    ]
+
+
+def _clave_periodo(dias: np.ndarray, periodo: str) -> np.ndarray:
+    # Primer día del período de cada fila
+    if periodo == "semana":
+        return (dias - LUNES_EPOCA) // 7 * 7 + LUNES_EPOCA
+    if periodo == "mes":
+        meses = dias.astype("datetime64[D]").astype("datetime64[M]")
+        return meses.astype("datetime64[D]").astype(np.int64)
+    return dias
+
+
+def ventas_por_periodo(
+    instantanea: Instantanea,
+    periodo: str = "dia",
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Ventas por día, semana (desde el lunes) o mes, en orden cronológico
+    """
+    ventas = instantanea.tablas["ventas"]
+    filtro = mascara(
+        ventas, fecha_inicio, fecha_fin, tipo=_codigo_tipo(tipo_venta), estado=_codigo_estado(estado)
+    )
+    filtro &= ventas["dia"] >= 0
+    contado = np.where(ventas["tipo"] == CODIGOS_TIPO[TipoVenta.contado], ventas["total"], 0.0)
+    inicios, cantidad, (total, pagado, total_contado) = agrupar(
+        _clave_periodo(ventas["dia"].astype(np.int64), periodo),
+        filtro,
+        (ventas["total"], ventas["total_pagado"], contado),
+    )
+    return [
+        {
+            "inicio": _fecha(i),
+            "ventas": n,
+            "total": t,
+            "total_pagado": p,
+            "total_contado": c,
+            "total_credito": t - c,
+        }
+        for i, n, t, p, c in zip(
+            inicios.tolist(), cantidad.tolist(), total.tolist(), pagado.tolist(), total_contado.tolist()
+        )
+    ]
+
+
+def pagos_por_metodo(
+    instantanea: Instantanea,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Cantidad y monto de pagos por método de pago, de mayor a menor monto
+    """
+    pagos = instantanea.tablas["pagos"]
+    metodos = instantanea.diccionarios.get("metodo", [None])
+    codigos, cantidad, (monto,) = agrupar(pagos["metodo"], mascara(pagos, fecha_inicio, fecha_fin), (pagos["monto"],))
+    elegidos = _mejores(monto, None)
+    return [
+        {"metodo_pago": metodos[c], "pagos": n, "monto": m}
+        for c, n, m in zip(codigos[elegidos].tolist(), cantidad[elegidos].tolist(), monto[elegidos].tolist())
+    ]
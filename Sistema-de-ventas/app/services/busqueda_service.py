@@ -0,0 +1,366 @@
+# app/services/busqueda_service.py
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.cliente import Cliente
+from app.models.producto import Producto
+
+_NO_ALFANUMERICO = re.compile(r"[\W_]+")
+_SEPARADOR_DIGITOS = re.compile(r"(?<=\d) (?=\d)")
+# Marca de las claves de prefijo (consultas de 1 o 2 caracteres)
+_PREFIJO = "\x01"
+
+
+def normalizar(texto: Optional[str], sin_acentos: bool = True) -> str:
+    """
+    Pasa el texto a minúsculas, deja sólo letras y dígitos separados por un
+    espacio y une los grupos de dígitos ("300-123 4567" -> "3001234567")
+
+    Con sin_acentos también quita tildes y diéresis (y la ñ pasa a n), de
+    modo que "Muñoz" y "Munoz" coincidan.
+    """
+    if not texto:
+        return ""
+    texto = texto.lower()
+    if sin_acentos and not texto.isascii():
+        texto = "".join(
+            c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c)
+        )
+    texto = _NO_ALFANUMERICO.sub(" ", texto).strip()
+    return _SEPARADOR_DIGITOS.sub("", texto)
+
+
+def _claves(texto: str) -> set:
+    # Trigramas del texto más los prefijos de 1 y 2 letras de cada palabra.
+    # Los campos van separados por SEPARADOR, que nunca aparece en una consulta.
+    claves = {texto[i:i + 3] for i in range(len(texto) - 2)}
+    for palabra in texto.split():
+        claves.add(_PREFIJO + palabra[:1])
+        claves.add(_PREFIJO + palabra[:2])
+    return claves
+
+
+SEPARADOR = "\n"
+
+
+def _lista_vacia() -> array:
+    return array("i")
+
+
+class IndiceBusqueda:
+    """
+    Índice en memoria de trigramas y prefijos de palabra
+
+    Por documento se guarda el texto normalizado de todos sus campos unidos
+    por SEPARADOR (y la versión con tildes sólo si difiere). Las listas de ids
+    sólo crecen: al modificar o eliminar un documento sus claves viejas quedan
+    como entradas obsoletas que la verificación final (substring sobre el
+    texto actual) descarta. Cuando las obsoletas superan un cuarto del total
+    se reconstruyen las listas.
+    """
+
+    def __init__(self, campos: Sequence[str]) -> None:
+        self.campos = tuple(campos)
+        self._lock = threading.RLock()
+        self._listas: Dict[str, array] = defaultdict(_lista_vacia)
+        self._textos: Dict[int, str] = {}
+        self._con_acentos: Dict[int, str] = {}
+        self._datos: Dict[int, Any] = {}
+        self._entradas = 0
+        self._obsoletas = 0
+        self.creado = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def agregar(self, id_: int, valores: Sequence[Optional[str]], datos: Any = None) -> None:
+        """
+        Indexa (o reemplaza) un documento con un valor por campo
+        """
+        texto = SEPARADOR.join(normalizar(v) for v in valores)
+        if all(v is None or v.isascii() for v in valores):
+            con_acentos = texto
+        else:
+            con_acentos = SEPARADOR.join(normalizar(v, sin_acentos=False) for v in valores)
+        claves = _claves(texto)
+        with self._lock:
+            anterior = self._textos.get(id_)
+            if anterior is not None:
+                self._obsoletas += len(_claves(anterior))
+            self._textos[id_] = texto
+            if con_acentos != texto:
+                self._con_acentos[id_] = con_acentos
+            else:
+                self._con_acentos.pop(id_, None)
+            if datos is not None:
+                self._datos[id_] = datos
+            else:
+                self._datos.pop(id_, None)
+            listas = self._listas
+            for clave in claves:
+                listas[clave].append(id_)
+            self._entradas += len(claves)
+            self._compactar_si_conviene()
+
+    def eliminar(self, id_: int) -> None:
+        with self._lock:
+            texto = self._textos.pop(id_, None)
+            if texto is not None:
+                self._con_acentos.pop(id_, None)
+                self._datos.pop(id_, None)
+                self._obsoletas += len(_claves(texto))
+                self._compactar_si_conviene()
+
+    def buscar(
+        self,
+        texto: str,
+        limit: Optional[int] = 20,
+        sin_acentos: bool = True,
+        campos: Optional[Sequence[str]] = None,
+        filtro: Optional[Callable[[Any], bool]] = None,
+        ordenar: bool = True,
+    ) -> List[int]:
+        """
+        Devuelve los ids que contienen el texto
+
+        Con ordenar, de más a menos relevante: coincidencia al inicio del
+        campo, luego al inicio de una palabra, luego en cualquier posición; a
+        igualdad, el campo declarado primero y el id más antiguo. Para acotar
+        la latencia con textos muy comunes se verifican como mucho
+        BUSQUEDA_MAX_CANDIDATOS documentos (el recorrido también termina si ya
+        hay limit coincidencias del mejor nivel posible). Sin ordenar se
+        devuelven las primeras limit coincidencias, sin tope de candidatos.
+
+        Args:
+            texto: Texto buscado
+            limit: Máximo de resultados (None para todos)
+            sin_acentos: Si es False, "Muñoz" no coincide con "munoz"
+            campos: Restringe la búsqueda a estos campos
+            filtro: Recibe los datos del documento y decide si se incluye
+            ordenar: Ordenar por relevancia (autocompletado) o no (filtros)
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return []
+        exacta = consulta if sin_acentos else normalizar(texto, sin_acentos=False)
+        permitidos = {self.campos.index(c) for c in campos} if campos else None
+        mejor_nivel = (0, min(permitidos) if permitidos else 0)
+        tope = settings.BUSQUEDA_MAX_CANDIDATOS if ordenar else None
+
+        resultados = []
+        en_mejor_nivel = 0
+        with self._lock:
+            vistos = set()
+            for id_ in self._candidatos(consulta):
+                if id_ in vistos:
+                    continue
+                vistos.add(id_)
+                if tope is not None and len(vistos) > tope:
+                    break
+                documento = self._textos.get(id_)
+                if documento is None:
+                    continue
+                if not sin_acentos:
+                    documento = self._con_acentos.get(id_, documento)
+                nivel = _nivel(documento, exacta, permitidos)
+                if nivel is None or (filtro and not filtro(self._datos.get(id_))):
+                    continue
+                resultados.append((nivel, id_))
+                if limit is None:
+                    continue
+                if not ordenar and len(resultados) >= limit:
+                    break
+                if nivel == mejor_nivel:
+                    en_mejor_nivel += 1
+                    if en_mejor_nivel >= limit:
+                        break
+
+        if not ordenar:
+            return [id_ for _, id_ in resultados]
+        if limit is None:
+            resultados.sort()
+        else:
+            resultados = heapq.nsmallest(limit, resultados)
+        return [id_ for _, id_ in resultados]
+
+    def _candidatos(self, consulta: str):
+        if len(consulta) < 3:
+            return self._listas.get(_PREFIJO + consulta, ())
+        listas = [self._listas.get(c) for c in {consulta[i:i + 3] for i in range(len(consulta) - 2)}]
+        if any(lista is None for lista in listas):
+            return ()
+        # Basta recorrer la lista más corta: la verificación descarta el resto
+        return min(listas, key=len)
+
+    def _compactar_si_conviene(self) -> None:
+        if self._obsoletas * 4 <= self._entradas or self._entradas < 10000:
+            return
+        listas: Dict[str, array] = defaultdict(_lista_vacia)
+        for id_, texto in self._textos.items():
+            for clave in _claves(texto):
+                listas[clave].append(id_)
+        self._listas = listas
+        self._entradas = sum(len(lista) for lista in listas.values())
+        self._obsoletas = 0
+
+
+def _nivel(documento: str, consulta: str, permitidos) -> Optional[Tuple[int, int]]:
+    """
+    (clase, campo) de la mejor aparición de la consulta en el documento
+    """
+    mejor = None
+    pos = documento.find(consulta)
+    while pos >= 0:
+        campo = documento.count(SEPARADOR, 0, pos)
+        if permitidos is None or campo in permitidos:
+            anterior = documento[pos - 1] if pos else SEPARADOR
+            clase = 0 if anterior == SEPARADOR else 1 if anterior == " " else 2
+            if mejor is None or (clase, campo) < mejor:
+                mejor = (clase, campo)
+                if clase == 0:
+                    break
+        pos = documento.find(consulta, pos + 1)
+    return mejor
+
+
+# Qué se indexa de cada entidad: columna id, columnas de texto y datos extra
+FUENTES = {
+    "clientes": (Cliente.id_cliente, (Cliente.nombre, Cliente.email, Cliente.telefono), None),
+    "productos": (Producto.id_producto, (Producto.nombre, Producto.descripcion), Producto.activo),
+}
+
+_indices: Dict[str, IndiceBusqueda] = {}
+_construyendo: set = set()
+_pendientes: Dict[str, List[Callable[[IndiceBusqueda], None]]] = {}
+_indices_lock = threading.Lock()
+
+
+def _construir(db: Session, nombre: str) -> IndiceBusqueda:
+    id_col, columnas, datos_col = FUENTES[nombre]
+    indice = IndiceBusqueda([c.key for c in columnas])
+    seleccion = [id_col, *columnas] + ([datos_col] if datos_col is not None else [])
+    for fila in db.execute(select(*seleccion).execution_options(yield_per=10000)):
+        indice.agregar(fila[0], fila[1:1 + len(columnas)], fila[-1] if datos_col is not None else None)
+    return indice
+
+
+def _construir_en_segundo_plano(nombre: str) -> None:
+    # Engine síncrono aun en modo DB_ASYNC: el hilo no tiene event loop
+    from app.db.session import SessionLocal
+
+    def construir():
+        indice = None
+        try:
+            with SessionLocal() as sesion:
+                indice = _construir(sesion, nombre)
+        finally:
+            # Bajo el mismo lock que _aplicar: un cambio queda en _pendientes
+            # (y se aplica aquí) o ve ya el índice nuevo, nunca se pierde
+            with _indices_lock:
+                _construyendo.discard(nombre)
+                pendientes = _pendientes.pop(nombre, [])
+                if indice is not None:
+                    # Cambios hechos mientras se leía la tabla (agregar/eliminar son idempotentes)
+                    for cambio in pendientes:
+                        cambio(indice)
+                    _indices[nombre] = indice
+
+    _construyendo.add(nombre)
+    _pendientes[nombre] = []
+    threading.Thread(target=construir, name=f"indice-{nombre}", daemon=True).start()
+
+
+def precargar() -> None:
+    """
+    Construye los índices en segundo plano (al iniciar la aplicación)
+    """
+    with _indices_lock:
+        for nombre in FUENTES:
+            if nombre not in _indices and nombre not in _construyendo:
+                _construir_en_segundo_plano(nombre)
+
+
+def obtener_indice(db: Session, nombre: str) -> Optional[IndiceBusqueda]:
+    """
+    Devuelve el índice de la entidad, o None mientras se construye por
+    primera vez en segundo plano (el llamador recurre entonces a LIKE)
+
+    Si nadie lo precargó, se construye en la primera búsqueda. Cada proceso
+    tiene su propio índice: los cambios hechos por otros workers aparecen
+    cuando el índice cumple BUSQUEDA_RECARGA segundos y se reconstruye en
+    segundo plano (mientras tanto responde el anterior).
+    """
+    indice = _indices.get(nombre)
+    if indice is None:
+        with _indices_lock:
+            indice = _indices.get(nombre)
+            if indice is None:
+                if nombre in _construyendo:
+                    return None
+                indice = _indices[nombre] = _construir(db, nombre)
+    elif (
+        time.monotonic() - indice.creado > settings.BUSQUEDA_RECARGA
+        and nombre not in _construyendo
+    ):
+        with _indices_lock:
+            if nombre not in _construyendo:
+                _construir_en_segundo_plano(nombre)
+    return indice
+
+
+def _aplicar(nombre: str, cambio: Callable[[IndiceBusqueda], None]) -> None:
+    with _indices_lock:
+        if nombre in _pendientes:
+            _pendientes[nombre].append(cambio)
+        # Se lee dentro del lock: si el reemplazo ya ocurrió, éste es el índice nuevo
+        indice = _indices.get(nombre)
+    if indice is not None:
+        cambio(indice)
+
+
+def indexar_cliente(cliente: Cliente) -> None:
+    """
+    Actualiza el índice de clientes tras crear o modificar uno
+    """
+    id_, valores = cliente.id_cliente, (cliente.nombre, cliente.email, cliente.telefono)
+    _aplicar("clientes", lambda indice: indice.agregar(id_, valores))
+
+
+def indexar_producto(producto: Producto) -> None:
+    id_, valores, activo = producto.id_producto, (producto.nombre, producto.descripcion), producto.activo
+    _aplicar("productos", lambda indice: indice.agregar(id_, valores, activo))
+
+
+def quitar(nombre: str, id_: int) -> None:
+    _aplicar(nombre, lambda indice: indice.eliminar(id_))
+
+
+def buscar_ids(
+    db: Session,
+    nombre: str,
+    texto: str,
+    limit: Optional[int] = 20,
+    sin_acentos: bool = True,
+    campos: Optional[Sequence[str]] = None,
+    filtro: Optional[Callable[[Any], bool]] = None,
+    ordenar: bool = True,
+) -> Optional[List[int]]:
+    """
+    Ids de la entidad que coinciden con el texto (ver IndiceBusqueda.buscar),
+    o None si el índice todavía no está disponible
+    """
+    indice = obtener_indice(db, nombre)
+    if indice is None:
+        return None
+    return indice.buscar(texto, limit, sin_acentos, campos, filtro, ordenar)
+
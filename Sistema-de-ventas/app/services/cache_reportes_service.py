@@ -0,0 +1,208 @@
+# app/services/cache_reportes_service.py
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import version_crud
+
+TAMANO_BLOQUE = 64 * 1024
+
+# Fila de versiones_catalogo que incrementan las escrituras de ventas, pagos y clientes
+DATOS = "ventas"
+
+_lock = threading.Lock()
+_contadores = {"aciertos": 0, "fallos": 0, "guardados": 0, "desalojos": 0}
+
+
+class Artefacto(NamedTuple):
+    archivo: BinaryIO  # abierto: sigue siendo legible aunque otro proceso lo desaloje
+    tamano: int
+    etag: str
+    content_type: str
+
+
+def _sumar(contador: str, cantidad: int = 1) -> None:
+    with _lock:
+        _contadores[contador] += cantidad
+
+
+def _directorio(*partes: str) -> str:
+    ruta = os.path.join(settings.REPORTES_CACHE_DIR, *partes)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def sello_datos(db: Session) -> str:
+    """
+    Sello de la versión de los datos de los reportes: una lectura por clave
+    primaria de la fila que incrementa registrar_cambio
+    """
+    return f"v{version_crud.get_version(db, DATOS)}"
+
+
+def registrar_cambio(db: Session) -> None:
+    """
+    Invalida los reportes cacheados (altas, cambios y borrados de ventas,
+    pagos o clientes) en la misma transacción que la escritura; llamar antes
+    del commit
+    """
+    version_crud.incrementar(db, DATOS)
+
+
+def clave(tipo: str, filtros: Dict[str, Any], formato: str, sello: str) -> str:
+    """
+    Clave del artefacto: tipo de reporte, filtros, formato y sello de datos
+    """
+    crudo = json.dumps([tipo, filtros, formato.lower(), sello], sort_keys=True, default=str)
+    return hashlib.sha256(crudo.encode()).hexdigest()
+
+
+def _ruta_clave(clave_: str) -> str:
+    return os.path.join(_directorio("claves", clave_[:2]), clave_)
+
+
+def _ruta_objeto(digest: str) -> str:
+    return os.path.join(_directorio("objetos", digest[:2]), digest)
+
+
+def obtener(clave_: str) -> Optional[Artefacto]:
+    """
+    Abre el artefacto guardado para la clave, o None si no está (o expiró)
+    """
+    try:
+        with open(_ruta_clave(clave_)) as puntero:
+            digest, content_type, creado = puntero.read().split("\n", 2)
+        # El TTL cuenta desde que se generó el reporte, no desde el último acierto
+        if time.time() - float(creado) > settings.REPORTES_CACHE_TTL:
+            raise FileNotFoundError(clave_)
+        ruta = _ruta_objeto(digest)
+        archivo = open(ruta, "rb")
+        # atime no es confiable (noatime): el mtime del objeto marca su último
+        # uso, sólo para el LRU
+        os.utime(ruta)
+    except (FileNotFoundError, ValueError):
+        _sumar("fallos")
+        return None
+    _sumar("aciertos")
+    return Artefacto(archivo, os.fstat(archivo.fileno()).st_size, f'"{digest}"', content_type)
+
+
+def guardar_al_enviar(clave_: str, contenido: Iterable[bytes], content_type: str) -> Iterator[bytes]:
+    """
+    Devuelve los bloques del reporte a medida que se generan y los copia a la caché
+
+    El primer byte sale sin esperar al reporte completo; al agotarse el
+    contenido se publica el objeto, nombrado por el SHA-256 de su contenido
+    (dos claves con el mismo resultado comparten archivo), y la clave pasa a
+    apuntar a ese hash. Si el envío se corta (cliente desconectado o error al
+    generar) la copia parcial se descarta y no se guarda nada.
+    """
+    hash_ = hashlib.sha256()
+    try:
+        with tempfile.NamedTemporaryFile(dir=_directorio("tmp"), delete=False) as temporal:
+            try:
+                for bloque in contenido:
+                    hash_.update(bloque)
+                    temporal.write(bloque)
+                    yield bloque
+            except BaseException:
+                os.remove(temporal.name)
+                raise
+    finally:
+        cerrar = getattr(contenido, "close", None)
+        if cerrar is not None:
+            cerrar()
+    digest = hash_.hexdigest()
+    os.replace(temporal.name, _ruta_objeto(digest))
+
+    # El puntero guarda cuándo se generó: de ahí cuenta el TTL
+    puntero = _ruta_clave(clave_)
+    with open(puntero + ".tmp", "w") as archivo:
+        archivo.write(f"{digest}\n{content_type}\n{time.time():.3f}")
+    os.replace(puntero + ".tmp", puntero)
+
+    _sumar("guardados")
+    _desalojar()
+
+
+def _desalojar() -> None:
+    # Objetos sin uso durante REPORTES_CACHE_TTL (todo puntero hacia ellos ya
+    # venció) y después LRU por mtime hasta quedar bajo REPORTES_CACHE_MAX_MB
+    vencimiento = time.time() - settings.REPORTES_CACHE_TTL
+    objetos = []
+    for raiz, _, archivos in os.walk(_directorio("objetos")):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            if estado.st_mtime < vencimiento:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+                _sumar("desalojos")
+                continue
+            objetos.append((estado.st_mtime, estado.st_size, ruta))
+
+    limite = settings.REPORTES_CACHE_MAX_MB * 1024 * 1024
+    total = sum(tamano for _, tamano, _ in objetos)
+    for _, tamano, ruta in sorted(objetos):
+        if total <= limite:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total -= tamano
+        _sumar("desalojos")
+
+    # Punteros vencidos: se escriben una sola vez, su mtime es la creación
+    for raiz, _, archivos in os.walk(_directorio("claves")):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            try:
+                if os.path.getmtime(ruta) < vencimiento:
+                    os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+
+def leer_en_bloques(archivo: BinaryIO):
+    try:
+        while True:
+            bloque = archivo.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def estadisticas() -> Dict[str, Any]:
+    """
+    Contadores de este proceso y ocupación actual del directorio
+    """
+    with _lock:
+        datos: Dict[str, Any] = dict(_contadores)
+    consultas = datos["aciertos"] + datos["fallos"]
+    datos["tasa_aciertos"] = datos["aciertos"] / consultas if consultas else None
+    tamanos = []
+    for raiz, _, archivos in os.walk(_directorio("objetos")):
+        for nombre in archivos:
+            try:
+                tamanos.append(os.path.getsize(os.path.join(raiz, nombre)))
+            except FileNotFoundError:
+                pass
+    datos["objetos"] = len(tamanos)
+    datos["bytes"] = sum(tamanos)
+    datos["limite_bytes"] = settings.REPORTES_CACHE_MAX_MB * 1024 * 1024
+    return datos
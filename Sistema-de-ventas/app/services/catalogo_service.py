@@ -0,0 +1,121 @@
+# app/services/catalogo_service.py
+import secrets
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.paginacion import decodificar_cursor
+from app.crud import version_crud
+from app.models.producto import Producto
+from app.schemas.producto import Producto as ProductoSchema
+
+CATALOGO = "productos"
+
+# Identifica a este proceso en las versiones locales, para que un ETag
+# emitido por otro worker (con su propio contador) nunca coincida por azar
+_proceso = secrets.token_hex(4)
+_lock = threading.RLock()
+_version_local = 0
+_version_db: Optional[int] = None
+_version_db_leida = 0.0
+_snapshot: Optional["Snapshot"] = None
+
+
+class Snapshot(NamedTuple):
+    version: str
+    productos: List[ProductoSchema]  # ordenados por id_producto
+    por_id: Dict[int, ProductoSchema]
+
+
+def version_actual(db: Session) -> str:
+    """
+    Versión vigente del catálogo de productos
+
+    Por defecto se lee la fila de versiones_catalogo, compartida por todos
+    los workers, como mucho una vez cada CATALOGO_VERSION_TTL segundos. Con
+    CATALOGO_VERSION_DB desactivado es un contador en memoria que no ve los
+    cambios de otros procesos: sólo sirve con un único worker.
+    """
+    global _version_db, _version_db_leida
+    if not settings.CATALOGO_VERSION_DB:
+        return f"{_proceso}.{_version_local}"
+    if _version_db is None or time.monotonic() - _version_db_leida > settings.CATALOGO_VERSION_TTL:
+        valor = version_crud.get_version(db, CATALOGO)
+        with _lock:
+            _version_db, _version_db_leida = valor, time.monotonic()
+    return f"db.{_version_db}"
+
+
+def registrar_cambio(db: Session) -> None:
+    """
+    Incrementa la fila de versión en la misma transacción que la escritura
+    del producto (sólo con CATALOGO_VERSION_DB); llamar antes del commit
+    """
+    if not settings.CATALOGO_VERSION_DB:
+        return
+    version_crud.incrementar(db, CATALOGO)
+
+
+def invalidar() -> None:
+    """
+    Descarta el snapshot tras un commit que modificó productos
+    """
+    global _version_local, _version_db, _snapshot
+    with _lock:
+        _version_local += 1
+        _version_db = None  # fuerza releer la fila compartida
+        _snapshot = None
+
+
+def obtener_snapshot(db: Session) -> Snapshot:
+    """
+    Catálogo completo en memoria para la versión vigente, cargado con una
+    sola consulta cuando la versión cambia
+    """
+    global _snapshot
+    version = version_actual(db)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    productos = [
+        ProductoSchema.model_validate(p)
+        for p in db.scalars(select(Producto).order_by(Producto.id_producto))
+    ]
+    snapshot = Snapshot(version, productos, {p.id_producto: p for p in productos})
+    with _lock:
+        # Si hubo una invalidación mientras se cargaba, no se guarda
+        if version == version_actual(db):
+            _snapshot = snapshot
+    return snapshot
+
+
+def listar(
+    snapshot: Snapshot,
+    skip: int = 0,
+    limit: Optional[int] = 100,
+    activo: Optional[bool] = None,
+    cursor: Optional[str] = None,
+) -> List[ProductoSchema]:
+    """
+    Misma paginación que producto_crud.get_productos, sobre el snapshot
+    """
+    productos = snapshot.productos
+    if activo is not None:
+        productos = [p for p in productos if bool(p.activo) == activo]
+    if cursor:
+        ultimo_id = decodificar_cursor(cursor, (Producto.id_producto,))[0]
+        productos = [p for p in productos if p.id_producto > ultimo_id]
+    elif skip:
+        productos = productos[skip:]
+    return productos if limit is None else productos[:limit]
+
+
+def contar(snapshot: Snapshot, activo: Optional[bool] = None) -> int:
+    if activo is None:
+        return len(snapshot.productos)
+    return sum(1 for p in snapshot.productos if bool(p.activo) == activo)
@@ -0,0 +1,452 @@
+# app/services/columnar_service.py
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo se coordinan los hilos de un mismo proceso
+    fcntl = None
+
+from app.core.config import settings
+from app.db.marcas import ahora
+from app.models.detalle_venta import DetalleVenta
+from app.models.pago import Pago
+from app.models.venta import Venta, TipoVenta, EstadoVenta
+
+# Cuánto se relee hacia atrás de la última marca de modificación: cubre
+# transacciones que escribieron antes de un refresco pero confirmaron después
+MARGEN_MARCA = timedelta(minutes=5)
+
+# Reconstrucciones seguidas antes de desistir (escrituras concurrentes)
+INTENTOS_RECONSTRUCCION = 3
+
+# Cada cuánto (segundos) un proceso vuelve a mirar meta.json
+REVISION_META = 1.0
+
+CODIGOS_TIPO = {TipoVenta.contado: 0, TipoVenta.credito: 1}
+# Una venta con estado NULL cuenta como pendiente (el default del modelo)
+CODIGOS_ESTADO = {None: 0, EstadoVenta.pendiente: 0, EstadoVenta.pagada: 1, EstadoVenta.cancelada: 2}
+
+
+def _enteros(valores: List[Any], dtype: str, diccionarios: Dict[str, List]) -> np.ndarray:
+    return np.array(valores, dtype=dtype)
+
+
+def _dias(valores: List[Any], dtype: str, diccionarios: Dict[str, List]) -> np.ndarray:
+    # Días desde 1970-01-01; -1 si la fecha es NULL
+    if any(v is not None and v.tzinfo is not None for v in valores):
+        valores = [v.replace(tzinfo=None) if v is not None else None for v in valores]
+    fechas = np.array(valores, dtype="datetime64[D]")
+    dias = fechas.astype(np.int64)
+    dias[np.isnat(fechas)] = -1
+    return dias.astype(dtype)
+
+
+def _codigos(mapa: Dict[Any, int]) -> Callable:
+    def convertir(valores: List[Any], dtype: str, diccionarios: Dict[str, List]) -> np.ndarray:
+        return np.fromiter((mapa[v] for v in valores), dtype=dtype, count=len(valores))
+    return convertir
+
+
+def _diccionario(nombre: str) -> Callable:
+    # Texto de pocos valores distintos: se guarda el código y la lista en meta.json
+    def convertir(valores: List[Any], dtype: str, diccionarios: Dict[str, List]) -> np.ndarray:
+        lista = diccionarios.setdefault(nombre, [None])
+        codigos = {valor: i for i, valor in enumerate(lista)}
+        resultado = np.empty(len(valores), dtype=dtype)
+        for i, valor in enumerate(valores):
+            codigo = codigos.get(valor)
+            if codigo is None:
+                codigo = codigos[valor] = len(lista)
+                lista.append(valor)
+            resultado[i] = codigo
+        return resultado
+    return convertir
+
+
+class Columna(NamedTuple):
+    nombre: str
+    expresion: Any
+    dtype: str
+    convertir: Callable = _enteros
+
+
+class Tabla(NamedTuple):
+    nombre: str
+    columnas: Tuple[Columna, ...]  # la primera es el id: orden y marca de agua
+    origen: Any  # FROM de la consulta (puede incluir joins)
+    marca: Any = None  # columna actualizado_en, si la tabla se modifica
+
+
+TABLAS = (
+    Tabla(
+        "ventas",
+        (
+            Columna("id", Venta.id_venta, "i8"),
+            Columna("id_cliente", Venta.id_cliente, "i4"),
+            Columna("dia", Venta.fecha_venta, "i4", _dias),
+            Columna("tipo", Venta.tipo_venta, "i1", _codigos(CODIGOS_TIPO)),
+            Columna("estado", Venta.estado, "i1", _codigos(CODIGOS_ESTADO)),
+            Columna("total", Venta.total, "f8"),
+            Columna("total_pagado", Venta.total_pagado, "f8"),
+        ),
+        Venta.__table__,
+        Venta.actualizado_en,
+    ),
+    Tabla(
+        # Los detalles no se modifican; la fecha de la venta se copia para
+        # filtrar por período sin cruzar con ventas
+        "detalles",
+        (
+            Columna("id", DetalleVenta.id_detalle, "i8"),
+            Columna("id_venta", DetalleVenta.id_venta, "i8"),
+            Columna("id_producto", DetalleVenta.id_producto, "i4"),
+            Columna("dia", Venta.fecha_venta, "i4", _dias),
+            Columna("cantidad", DetalleVenta.cantidad, "i4"),
+            Columna("subtotal", DetalleVenta.subtotal, "f8"),
+        ),
+        DetalleVenta.__table__.join(Venta.__table__, DetalleVenta.id_venta == Venta.id_venta),
+    ),
+    Tabla(
+        "pagos",
+        (
+            Columna("id", Pago.id_pago, "i8"),
+            Columna("id_venta", Pago.id_venta, "i8"),
+            Columna("dia", Pago.fecha_pago, "i4", _dias),
+            Columna("metodo", Pago.metodo_pago, "i2", _diccionario("metodo")),
+            Columna("monto", Pago.monto, "f8"),
+        ),
+        Pago.__table__,
+        Pago.actualizado_en,
+    ),
+)
+
+
+class Instantanea:
+    """
+    Vista de sólo lectura de las columnas, mapeadas en memoria desde disco
+
+    Cada proceso abre los mismos archivos: las páginas las comparte el sistema
+    operativo y sólo se leen las columnas que usa cada consulta.
+    """
+
+    def __init__(self, meta: Dict[str, Any]) -> None:
+        self.version = meta["version"]
+        self.actualizado = meta["actualizado"]
+        self.diccionarios = meta["diccionarios"]
+        self.filas = {nombre: estado["filas"] for nombre, estado in meta["tablas"].items()}
+        self.tablas: Dict[str, Dict[str, np.ndarray]] = {}
+        directorio = _directorio_generacion(meta["generacion"])
+        for tabla in TABLAS:
+            filas = self.filas[tabla.nombre]
+            self.tablas[tabla.nombre] = {
+                columna.nombre: (
+                    np.memmap(_archivo(directorio, tabla, columna), dtype=columna.dtype, mode="r", shape=(filas,))
+                    if filas else np.empty(0, dtype=columna.dtype)
+                )
+                for columna in tabla.columnas
+            }
+        # Resultados derivados (p. ej. posición de la venta de cada detalle)
+        self.derivados: Dict[str, Any] = {}
+        self._derivados_lock = threading.Lock()
+
+    def derivado(self, clave: str, calcular: Callable[[], Any]) -> Any:
+        with self._derivados_lock:
+            if clave not in self.derivados:
+                self.derivados[clave] = calcular()
+            return self.derivados[clave]
+
+
+_actual: Optional[Instantanea] = None
+_revisado = 0.0
+_lock = threading.Lock()
+_refrescando = threading.Lock()
+
+
+def _ruta_meta() -> str:
+    return os.path.join(settings.ANALITICA_DIR, "meta.json")
+
+
+def _directorio_generacion(generacion: str) -> str:
+    return os.path.join(settings.ANALITICA_DIR, generacion)
+
+
+def _archivo(directorio: str, tabla: Tabla, columna: Columna) -> str:
+    return os.path.join(directorio, f"{tabla.nombre}.{columna.nombre}.bin")
+
+
+def _leer_meta() -> Optional[Dict[str, Any]]:
+    try:
+        with open(_ruta_meta()) as archivo:
+            return json.load(archivo)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _escribir_meta(meta: Dict[str, Any]) -> None:
+    temporal = _ruta_meta() + ".tmp"
+    with open(temporal, "w") as archivo:
+        json.dump(meta, archivo)
+    os.replace(temporal, _ruta_meta())
+
+
+@contextmanager
+def _bloqueo_escritura():
+    # Un solo escritor entre procesos; los demás siguen leyendo lo publicado
+    if not _refrescando.acquire(blocking=False):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        with open(os.path.join(settings.ANALITICA_DIR, ".bloqueo"), "w") as cerrojo:
+            try:
+                fcntl.flock(cerrojo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            yield True
+    finally:
+        _refrescando.release()
+
+
+def _crear_directorio_generacion() -> str:
+    marca = int(time.time() * 1000)
+    while True:
+        generacion = f"g{marca}"
+        try:
+            os.makedirs(_directorio_generacion(generacion))
+            return generacion
+        except FileExistsError:
+            marca += 1
+
+
+def _nueva_generacion(anterior: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "version": anterior["version"] if anterior else 0,
+        "generacion": _crear_directorio_generacion(),
+        "actualizado": None,
+        "diccionarios": {},
+        "tablas": {t.nombre: {"filas": 0, "ultimo_id": 0, "marca": None} for t in TABLAS},
+    }
+
+
+def _generacion_incremental(anterior: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generación nueva con los mismos archivos que la publicada, enlazados
+    (hard links) para no copiarlos: el refresco agrega filas al final, que
+    los lectores de la publicada no ven porque mapean sólo sus filas, y antes
+    de modificar filas existentes copia la columna (ver _separar)
+    """
+    meta = json.loads(json.dumps(anterior))
+    meta["generacion"] = _crear_directorio_generacion()
+    origen = _directorio_generacion(anterior["generacion"])
+    destino = _directorio_generacion(meta["generacion"])
+    for nombre in os.listdir(origen):
+        try:
+            os.link(os.path.join(origen, nombre), os.path.join(destino, nombre))
+        except OSError:  # sin soporte de hard links: se copia
+            shutil.copyfile(os.path.join(origen, nombre), os.path.join(destino, nombre))
+    return meta
+
+
+def _separar(ruta: str) -> None:
+    # Reemplaza el enlace por una copia propia: modificarla no toca lo que
+    # leen los procesos que mapean la generación publicada
+    temporal = ruta + ".tmp"
+    shutil.copyfile(ruta, temporal)
+    os.replace(temporal, ruta)
+
+
+def _lotes(db: Session, consulta, tabla: Tabla, diccionarios: Dict[str, List]):
+    resultado = db.execute(consulta.execution_options(yield_per=settings.ANALITICA_LOTE))
+    for filas in resultado.partitions():
+        valores = list(zip(*filas))
+        yield {
+            columna.nombre: columna.convertir(list(valores[i]), columna.dtype, diccionarios)
+            for i, columna in enumerate(tabla.columnas)
+        }
+
+
+def _refrescar_tabla(db: Session, tabla: Tabla, meta: Dict[str, Any]) -> bool:
+    """
+    Aplica a una tabla las modificaciones y altas desde el último refresco
+
+    Devuelve False si la instantánea ya no coincide con la base (borrados o
+    filas confirmadas con un id menor a la marca de agua): hay que reconstruir.
+    """
+    directorio = _directorio_generacion(meta["generacion"])
+    estado = meta["tablas"][tabla.nombre]
+    filas, ultimo_id = estado["filas"], estado["ultimo_id"]
+    id_col = tabla.columnas[0].expresion
+    seleccion = select(*(c.expresion for c in tabla.columnas)).select_from(tabla.origen)
+
+    # Descarta lo que haya dejado a medias un refresco interrumpido
+    for columna in tabla.columnas:
+        ruta = _archivo(directorio, tabla, columna)
+        with open(ruta, "ab") as archivo:
+            archivo.truncate(filas * np.dtype(columna.dtype).itemsize)
+
+    # La marca es la hora de inicio del refresco (con el reloj con que la app
+    # escribe actualizado_en), no el máximo de la columna: con una carga
+    # masiva todas las filas comparten ese máximo y se releerían enteras
+    marca_nueva = ahora()
+    if tabla.marca is not None and filas and estado["marca"]:
+        desde = datetime.fromisoformat(estado["marca"]) - MARGEN_MARCA
+        cambios = seleccion.where(id_col <= ultimo_id, tabla.marca > desde).order_by(id_col)
+        ids = np.memmap(_archivo(directorio, tabla, tabla.columnas[0]), dtype="i8", mode="r", shape=(filas,))
+        separadas = False
+        for lote in _lotes(db, cambios, tabla, meta["diccionarios"]):
+            posiciones = np.minimum(np.searchsorted(ids, lote["id"]), filas - 1)
+            if not np.array_equal(ids[posiciones], lote["id"]):
+                return False
+            if not separadas:
+                for columna in tabla.columnas[1:]:
+                    _separar(_archivo(directorio, tabla, columna))
+                separadas = True
+            for columna in tabla.columnas[1:]:
+                destino = np.memmap(
+                    _archivo(directorio, tabla, columna), dtype=columna.dtype, mode="r+", shape=(filas,)
+                )
+                destino[posiciones] = lote[columna.nombre]
+                destino.flush()
+
+    altas = seleccion.where(id_col > ultimo_id).order_by(id_col)
+    for lote in _lotes(db, altas, tabla, meta["diccionarios"]):
+        for columna in tabla.columnas:
+            with open(_archivo(directorio, tabla, columna), "ab") as archivo:
+                archivo.write(lote[columna.nombre].tobytes())
+        filas += len(lote["id"])
+        ultimo_id = int(lote["id"][-1])
+
+    existentes = db.scalar(select(func.count()).select_from(tabla.origen).where(id_col <= ultimo_id))
+    if existentes != filas:
+        return False
+    estado.update(
+        filas=filas,
+        ultimo_id=ultimo_id,
+        marca=marca_nueva.isoformat() if tabla.marca is not None else None,
+    )
+    return True
+
+
+def refrescar(db: Session, completo: bool = False) -> bool:
+    """
+    Actualiza la instantánea: modificaciones por marca de modificación y
+    altas por marca de agua de id. Si detecta borrados (o completo es True)
+    la reconstruye en una generación nueva.
+
+    Returns:
+        False si otro hilo o proceso ya estaba refrescando
+    """
+    os.makedirs(settings.ANALITICA_DIR, exist_ok=True)
+    with _bloqueo_escritura() as propio:
+        if not propio:
+            return False
+        anterior = _leer_meta()
+        # Nunca se escribe sobre la generación publicada: los lectores verían
+        # unas columnas actualizadas y otras no
+        if anterior is None or completo:
+            meta = _nueva_generacion(anterior)
+        else:
+            meta = _generacion_incremental(anterior)
+        for _ in range(INTENTOS_RECONSTRUCCION):
+            completa = all(_refrescar_tabla(db, tabla, meta) for tabla in TABLAS)
+            db.rollback()
+            if completa:
+                break
+            meta = _nueva_generacion(anterior)
+        else:
+            raise RuntimeError("La instantánea no coincide con la base tras reconstruirla")
+
+        meta["version"] += 1
+        meta["actualizado"] = time.time()
+        _escribir_meta(meta)
+        _publicar(meta)
+        _limpiar_generaciones(meta["generacion"])
+    return True
+
+
+def _publicar(meta: Dict[str, Any]) -> None:
+    global _actual
+    with _lock:
+        if _actual is None or meta["version"] != _actual.version:
+            _actual = Instantanea(meta)
+
+
+def _limpiar_generaciones(vigente: str) -> None:
+    # Los procesos que aún mapean una generación vieja la siguen leyendo en
+    # POSIX; en Windows el borrado falla y se reintenta en el próximo refresco
+    for nombre in os.listdir(settings.ANALITICA_DIR):
+        ruta = os.path.join(settings.ANALITICA_DIR, nombre)
+        if nombre != vigente and nombre.startswith("g") and os.path.isdir(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+
+
+def _refrescar_en_segundo_plano() -> None:
+    # Engine síncrono aun en modo DB_ASYNC: el hilo no tiene event loop
+    from app.db.session import SessionLocal
+
+    def ejecutar():
+        with SessionLocal() as sesion:
+            refrescar(sesion)
+
+    threading.Thread(target=ejecutar, name="analitica-refresco", daemon=True).start()
+
+
+def precargar() -> None:
+    """
+    Abre la instantánea guardada y la refresca en segundo plano (al iniciar la aplicación)
+    """
+    obtener()
+    _refrescar_en_segundo_plano()
+
+
+def obtener() -> Optional[Instantanea]:
+    """
+    Devuelve la instantánea publicada más reciente, o None si todavía no hay
+    ninguna (la primera se está construyendo)
+
+    Si tiene más de ANALITICA_RECARGA segundos se dispara un refresco en
+    segundo plano; mientras tanto responde la actual.
+    """
+    global _revisado
+    if _actual is None or time.monotonic() - _revisado > REVISION_META:
+        _revisado = time.monotonic()
+        meta = _leer_meta()
+        if meta is not None:
+            _publicar(meta)
+        vencida = meta is None or time.time() - meta["actualizado"] > settings.ANALITICA_RECARGA
+        if vencida and not _refrescando.locked():
+            _refrescar_en_segundo_plano()
+    return _actual
+
+
+def estadisticas() -> Dict[str, Any]:
+    """
+    Filas, marcas de agua, tamaño en disco y antigüedad de la instantánea
+    """
+    meta = _leer_meta()
+    if meta is None:
+        return {"disponible": False, "refrescando": _refrescando.locked()}
+    directorio = _directorio_generacion(meta["generacion"])
+    return {
+        "disponible": True,
+        "refrescando": _refrescando.locked(),
+        "version": meta["version"],
+        "generacion": meta["generacion"],
+        "antiguedad_segundos": time.time() - meta["actualizado"],
+        "tablas": meta["tablas"],
+        "bytes": sum(os.path.getsize(os.path.join(directorio, n)) for n in os.listdir(directorio)),
+    }
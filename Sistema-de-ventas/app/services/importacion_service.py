@@ -0,0 +1,48 @@
+# app/services/importacion_service.py
+import csv
+from io import StringIO
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.pago import PagoCreate
+
+COLUMNAS_PAGOS = ("id_venta", "monto", "metodo_pago", "observaciones")
+
+
+def leer_pagos_csv(contenido: bytes) -> Tuple[List[Optional[PagoCreate]], Dict[int, str]]:
+    """
+    Lee un archivo de conciliación bancaria con columnas
+    id_venta, monto, metodo_pago y observaciones (las dos últimas opcionales)
+
+    Args:
+        contenido: Bytes del CSV (UTF-8, con o sin BOM; coma o punto y coma)
+
+    Returns:
+        Lista de pagos (None en las filas inválidas) y errores por índice de fila
+    """
+    texto = contenido.decode("utf-8-sig")
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:4096], delimiters=",;")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.DictReader(StringIO(texto), dialect=dialecto)
+
+    faltantes = [c for c in COLUMNAS_PAGOS[:2] if c not in (lector.fieldnames or [])]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+
+    pagos: List[Optional[PagoCreate]] = []
+    errores: Dict[int, str] = {}
+    for indice, fila in enumerate(lector):
+        datos = {c: (fila.get(c) or "").strip() or None for c in COLUMNAS_PAGOS}
+        if datos["monto"]:
+            datos["monto"] = datos["monto"].replace(",", ".")
+        try:
+            pagos.append(PagoCreate(**datos))
+        except ValidationError as e:
+            pagos.append(None)
+            errores[indice] = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )
+    return pagos, errores
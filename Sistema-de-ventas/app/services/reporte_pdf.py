@@ -0,0 +1,310 @@
+# app/services/reporte_pdf.py
+"""
+Maquetación de los reportes en PDF con reportlab
+
+Separado de reporte_service para que reportlab se importe recién con el
+primer PDF pedido y no en el arranque de cada worker.
+"""
+import zlib
+from datetime import date, datetime
+from io import BytesIO
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFName, PDFStream
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+FILAS_POR_TABLA = 35  # filas por tabla, aprox. una página carta
+
+def generar_pdf_cliente(resumen: Dict[str, Any]) -> bytes:
+    """
+    Genera un PDF con el resumen de facturación de un cliente
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+    
+    # Estilos personalizados
+    title_style = styles["Heading1"]
+    subtitle_style = styles["Heading2"]
+    normal_style = styles["Normal"]
+    
+    # Título
+    elements.append(Paragraph("Resumen de Facturación", title_style))
+    elements.append(Spacer(1, 12))
+    
+    # Información del cliente
+    cliente = resumen["cliente"]
+    elements.append(Paragraph(f"Cliente: {cliente.nombre}", subtitle_style))
+    elements.append(Paragraph(f"ID: {cliente.id_cliente}", normal_style))
+    if cliente.telefono:
+        elements.append(Paragraph(f"Teléfono: {cliente.telefono}", normal_style))
+    if cliente.email:
+        elements.append(Paragraph(f"Email: {cliente.email}", normal_style))
+    if cliente.direccion:
+        elements.append(Paragraph(f"Dirección: {cliente.direccion}", normal_style))
+    elements.append(Spacer(1, 12))
+    
+    # Resumen de totales
+    elements.append(Paragraph("Resumen de Compras", subtitle_style))
+    elements.append(Paragraph(f"Total en Compras: ${resumen['total_compras']:.2f}", normal_style))
+    elements.append(Paragraph(f"Total Pagado: ${resumen['total_pagado']:.2f}", normal_style))
+    elements.append(Paragraph(f"Saldo Pendiente: ${resumen['saldo_total']:.2f}", normal_style))
+    elements.append(Spacer(1, 12))
+    
+    # Detalle de ventas
+    elements.append(Paragraph("Detalle de Ventas", subtitle_style))
+    
+    if not resumen["ventas"]:
+        elements.append(Paragraph("No hay ventas registradas para este cliente.", normal_style))
+    else:
+        # Encabezados de la tabla
+        data = [["ID", "Fecha", "Tipo", "Total", "Pagado", "Saldo", "Estado"]]
+        
+        # Datos de ventas
+        for venta in resumen["ventas"]:
+            data.append([
+                str(venta.id_venta),
+                venta.fecha_venta.strftime("%d/%m/%Y"),
+                venta.tipo_venta.value,
+                f"${venta.total:.2f}",
+                f"${venta.total_pagado:.2f}",
+                f"${venta.saldo_pendiente:.2f}",
+                venta.estado_pago
+            ])
+        
+        # Crear tabla
+        table = Table(data, colWidths=[30, 70, 60, 60, 60, 60, 60])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        
+        elements.append(table)
+    
+    # Agregar fecha de generación del reporte
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph(f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
+    
+    # Generar PDF
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+class _CanvasComprimido(Canvas):
+    """
+    Canvas que comprime el contenido de cada página al cerrarla
+
+    reportlab guarda el texto de todas las páginas hasta save(); comprimirlo
+    en showPage reduce lo retenido a los bytes finales del PDF.
+    """
+
+    def showPage(self):
+        super().showPage()
+        pagina = self._doc.Pages.pages[-1]
+        contenido = pagina.stream
+        if isinstance(contenido, str):
+            contenido = contenido.encode("latin-1")
+        stream = PDFStream(content=zlib.compress(contenido))
+        stream.dictionary["Filter"] = PDFArray([PDFName("FlateDecode")])
+        pagina.Contents = stream
+        pagina.stream = None
+
+class _DocumentoIncremental(SimpleDocTemplate):
+    """
+    SimpleDocTemplate que pide los flowables a un iterador a medida que
+    los va maquetando, en lugar de recibirlos todos en una lista
+    """
+
+    def __init__(self, destino, pendientes: Iterator, **kwargs):
+        super().__init__(destino, **kwargs)
+        self._pendientes = pendientes
+        self._cola = None
+
+    def build(self, flowables, **kwargs):
+        self._cola = flowables
+        super().build(flowables, **kwargs)
+
+    def filterFlowables(self, flowables):
+        # reportlab también procesa aquí sus listas internas; sólo se
+        # rellena la cola principal, dejando algunos flowables para keepWithNext
+        if flowables is not self._cola:
+            return
+        while len(flowables) < 3:
+            siguiente = next(self._pendientes, None)
+            if siguiente is None:
+                break
+            flowables.append(siguiente)
+
+def _tablas(filas: Iterable[list], encabezado: list, anchos: list) -> Iterator[Table]:
+    """
+    Agrupa las filas en tablas del tamaño de una página, cada una con su encabezado
+    """
+    estilo = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    data = [encabezado]
+    for fila in filas:
+        data.append(fila)
+        if len(data) > FILAS_POR_TABLA:
+            yield Table(data, colWidths=anchos, style=estilo, repeatRows=1)
+            data = [encabezado]
+    if len(data) > 1:
+        yield Table(data, colWidths=anchos, style=estilo, repeatRows=1)
+
+def _tablas_ventas(filas: Iterable[Tuple]) -> Iterator[Table]:
+    encabezado = ["ID", "Fecha", "Cliente", "Tipo", "Estado", "Total"]
+    formateadas = (
+        [
+            str(id_venta),
+            fecha_venta.strftime("%d/%m/%Y"),
+            nombre_cliente,
+            tipo_venta.value,
+            estado.value,
+            f"${total:.2f}"
+        ]
+        for id_venta, fecha_venta, nombre_cliente, tipo_venta, estado, total in filas
+    )
+    return _tablas(formateadas, encabezado, [30, 70, 120, 60, 60, 60])
+
+def generar_pdf_ventas(
+    filas: Iterable[Tuple], 
+    resumen: Dict[str, Any],
+    fecha_inicio: date, 
+    fecha_fin: date, 
+    tipo_venta: Optional[str] = None, 
+    estado: Optional[str] = None,
+    destino=None
+) -> Optional[bytes]:
+    """
+    Genera un PDF con el reporte de ventas
+
+    Las filas (id, fecha, cliente, tipo, estado, total) se consumen a medida
+    que se maquetan. Si se pasa destino, el PDF se escribe ahí; si no, se
+    devuelven sus bytes.
+    """
+    buffer = destino if destino is not None else BytesIO()
+    styles = getSampleStyleSheet()
+    elements = []
+    
+    # Estilos personalizados
+    title_style = styles["Heading1"]
+    subtitle_style = styles["Heading2"]
+    normal_style = styles["Normal"]
+    
+    # Título
+    elements.append(Paragraph("Reporte de Ventas", title_style))
+    elements.append(Spacer(1, 12))
+    
+    # Filtros aplicados
+    elements.append(Paragraph("Filtros aplicados:", subtitle_style))
+    elements.append(Paragraph(f"Período: {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}", normal_style))
+    if tipo_venta:
+        elements.append(Paragraph(f"Tipo de venta: {tipo_venta}", normal_style))
+    if estado:
+        elements.append(Paragraph(f"Estado: {estado}", normal_style))
+    elements.append(Spacer(1, 12))
+    
+    # Resumen de ventas
+    elements.append(Paragraph("Resumen:", subtitle_style))
+    elements.append(Paragraph(f"Total de ventas: {resumen['cantidad']}", normal_style))
+    elements.append(Paragraph(f"Monto total: ${resumen['total_ventas']:.2f}", normal_style))
+    elements.append(Paragraph(f"Monto en ventas de contado: ${resumen['total_contado']:.2f}", normal_style))
+    elements.append(Paragraph(f"Monto en ventas a crédito: ${resumen['total_credito']:.2f}", normal_style))
+    elements.append(Spacer(1, 12))
+    
+    # Detalle de ventas
+    elements.append(Paragraph("Detalle de Ventas", subtitle_style))
+    
+    if not resumen["cantidad"]:
+        elements.append(Paragraph("No se encontraron ventas con los filtros especificados.", normal_style))
+        tablas = iter(())
+    else:
+        tablas = _tablas_ventas(filas)
+    
+    # Agregar fecha de generación del reporte
+    pie = [
+        Spacer(1, 30),
+        Paragraph(f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style),
+    ]
+    
+    # Generar PDF: las tablas se crean a medida que el documento avanza
+    doc = _DocumentoIncremental(buffer, chain(tablas, pie), pagesize=letter)
+    doc.build(elements, canvasmaker=_CanvasComprimido)
+    if destino is not None:
+        return None
+    return buffer.getvalue()
+
+def generar_pdf_antiguedad(
+    filas: Iterable[Tuple],
+    totales: Dict[str, Any],
+    corte: date,
+    destino=None
+) -> Optional[bytes]:
+    """
+    Genera un PDF con la antigüedad de saldos por cliente
+
+    Las filas (id, cliente, 0-30, 31-60, 61-90, +90, total, ventas, venta más
+    antigua) se consumen a medida que se maquetan, igual que en el reporte
+    de ventas.
+    """
+    buffer = destino if destino is not None else BytesIO()
+    styles = getSampleStyleSheet()
+    title_style = styles["Heading1"]
+    subtitle_style = styles["Heading2"]
+    normal_style = styles["Normal"]
+    
+    elements = [
+        Paragraph("Antigüedad de Saldos", title_style),
+        Spacer(1, 12),
+        Paragraph(f"Ventas a crédito con saldo al {corte.strftime('%d/%m/%Y')}", normal_style),
+        Spacer(1, 12),
+        Paragraph("Resumen:", subtitle_style),
+        Paragraph(f"Clientes con saldo: {totales['clientes']}", normal_style),
+        Paragraph(f"0 a 30 días: ${totales['saldo_0_30']:.2f}", normal_style),
+        Paragraph(f"31 a 60 días: ${totales['saldo_31_60']:.2f}", normal_style),
+        Paragraph(f"61 a 90 días: ${totales['saldo_61_90']:.2f}", normal_style),
+        Paragraph(f"Más de 90 días: ${totales['saldo_90_mas']:.2f}", normal_style),
+        Paragraph(f"Saldo total: ${totales['saldo_total']:.2f}", normal_style),
+        Spacer(1, 12),
+        Paragraph("Detalle por Cliente", subtitle_style),
+    ]
+    
+    if not totales["clientes"]:
+        elements.append(Paragraph("No hay saldos pendientes con los filtros especificados.", normal_style))
+        tablas = iter(())
+    else:
+        encabezado = ["ID", "Cliente", "0-30", "31-60", "61-90", "+90", "Total"]
+        formateadas = (
+            [str(id_cliente), nombre, *(f"${v:.2f}" for v in (d30, d60, d90, mas, total))]
+            for id_cliente, nombre, d30, d60, d90, mas, total, _, _ in filas
+        )
+        tablas = _tablas(formateadas, encabezado, [35, 140, 60, 60, 60, 60, 65])
+    
+    pie = [
+        Spacer(1, 30),
+        Paragraph(f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style),
+    ]
+    
+    doc = _DocumentoIncremental(buffer, chain(tablas, pie), pagesize=letter)
+    doc.build(elements, canvasmaker=_CanvasComprimido)
+    if destino is not None:
+        return None
+    return buffer.getvalue()
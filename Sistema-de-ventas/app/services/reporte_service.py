@@ -1,145 +1,207 @@
 # app/services/reporte_service.py
-from io import BytesIO
-from typing import Tuple, Optional, List, Dict, Any
+import csv
+from enum import Enum
+from io import StringIO
+from tempfile import SpooledTemporaryFile
+from typing import Tuple, Optional, List, Dict, Any, Callable, Iterable, Iterator
+from sqlalchemy import case
 from sqlalchemy.orm import Session
-from datetime import date, datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
+from datetime import date, datetime, timedelta
 
-from app.crud import cliente_crud, venta_crud
-from app.models.venta import Venta, TipoVenta, EstadoVenta
+from app.crud import antiguedad_crud, cliente_crud, resumen_diario_crud, venta_crud
+from app.models.venta import Venta
 from app.models.cliente import Cliente
-from app.models.pago import Pago
-from app.models.detalle_venta import DetalleVenta
-from app.schemas.reporte import ReporteSaldoOut
 
-def obtener_saldos(db: Session) -> List[ReporteSaldoOut]:
-    """
-    Consulta la vista 'vista_saldos' directamente desde la base de datos
-    """
-    query = """
-        SELECT 
-            id_venta,
-            id_cliente,
-            nombre_cliente,
-            fecha_venta,
-            tipo_venta,
-            total_venta,
-            total_pagado,
-            saldo_pendiente,
-            estado_pago
-        FROM vista_saldos
-    """
-    result = db.execute(query)
-    rows = result.fetchall()
-    return [ReporteSaldoOut(**dict(row._mapping)) for row in rows]
+# Parámetros del reporte de ventas en streaming
+FILAS_POR_LOTE = 1000  # filas por fetch del cursor del servidor
+TAMANO_BLOQUE = 64 * 1024  # bytes por bloque enviado al cliente
+TAMANO_MAXIMO_EN_MEMORIA = 8 * 1024 * 1024  # luego el archivo pasa a disco
 
+# Formatos que exportan filas planas, sin maquetación
+FORMATOS_TABULARES = ("csv", "xlsx")
 
-def generar_reporte_cliente(db: Session, cliente_id: int, formato: str = "pdf") -> Tuple[bytes, str]:
+# Recibe (filas procesadas, total de filas o None si no se conoce)
+AlAvanzar = Callable[[int, Optional[int]], None]
+
+def generar_reporte_cliente(
+    db: Session, cliente_id: int, formato: str = "pdf", al_avanzar: Optional[AlAvanzar] = None
+) -> Tuple[Iterator[bytes], str]:
     """
     Genera un reporte de facturación para un cliente específico
     
     Args:
         db: Sesión de base de datos
         cliente_id: ID del cliente
-        formato: Formato del reporte (pdf, csv, etc.)
+        formato: Formato del reporte (pdf, csv o xlsx)
+        al_avanzar: Se llama cada FILAS_POR_LOTE filas exportadas; si lanza
+            una excepción, la generación se interrumpe
         
     Returns:
-        Tupla con (bytes del reporte, tipo de contenido)
+        Tupla con (iterador de bloques del reporte, tipo de contenido)
     """
+    formato = formato.lower()
+    
+    if formato in FORMATOS_TABULARES:
+        if not cliente_crud.get_cliente(db, cliente_id):
+            raise ValueError(f"Cliente con ID {cliente_id} no encontrado")
+        encabezado = ["ID", "Fecha", "Tipo", "Total", "Pagado", "Saldo", "Estado"]
+        filas = _con_avance(_filas_cliente(db, cliente_id), None, al_avanzar)
+        return exportar_filas(filas, encabezado, formato)
+    
+    if formato != "pdf":
+        raise ValueError(f"Formato {formato} no soportado")
+    
     # Obtener el resumen del cliente
-    resumen = cliente_crud.get_resumen_cliente(db, cliente_id)
+    # El PDF sólo usa columnas de la venta: sin cargar cliente ni detalles
+    resumen = venta_crud.get_resumen_cliente(db, cliente_id, carga=())
     if not resumen:
         raise ValueError(f"Cliente con ID {cliente_id} no encontrado")
     
-    if formato.lower() == "pdf":
-        return generar_pdf_cliente(resumen), "application/pdf"
-    else:
-        raise ValueError(f"Formato {formato} no soportado")
+    # reportlab se carga con el primer PDF, no al arrancar el worker
+    from app.services.reporte_pdf import generar_pdf_cliente
+    return iter([generar_pdf_cliente(resumen)]), "application/pdf"
 
-def generar_pdf_cliente(resumen: Dict[str, Any]) -> bytes:
+def _filas_cliente(db: Session, cliente_id: int) -> Iterator[Tuple]:
     """
-    Genera un PDF con el resumen de facturación de un cliente
+    Recorre las ventas del cliente con un cursor del lado del servidor
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    # Estilos personalizados
-    title_style = styles["Heading1"]
-    subtitle_style = styles["Heading2"]
-    normal_style = styles["Normal"]
-    
-    # Título
-    elements.append(Paragraph("Resumen de Facturación", title_style))
-    elements.append(Spacer(1, 12))
-    
-    # Información del cliente
-    cliente = resumen["cliente"]
-    elements.append(Paragraph(f"Cliente: {cliente.nombre}", subtitle_style))
-    elements.append(Paragraph(f"ID: {cliente.id_cliente}", normal_style))
-    if cliente.telefono:
-        elements.append(Paragraph(f"Teléfono: {cliente.telefono}", normal_style))
-    if cliente.email:
-        elements.append(Paragraph(f"Email: {cliente.email}", normal_style))
-    if cliente.direccion:
-        elements.append(Paragraph(f"Dirección: {cliente.direccion}", normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Resumen de totales
-    elements.append(Paragraph("Resumen de Compras", subtitle_style))
-    elements.append(Paragraph(f"Total en Compras: ${resumen['total_compras']:.2f}", normal_style))
-    elements.append(Paragraph(f"Total Pagado: ${resumen['total_pagado']:.2f}", normal_style))
-    elements.append(Paragraph(f"Saldo Pendiente: ${resumen['saldo_total']:.2f}", normal_style))
-    elements.append(Spacer(1, 12))
+    query = (
+        db.query(
+            Venta.id_venta,
+            Venta.fecha_venta,
+            Venta.tipo_venta,
+            Venta.total,
+            Venta.total_pagado,
+            Venta.saldo_pendiente,
+            case((Venta.saldo_pendiente <= 0, "Pagado"), else_="Pendiente"),
+        )
+        .filter(Venta.id_cliente == cliente_id)
+        .order_by(Venta.id_venta)
+    )
+    return iter(query.yield_per(FILAS_POR_LOTE))
+
+def _con_avance(filas: Iterable[Tuple], total: Optional[int], al_avanzar: Optional[AlAvanzar]) -> Iterator[Tuple]:
+    if al_avanzar is None:
+        yield from filas
+        return
+    procesadas = 0
+    for procesadas, fila in enumerate(filas, start=1):
+        yield fila
+        if procesadas % FILAS_POR_LOTE == 0:
+            al_avanzar(procesadas, total)
+    al_avanzar(procesadas, total)
+
+def _valor_plano(valor):
+    # Los Enum de los modelos se exportan por su valor
+    return valor.value if isinstance(valor, Enum) else valor
+
+def _csv_en_bloques(filas: Iterable[Tuple], encabezado: List[str]) -> Iterator[bytes]:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel reconozca UTF-8 (tildes y eñes)
+    buffer.write("\ufeff")
+    writer.writerow(encabezado)
+    for i, fila in enumerate(filas, start=1):
+        writer.writerow([_valor_plano(v) for v in fila])
+        if i % FILAS_POR_LOTE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def _xlsx_en_bloques(filas: Iterable[Tuple], encabezado: List[str]) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    # En modo write_only openpyxl vuelca cada fila a disco al agregarla
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Reporte")
+    hoja.append(encabezado)
+    for fila in filas:
+        hoja.append([
+            v.replace(tzinfo=None) if isinstance(v, datetime) else _valor_plano(v)
+            for v in fila
+        ])
     
-    # Detalle de ventas
-    elements.append(Paragraph("Detalle de Ventas", subtitle_style))
+    destino = SpooledTemporaryFile(max_size=TAMANO_MAXIMO_EN_MEMORIA)
+    libro.save(destino)
+    return _leer_en_bloques(destino)
+
+def exportar_filas(
+    filas: Iterable[Tuple],
+    encabezado: List[str],
+    formato: str
+) -> Tuple[Iterator[bytes], str]:
+    """
+    Convierte filas planas en un archivo CSV o XLSX enviado por bloques
+
+    El CSV se genera a medida que el cliente lo descarga; el XLSX se arma en
+    un archivo temporal (el formato es un zip) y luego se envía.
+    """
+    if formato == "csv":
+        return _csv_en_bloques(filas, encabezado), "text/csv; charset=utf-8"
+    if formato == "xlsx":
+        return (
+            _xlsx_en_bloques(filas, encabezado),
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    raise ValueError(f"Formato {formato} no soportado")
+
+def _filtrar_ventas(
+    query,
+    fecha_inicio: date,
+    fecha_fin: date,
+    tipo_venta: Optional[str] = None,
+    estado: Optional[str] = None
+):
+    """
+    Aplica a la consulta los filtros del reporte de ventas
+    """
+    # Filtrar por fechas: fecha_fin incluye el día completo, igual que el resumen diario
+    query = query.filter(Venta.fecha_venta >= fecha_inicio, Venta.fecha_venta < fecha_fin + timedelta(days=1))
     
-    if not resumen["ventas_con_saldo"]:
-        elements.append(Paragraph("No hay ventas registradas para este cliente.", normal_style))
-    else:
-        # Encabezados de la tabla
-        data = [["ID", "Fecha", "Tipo", "Total", "Pagado", "Saldo", "Estado"]]
-        
-        # Datos de ventas
-        for item in resumen["ventas_con_saldo"]:
-            venta = item["venta"]
-            data.append([
-                str(venta.id_venta),
-                venta.fecha_venta.strftime("%d/%m/%Y"),
-                venta.tipo_venta.value,
-                f"${venta.total:.2f}",
-                f"${item['total_pagado']:.2f}",
-                f"${item['saldo_pendiente']:.2f}",
-                item["estado_pago"]
-            ])
-        
-        # Crear tabla
-        table = Table(data, colWidths=[30, 70, 60, 60, 60, 60, 60])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
+    # Filtrar por tipo de venta si se especifica
+    if tipo_venta:
+        query = query.filter(Venta.tipo_venta == tipo_venta)
     
-    # Agregar fecha de generación del reporte
-    elements.append(Spacer(1, 30))
-    elements.append(Paragraph(f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
+    # Filtrar por estado si se especifica
+    if estado:
+        query = query.filter(Venta.estado == estado)
     
-    # Generar PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.getvalue()
+    return query
+
+def _resumen_ventas(db: Session, *filtros) -> Dict[str, Any]:
+    """
+    Totales del reporte leídos de ventas_diarias: el costo depende de los
+    días del rango, no de la cantidad de ventas
+    """
+    return resumen_diario_crud.get_totales(db, *filtros)
+
+def _filas_ventas(db: Session, *filtros) -> Iterator[Tuple]:
+    """
+    Recorre las ventas del reporte con un cursor del lado del servidor,
+    sin cargar el resultado completo en memoria
+    """
+    query = db.query(
+        Venta.id_venta,
+        Venta.fecha_venta,
+        Cliente.nombre,
+        Venta.tipo_venta,
+        Venta.estado,
+        Venta.total,
+    ).join(Cliente, Venta.id_cliente == Cliente.id_cliente)
+    query = _filtrar_ventas(query, *filtros).order_by(Venta.id_venta)
+    return iter(query.yield_per(FILAS_POR_LOTE))
+
+def _leer_en_bloques(archivo, tamano: int = TAMANO_BLOQUE) -> Iterator[bytes]:
+    try:
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(tamano)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
 
 def generar_reporte_ventas(
     db: Session, 
@@ -147,8 +209,9 @@ def generar_reporte_ventas(
     fecha_fin: date, 
     tipo_venta: Optional[str] = None, 
     estado: Optional[str] = None, 
-    formato: str = "pdf"
-) -> Tuple[bytes, str]:
+    formato: str = "pdf",
+    al_avanzar: Optional[AlAvanzar] = None
+) -> Tuple[Iterator[bytes], str]:
     """
     Genera un reporte de ventas según los filtros especificados
     
@@ -158,120 +221,76 @@ def generar_reporte_ventas(
         fecha_fin: Fecha de fin del reporte
         tipo_venta: Filtro por tipo de venta (contado/crédito)
         estado: Filtro por estado de la venta
-        formato: Formato del reporte (pdf, csv, etc.)
+        formato: Formato del reporte (pdf, csv o xlsx)
+        al_avanzar: Se llama cada FILAS_POR_LOTE filas exportadas; si lanza
+            una excepción, la generación se interrumpe
         
     Returns:
-        Tupla con (bytes del reporte, tipo de contenido)
+        Tupla con (iterador de bloques del reporte, tipo de contenido)
     """
-    # Consultar ventas según los filtros
-    query = db.query(
-        Venta, 
-        Cliente.nombre.label("nombre_cliente")
-    ).join(Cliente, Venta.id_cliente == Cliente.id_cliente)
-    
-    # Filtrar por fechas
-    query = query.filter(Venta.fecha_venta >= fecha_inicio, Venta.fecha_venta <= fecha_fin)
-    
-    # Filtrar por tipo de venta si se especifica
-    if tipo_venta:
-        query = query.filter(Venta.tipo_venta == tipo_venta)
-    
-    # Filtrar por estado si se especifica
-    if estado:
-        query = query.filter(Venta.estado == estado)
+    filtros = (fecha_inicio, fecha_fin, tipo_venta, estado)
+    formato = formato.lower()
     
-    # Ejecutar consulta
-    ventas = query.all()
+    if formato in FORMATOS_TABULARES:
+        encabezado = ["ID", "Fecha", "Cliente", "Tipo", "Estado", "Total"]
+        filas = _con_avance(_filas_ventas(db, *filtros), None, al_avanzar)
+        return exportar_filas(filas, encabezado, formato)
     
-    if formato.lower() == "pdf":
-        return generar_pdf_ventas(ventas, fecha_inicio, fecha_fin, tipo_venta, estado), "application/pdf"
+    if formato == "pdf":
+        from app.services.reporte_pdf import generar_pdf_ventas
+
+        resumen = _resumen_ventas(db, *filtros)
+        
+        # El PDF se escribe en un archivo temporal que pasa a disco si crece,
+        # y luego se envía por bloques
+        destino = SpooledTemporaryFile(max_size=TAMANO_MAXIMO_EN_MEMORIA)
+        filas = _con_avance(_filas_ventas(db, *filtros), resumen["cantidad"], al_avanzar)
+        generar_pdf_ventas(filas, resumen, *filtros, destino=destino)
+        return _leer_en_bloques(destino), "application/pdf"
     else:
         raise ValueError(f"Formato {formato} no soportado")
 
-def generar_pdf_ventas(
-    ventas: List[Tuple[Venta, str]], 
-    fecha_inicio: date, 
-    fecha_fin: date, 
-    tipo_venta: Optional[str] = None, 
-    estado: Optional[str] = None
-) -> bytes:
-    """
-    Genera un PDF con el reporte de ventas
+def generar_reporte_antiguedad(
+    db: Session,
+    corte: date,
+    filtros: Dict[str, Any],
+    orden: str = "saldo_total",
+    descendente: bool = True,
+    formato: str = "pdf",
+    al_avanzar: Optional[AlAvanzar] = None
+) -> Tuple[Iterator[bytes], str]:
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    # Estilos personalizados
-    title_style = styles["Heading1"]
-    subtitle_style = styles["Heading2"]
-    normal_style = styles["Normal"]
-    
-    # Título
-    elements.append(Paragraph("Reporte de Ventas", title_style))
-    elements.append(Spacer(1, 12))
-    
-    # Filtros aplicados
-    elements.append(Paragraph("Filtros aplicados:", subtitle_style))
-    elements.append(Paragraph(f"Período: {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}", normal_style))
-    if tipo_venta:
-        elements.append(Paragraph(f"Tipo de venta: {tipo_venta}", normal_style))
-    if estado:
-        elements.append(Paragraph(f"Estado: {estado}", normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Resumen de ventas
-    total_ventas = sum(venta.total for venta, _ in ventas)
-    total_contado = sum(venta.total for venta, _ in ventas if venta.tipo_venta == TipoVenta.contado)
-    total_credito = sum(venta.total for venta, _ in ventas if venta.tipo_venta == TipoVenta.credito)
-    
-    elements.append(Paragraph("Resumen:", subtitle_style))
-    elements.append(Paragraph(f"Total de ventas: {len(ventas)}", normal_style))
-    elements.append(Paragraph(f"Monto total: ${total_ventas:.2f}", normal_style))
-    elements.append(Paragraph(f"Monto en ventas de contado: ${total_contado:.2f}", normal_style))
-    elements.append(Paragraph(f"Monto en ventas a crédito: ${total_credito:.2f}", normal_style))
-    elements.append(Spacer(1, 12))
+    Genera el reporte de antigüedad de saldos de las ventas a crédito
     
-    # Detalle de ventas
-    elements.append(Paragraph("Detalle de Ventas", subtitle_style))
-    
-    if not ventas:
-        elements.append(Paragraph("No se encontraron ventas con los filtros especificados.", normal_style))
-    else:
-        # Encabezados de la tabla
-        data = [["ID", "Fecha", "Cliente", "Tipo", "Estado", "Total"]]
-        
-        # Datos de ventas
-        for venta, nombre_cliente in ventas:
-            data.append([
-                str(venta.id_venta),
-                venta.fecha_venta.strftime("%d/%m/%Y"),
-                nombre_cliente,
-                venta.tipo_venta.value,
-                venta.estado.value,
-                f"${venta.total:.2f}"
-            ])
-        
-        # Crear tabla
-        table = Table(data, colWidths=[30, 70, 120, 60, 60, 60])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+    Args:
+        db: Sesión de base de datos
+        corte: Fecha desde la que se cuentan los días de cada venta
+        filtros: cliente_id, nombre, saldo_minimo y tramo de antiguedad_crud
+        orden: Columna de orden (ver antiguedad_crud.ORDENES)
+        descendente: De mayor a menor
+        formato: Formato del reporte (pdf, csv o xlsx)
+        al_avanzar: Se llama cada FILAS_POR_LOTE filas exportadas; si lanza
+            una excepción, la generación se interrumpe
         
-        elements.append(table)
+    Returns:
+        Tupla con (iterador de bloques del reporte, tipo de contenido)
+    """
+    formato = formato.lower()
+    if formato not in FORMATOS_TABULARES and formato != "pdf":
+        raise ValueError(f"Formato {formato} no soportado")
     
-    # Agregar fecha de generación del reporte
-    elements.append(Spacer(1, 30))
-    elements.append(Paragraph(f"Reporte generado el {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", normal_style))
+    totales = antiguedad_crud.get_totales(db, corte, **filtros)
+    filas = _con_avance(
+        antiguedad_crud.filas_antiguedad(db, corte, orden=orden, descendente=descendente, **filtros),
+        totales["clientes"],
+        al_avanzar,
+    )
+    if formato in FORMATOS_TABULARES:
+        encabezado = ["ID", "Cliente", "0-30", "31-60", "61-90", "+90", "Total", "Ventas", "Venta más antigua"]
+        return exportar_filas(filas, encabezado, formato)
     
-    # Generar PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer.getvalue()
+    from app.services.reporte_pdf import generar_pdf_antiguedad
+
+    destino = SpooledTemporaryFile(max_size=TAMANO_MAXIMO_EN_MEMORIA)
+    generar_pdf_antiguedad(filas, totales, corte, destino=destino)
+    return _leer_en_bloques(destino), "application/pdf"
@@ -0,0 +1,479 @@
+# app/services/trabajos_reportes_service.py
+import json
+import multiprocessing
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo se coordinan los hilos de un mismo proceso
+    fcntl = None
+
+from app.core.config import settings
+
+# Cada cuántos bytes escritos el proceso de trabajo publica su avance
+INTERVALO_PROGRESO = 1024 * 1024
+
+ESTADOS_ACTIVOS = ("pendiente", "en_proceso", "cancelando")
+
+_ID_VALIDO = re.compile(r"[0-9a-f]{32}")
+
+# El estado de cada trabajo vive en REPORTES_JOBS_DIR/<id>.json, compartido
+# por todos los workers de la API; aquí sólo quedan los futures de este proceso
+_lock = threading.RLock()
+_anidado = 0
+_futures: Dict[str, Future] = {}
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class ColaLlena(Exception):
+    """Ya hay REPORTES_JOBS_MAX_COLA trabajos pendientes o en curso"""
+
+
+class _Cancelado(Exception):
+    """El proceso de trabajo encontró la marca de cancelación"""
+
+
+class Trabajo:
+    """
+    Estado de un reporte encolado, tal como está guardado en su archivo JSON
+    """
+
+    CAMPOS = (
+        "id", "tipo", "formato", "filename", "estado", "cancelando", "error", "archivo",
+        "content_type", "tamano", "filas", "creado_en", "terminado_en", "proceso", "anfitrion",
+    )
+
+    def __init__(self, id_trabajo: str, tipo: str, formato: str, filename: str) -> None:
+        self.id = id_trabajo
+        self.tipo = tipo
+        self.formato = formato
+        self.filename = filename
+        self.estado = "pendiente"  # los estados finales los fija _terminar
+        self.cancelando = False
+        self.error: Optional[str] = None
+        self.archivo: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.tamano: Optional[int] = None
+        self.filas: Optional[int] = None
+        self.creado_en = datetime.now()
+        self.terminado_en: Optional[datetime] = None
+        # Worker de la API que lo encoló: si muere, el trabajo no terminará
+        self.proceso = os.getpid()
+        self.anfitrion = socket.gethostname()
+
+    def a_dict(self) -> Dict[str, Any]:
+        datos = {campo: getattr(self, campo) for campo in self.CAMPOS}
+        for campo in ("creado_en", "terminado_en"):
+            if datos[campo] is not None:
+                datos[campo] = datos[campo].isoformat()
+        return datos
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Trabajo":
+        trabajo = cls(datos["id"], datos["tipo"], datos["formato"], datos["filename"])
+        for campo in cls.CAMPOS:
+            setattr(trabajo, campo, datos.get(campo))
+        for campo in ("creado_en", "terminado_en"):
+            if datos.get(campo) is not None:
+                setattr(trabajo, campo, datetime.fromisoformat(datos[campo]))
+        return trabajo
+
+
+def _ruta(id_trabajo: str, sufijo: str = "") -> str:
+    return os.path.join(settings.REPORTES_JOBS_DIR, id_trabajo + sufijo)
+
+
+def _quitar(ruta: str) -> None:
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def _publicar_progreso(id_trabajo: str, filas: int, total: Optional[int], escritos: int) -> None:
+    temporal = _ruta(id_trabajo, ".progreso.tmp")
+    with open(temporal, "w") as archivo:
+        archivo.write(f"{filas} {'' if total is None else total} {escritos}")
+    os.replace(temporal, _ruta(id_trabajo, ".progreso"))
+
+
+def _leer_progreso(id_trabajo: str) -> Optional[Tuple[int, Optional[int], int]]:
+    try:
+        with open(_ruta(id_trabajo, ".progreso")) as archivo:
+            filas, total, escritos = archivo.read().split(" ")
+        return int(filas), int(total) if total else None, int(escritos)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@contextmanager
+def _cerrojo():
+    """
+    Exclusión entre hilos y entre workers para leer y reescribir estados
+
+    Reentrante dentro de un hilo: el flock se toma sólo en el nivel exterior.
+    """
+    global _anidado
+    with _lock:
+        if _anidado or fcntl is None:
+            _anidado += 1
+            try:
+                yield
+            finally:
+                _anidado -= 1
+            return
+        os.makedirs(settings.REPORTES_JOBS_DIR, exist_ok=True)
+        with open(_ruta("", ".bloqueo"), "a") as cerrojo:
+            fcntl.flock(cerrojo, fcntl.LOCK_EX)
+            _anidado += 1
+            try:
+                yield
+            finally:
+                _anidado -= 1
+
+
+def _guardar(trabajo: Trabajo) -> None:
+    # Escritura atómica: quien lee ve el estado anterior o el nuevo, nunca uno a medias
+    temporal = _ruta(trabajo.id, ".json.tmp")
+    with open(temporal, "w") as archivo:
+        json.dump(trabajo.a_dict(), archivo)
+    os.replace(temporal, _ruta(trabajo.id, ".json"))
+
+
+def _leer(id_trabajo: str) -> Optional[Trabajo]:
+    if not _ID_VALIDO.fullmatch(id_trabajo):
+        return None
+    try:
+        with open(_ruta(id_trabajo, ".json")) as archivo:
+            return Trabajo.desde_dict(json.load(archivo))
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def _huerfano(trabajo: Trabajo) -> bool:
+    # Activo pero el worker que lo encoló ya no existe: nadie lo terminará.
+    # Sólo se puede comprobar en la misma máquina (y no en Windows, donde
+    # os.kill(pid, 0) terminaría el proceso)
+    if trabajo.estado not in ESTADOS_ACTIVOS or trabajo.anfitrion != socket.gethostname():
+        return False
+    if trabajo.proceso == os.getpid():
+        return trabajo.id not in _futures
+    if os.name == "nt":
+        return False
+    try:
+        os.kill(trabajo.proceso, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _vigente(trabajo: Optional[Trabajo]) -> Optional[Trabajo]:
+    """
+    Marca como fallido el trabajo huérfano y lo devuelve actualizado
+    """
+    if trabajo is None or not _huerfano(trabajo):
+        return trabajo
+    with _cerrojo():
+        trabajo = _leer(trabajo.id)
+        if trabajo is not None and _huerfano(trabajo):
+            trabajo.estado = "fallido"
+            trabajo.error = "El proceso que encoló el reporte terminó antes que el reporte"
+            trabajo.terminado_en = datetime.now()
+            _guardar(trabajo)
+            _quitar(_ruta(trabajo.id, ".progreso"))
+    return trabajo
+
+
+def _todos() -> List[Trabajo]:
+    try:
+        nombres = os.listdir(settings.REPORTES_JOBS_DIR)
+    except FileNotFoundError:
+        return []
+    trabajos = (_leer(nombre[:-len(".json")]) for nombre in nombres if nombre.endswith(".json"))
+    return [trabajo for trabajo in trabajos if trabajo is not None]
+
+
+def _renderizar(id_trabajo: str, tipo: str, parametros: Dict[str, Any]) -> Tuple[str, str, int, int]:
+    """
+    Genera el reporte en un proceso de trabajo y lo deja en REPORTES_JOBS_DIR
+
+    Corre fuera del proceso de la API, así que abre su propia sesión. El
+    avance se publica en un archivo cada FILAS_POR_LOTE filas y la cancelación
+    es cooperativa: se revisa la marca en cada aviso de avance y entre bloques
+    escritos (el PDF de cliente no recorre filas y sólo se cancela antes de empezar).
+    """
+    # Importados aquí para que el proceso de la API no cargue reportlab por esto.
+    # app.db.base registra todos los modelos: el proceso de trabajo arranca
+    # vacío y las relaciones de Venta se resuelven por nombre
+    import app.db.base  # noqa: F401
+    from app.db.replica import sesion_lectura
+    from app.services.reporte_service import generar_reporte_cliente, generar_reporte_ventas
+
+    marca = _ruta(id_trabajo, ".cancelar")
+    parcial = _ruta(id_trabajo, ".parcial")
+    avance = {"filas": 0, "total": None, "escritos": 0}
+
+    def al_avanzar(filas: int, total: Optional[int]) -> None:
+        if os.path.exists(marca):
+            raise _Cancelado()
+        avance.update(filas=filas, total=total)
+        _publicar_progreso(id_trabajo, filas, total, avance["escritos"])
+
+    if os.path.exists(marca):
+        raise _Cancelado()
+    _publicar_progreso(id_trabajo, 0, None, 0)
+
+    # En la réplica si está configurada: el trabajo corre después del POST
+    # que lo encoló, sin necesidad de leer escrituras recién hechas
+    db = sesion_lectura()
+    try:
+        if tipo == "cliente":
+            contenido, content_type = generar_reporte_cliente(db, al_avanzar=al_avanzar, **parametros)
+        else:
+            contenido, content_type = generar_reporte_ventas(db, al_avanzar=al_avanzar, **parametros)
+
+        publicado = 0
+        with open(parcial, "wb") as archivo:
+            for bloque in contenido:
+                if os.path.exists(marca):
+                    raise _Cancelado()
+                archivo.write(bloque)
+                avance["escritos"] += len(bloque)
+                if avance["escritos"] - publicado >= INTERVALO_PROGRESO:
+                    _publicar_progreso(id_trabajo, avance["filas"], avance["total"], avance["escritos"])
+                    publicado = avance["escritos"]
+        os.replace(parcial, _ruta(id_trabajo))
+        return _ruta(id_trabajo), content_type, avance["escritos"], avance["filas"]
+    except BaseException:
+        _quitar(parcial)
+        raise
+    finally:
+        db.close()
+        _quitar(marca)
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: un fork heredaría las conexiones del pool y los hilos de la API
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.REPORTES_JOBS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _terminar(id_trabajo: str, future: Future) -> None:
+    try:
+        archivo, content_type, tamano, filas = future.result()
+    except (CancelledError, _Cancelado):
+        estado, error = "cancelado", None
+    except Exception as e:
+        estado, error = "fallido", str(e) or type(e).__name__
+    else:
+        estado, error = "completado", None
+    with _cerrojo():
+        _futures.pop(id_trabajo, None)
+        trabajo = _leer(id_trabajo)
+        if trabajo is None:
+            # Descartado o purgado mientras corría
+            _quitar(_ruta(id_trabajo))
+        else:
+            trabajo.estado = estado
+            trabajo.error = error
+            if estado == "completado":
+                trabajo.archivo, trabajo.content_type, trabajo.tamano = archivo, content_type, tamano
+                trabajo.filas = filas
+            trabajo.terminado_en = datetime.now()
+            _guardar(trabajo)
+    _quitar(_ruta(id_trabajo, ".progreso"))
+
+
+def encolar(tipo: str, parametros: Dict[str, Any], formato: str, filename: str) -> Trabajo:
+    """
+    Encola la generación de un reporte en el pool de procesos
+
+    Args:
+        tipo: "cliente" o "ventas"
+        parametros: Argumentos de generar_reporte_cliente / generar_reporte_ventas
+            (sin db ni formato)
+        formato: Formato del reporte (pdf, csv o xlsx)
+        filename: Nombre con el que se descargará el archivo
+
+    Returns:
+        Trabajo creado
+
+    Lanza ColaLlena si ya hay REPORTES_JOBS_MAX_COLA trabajos activos
+    """
+    purgar()
+    os.makedirs(settings.REPORTES_JOBS_DIR, exist_ok=True)
+    # El tope es de todos los workers: se cuentan los estados del directorio
+    with _cerrojo():
+        activos = sum(1 for t in map(_vigente, _todos()) if t.estado in ESTADOS_ACTIVOS)
+        if activos >= settings.REPORTES_JOBS_MAX_COLA:
+            raise ColaLlena()
+        trabajo = Trabajo(uuid.uuid4().hex, tipo, formato, filename)
+        _guardar(trabajo)
+        future = _futures[trabajo.id] = _pool().submit(
+            _renderizar, trabajo.id, tipo, {**parametros, "formato": formato}
+        )
+    future.add_done_callback(lambda future: _terminar(trabajo.id, future))
+    return trabajo
+
+
+def obtener(id_trabajo: str) -> Optional[Trabajo]:
+    """
+    Trabajo con ese id, lo haya encolado este worker o cualquier otro
+    """
+    purgar()
+    return _vigente(_leer(id_trabajo))
+
+
+def cancelar(id_trabajo: str) -> Optional[Trabajo]:
+    """
+    Cancela un trabajo pendiente o en curso; si ya terminó, descarta su resultado
+
+    Desde cualquier worker: el que lo encoló puede sacarlo de la cola de su
+    pool; si no, la marca de cancelación lo detiene al empezar o en el
+    siguiente aviso de avance.
+    """
+    with _cerrojo():
+        trabajo = _vigente(_leer(id_trabajo))
+        if trabajo is None:
+            return None
+        if trabajo.estado not in ESTADOS_ACTIVOS:
+            _quitar(_ruta(id_trabajo, ".json"))
+            _quitar(_ruta(id_trabajo))
+            return trabajo
+        future = _futures.get(id_trabajo)
+    # Fuera del cerrojo: cancel() ejecuta _terminar de inmediato si lo logra
+    if future is not None and future.cancel():
+        return _leer(id_trabajo) or trabajo
+    with _cerrojo():
+        trabajo = _leer(id_trabajo) or trabajo
+        if trabajo.estado in ESTADOS_ACTIVOS:
+            trabajo.cancelando = True
+            _guardar(trabajo)
+            open(_ruta(id_trabajo, ".cancelar"), "w").close()
+    return trabajo
+
+
+def abrir_resultado(trabajo: Trabajo) -> Optional[BinaryIO]:
+    """
+    Abre el archivo de un trabajo completado; el descriptor sigue siendo
+    legible aunque purgar lo borre mientras se envía
+    """
+    if trabajo.estado != "completado":
+        return None
+    try:
+        return open(trabajo.archivo, "rb")
+    except FileNotFoundError:
+        return None
+
+
+def describir(trabajo: Trabajo) -> Dict[str, Any]:
+    estado = trabajo.estado
+    filas, total, escritos = trabajo.filas or 0, trabajo.filas, trabajo.tamano or 0
+    if estado in ESTADOS_ACTIVOS:
+        avance = _leer_progreso(trabajo.id)
+        if trabajo.cancelando:
+            estado = "cancelando"
+        elif avance is not None:
+            estado = "en_proceso"
+        filas, total, escritos = avance or (0, None, 0)
+    if estado == "completado":
+        progreso = 1.0
+    elif total:
+        progreso = min(filas / total, 1.0)
+    else:
+        progreso = None
+    return {
+        "id": trabajo.id,
+        "tipo": trabajo.tipo,
+        "formato": trabajo.formato,
+        "estado": estado,
+        "progreso": progreso,
+        "filas_procesadas": filas,
+        "filas_totales": total,
+        "bytes_generados": escritos,
+        "tamano": trabajo.tamano,
+        "error": trabajo.error,
+        "creado_en": trabajo.creado_en,
+        "terminado_en": trabajo.terminado_en,
+        "expira_en": (
+            trabajo.terminado_en + timedelta(seconds=settings.REPORTES_JOBS_TTL)
+            if trabajo.terminado_en else None
+        ),
+    }
+
+
+def listar() -> List[Trabajo]:
+    """
+    Trabajos de todos los workers que aún no expiraron, del más nuevo al más viejo
+    """
+    purgar()
+    return sorted(map(_vigente, _todos()), key=lambda t: t.creado_en, reverse=True)
+
+
+def purgar() -> None:
+    """
+    Olvida los trabajos terminados hace más de REPORTES_JOBS_TTL y borra sus
+    archivos, incluidos los que dejó otro proceso (p. ej. antes de reiniciar)
+    """
+    try:
+        nombres = os.listdir(settings.REPORTES_JOBS_DIR)
+    except FileNotFoundError:
+        return
+    limite = datetime.now() - timedelta(seconds=settings.REPORTES_JOBS_TTL)
+    vencimiento = time.time() - settings.REPORTES_JOBS_TTL
+    vigentes = set()
+    for nombre in nombres:
+        if not nombre.endswith(".json"):
+            continue
+        ruta = os.path.join(settings.REPORTES_JOBS_DIR, nombre)
+        id_trabajo = nombre[:-len(".json")]
+        try:
+            # El JSON se reescribe al terminar: si es más nuevo que el TTL, sigue vigente
+            if os.path.getmtime(ruta) >= vencimiento:
+                vigentes.add(id_trabajo)
+                continue
+        except FileNotFoundError:
+            continue
+        trabajo = _leer(id_trabajo)
+        if trabajo is not None and (trabajo.terminado_en is None or trabajo.terminado_en >= limite):
+            vigentes.add(id_trabajo)
+            continue
+        _quitar(ruta)
+        _quitar(_ruta(id_trabajo))
+
+    for nombre in nombres:
+        # .bloqueo y los archivos de trabajos vigentes se conservan
+        if nombre.startswith(".") or nombre.split(".", 1)[0] in vigentes:
+            continue
+        ruta = os.path.join(settings.REPORTES_JOBS_DIR, nombre)
+        try:
+            if os.path.getmtime(ruta) < vencimiento:
+                os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def cerrar() -> None:
+    """
+    Detiene el pool de procesos al apagar la aplicación
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
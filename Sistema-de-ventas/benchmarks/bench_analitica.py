@@ -0,0 +1,156 @@
+# benchmarks/bench_analitica.py
+"""
+Compara las agregaciones de /api/analytics con el GROUP BY equivalente en SQL
+
+Carga ventas, detalles y pagos sintéticos en un SQLite temporal (o en --url),
+construye la instantánea columnar y mide: construcción completa, refresco
+incremental tras un 1% de altas y modificaciones, y p50 de cada consulta
+contra la instantánea y contra la base.
+
+Uso:
+    python -m benchmarks.bench_analitica [--url mysql://...] [--ventas 1000000] [--repeticiones 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _p50(funcion, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def _cargar(engine, desde: int, cantidad: int, azar: random.Random, marca: datetime) -> None:
+    from app.models.detalle_venta import DetalleVenta
+    from app.models.pago import Pago
+    from app.models.venta import Venta
+
+    origen = datetime(2024, 1, 1)
+    ventas, detalles, pagos = [], [], []
+    for id_venta in range(desde + 1, desde + cantidad + 1):
+        total = float(azar.randint(10, 500))
+        pagado = total if azar.random() < 0.4 else 0.0
+        ventas.append({
+            "id_venta": id_venta,
+            "id_cliente": azar.randint(1, 5000),
+            "fecha_venta": origen + timedelta(minutes=azar.randrange(2 * 365 * 24 * 60)),
+            "tipo_venta": azar.choice(("contado", "credito")),
+            "estado": "pagada" if pagado else "pendiente",
+            "total": total,
+            "total_pagado": pagado,
+            "saldo_pendiente": total - pagado,
+            "actualizado_en": marca,
+        })
+        for _ in range(2):
+            detalles.append({
+                "id_venta": id_venta, "id_producto": azar.randint(1, 2000), "cantidad": azar.randint(1, 5),
+                "precio_unitario": 10.0, "subtotal": total / 2, "fecha_entrega": origen.date(),
+            })
+        if pagado:
+            pagos.append({
+                "id_venta": id_venta, "monto": pagado, "metodo_pago": azar.choice(("efectivo", "tarjeta", None)),
+                "actualizado_en": marca,
+            })
+    with engine.begin() as conn:
+        for tabla, filas in ((Venta, ventas), (DetalleVenta, detalles), (Pago, pagos)):
+            for inicio in range(0, len(filas), 50000):
+                conn.execute(tabla.__table__.insert(), filas[inicio:inicio + 50000])
+
+
+def _medir(args) -> None:
+    from sqlalchemy import func, select
+
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.detalle_venta import DetalleVenta
+    from app.models.pago import Pago
+    from app.models.venta import Venta
+    from app.services import analitica_service, columnar_service
+
+    Base.metadata.create_all(bind=engine)
+    azar = random.Random(7)
+    inicio = time.perf_counter()
+    # Historial escrito hace un día: fuera del margen que relee el refresco
+    _cargar(engine, 0, args.ventas, azar, datetime.utcnow() - timedelta(days=1))
+    print(f"{args.ventas} ventas cargadas en {time.perf_counter() - inicio:.1f} s")
+
+    with SessionLocal() as db:
+        inicio = time.perf_counter()
+        columnar_service.refrescar(db, completo=True)
+        construccion = time.perf_counter() - inicio
+
+        extra = max(args.ventas // 100, 1)
+        _cargar(engine, args.ventas, extra, azar, datetime.utcnow())
+        with engine.begin() as conn:
+            conn.execute(
+                Venta.__table__.update()
+                .where(Venta.id_venta <= extra)
+                .values(estado="cancelada", actualizado_en=datetime.utcnow())
+            )
+        inicio = time.perf_counter()
+        columnar_service.refrescar(db)
+        incremental = time.perf_counter() - inicio
+        estado = columnar_service.estadisticas()
+        print(f"instantánea: {construccion:.1f} s completa, {incremental:.2f} s incremental "
+              f"(+{extra} ventas, {extra} modificadas), {estado['bytes'] / 2**20:.0f} MB en disco")
+
+        instantanea = columnar_service.obtener()
+        dia = func.date(Venta.fecha_venta)
+        consultas = {
+            "por producto": (
+                lambda: analitica_service.ventas_por_producto(instantanea, limit=20),
+                lambda: db.execute(
+                    select(DetalleVenta.id_producto, func.sum(DetalleVenta.cantidad), func.sum(DetalleVenta.subtotal))
+                    .group_by(DetalleVenta.id_producto).order_by(func.sum(DetalleVenta.subtotal).desc()).limit(20)
+                ).all(),
+            ),
+            "por cliente": (
+                lambda: analitica_service.ventas_por_cliente(instantanea, limit=20),
+                lambda: db.execute(
+                    select(Venta.id_cliente, func.count(), func.sum(Venta.total), func.sum(Venta.total_pagado))
+                    .group_by(Venta.id_cliente).order_by(func.sum(Venta.total).desc()).limit(20)
+                ).all(),
+            ),
+            "por día": (
+                lambda: analitica_service.ventas_por_periodo(instantanea, "dia"),
+                lambda: db.execute(
+                    select(dia, func.count(), func.sum(Venta.total)).group_by(dia).order_by(dia)
+                ).all(),
+            ),
+            "por método": (
+                lambda: analitica_service.pagos_por_metodo(instantanea),
+                lambda: db.execute(
+                    select(Pago.metodo_pago, func.count(), func.sum(Pago.monto)).group_by(Pago.metodo_pago)
+                ).all(),
+            ),
+        }
+        print(f"{'consulta':>13} {'columnar p50':>13} {'SQL p50':>10} {'aceleración':>12}")
+        for nombre, (columnar, sql) in consultas.items():
+            c50, s50 = _p50(columnar, args.repeticiones), _p50(sql, args.repeticiones)
+            print(f"{nombre:>13} {c50:>11.1f}ms {s50:>8.1f}ms {s50 / c50:>11.1f}x")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL síncrona de la base (por defecto SQLite temporal)")
+    parser.add_argument("--ventas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La configuración se lee al importar app.core.config, antes de cargar la app
+        os.environ["SQLALCHEMY_DATABASE_URI"] = args.url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+        os.environ["ANALITICA_DIR"] = os.path.join(directorio, "analitica")
+        _medir(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/bench_arranque.py
+"""
+Mide el arranque en frío de un worker: importación de app.main, startup y primera petición
+
+Cada corrida es un proceso nuevo (como un worker recién creado por el
+autoescalado) sobre el mismo SQLite temporal. Se mide la importación de
+app.main, el evento startup de ASGI hasta startup.complete (cuando el
+servidor empieza a aceptar peticiones) y la primera petición. Compara el
+arranque con create_all (DB_ESQUEMA=crear) y con la comprobación de la
+revisión de Alembic (DB_ESQUEMA=verificar), e informa si reportlab u
+openpyxl quedaron cargados.
+
+Uso:
+    python -m benchmarks.bench_arranque [--corridas 7] [--calentar 0] [--importtime 15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+MODULOS_PESADOS = ("reportlab", "openpyxl", "alembic")
+
+
+class _CicloVida:
+    """
+    Protocolo lifespan de ASGI, como lo hace uvicorn al iniciar y detener el worker
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.entrada: asyncio.Queue = asyncio.Queue()
+        self.salida: asyncio.Queue = asyncio.Queue()
+        self.tarea = None
+
+    async def _esperar(self, evento: str) -> None:
+        mensaje = await self.salida.get()
+        if mensaje["type"] != f"lifespan.{evento}.complete":
+            raise RuntimeError(f"{evento} falló: {mensaje.get('message', mensaje)}")
+
+    async def iniciar(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self.tarea = asyncio.create_task(self.app(scope, self.entrada.get, self.salida.put))
+        await self.entrada.put({"type": "lifespan.startup"})
+        await self._esperar("startup")
+
+    async def detener(self) -> None:
+        await self.entrada.put({"type": "lifespan.shutdown"})
+        await self._esperar("shutdown")
+        await self.tarea
+
+
+def _medir_proceso() -> None:
+    # Proceso hijo: la configuración ya viene en el entorno
+    inicio = time.perf_counter()
+    from app.main import app
+    importacion = time.perf_counter() - inicio
+
+    import httpx
+
+    async def arrancar() -> Dict[str, float]:
+        ciclo = _CicloVida(app)
+        inicio = time.perf_counter()
+        await ciclo.iniciar()
+        arranque = time.perf_counter() - inicio
+
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+            inicio = time.perf_counter()
+            respuesta = await cliente.get("/api/clientes/1")
+            primera = time.perf_counter() - inicio
+        respuesta.raise_for_status()
+        await ciclo.detener()
+        return {"arranque": arranque, "primera": primera}
+
+    tiempos = asyncio.run(arrancar())
+    print(json.dumps({
+        "importacion": importacion * 1000,
+        "arranque": tiempos["arranque"] * 1000,
+        "primera": tiempos["primera"] * 1000,
+        "modulos": [m for m in MODULOS_PESADOS if m in sys.modules],
+    }))
+
+
+def _preparar(url: str) -> None:
+    os.environ["SQLALCHEMY_DATABASE_URI"] = url
+    from sqlalchemy import text
+
+    from app.db.base import Base
+    from app.db.migraciones import revisiones_head
+    from app.db.session import engine
+
+    # Tablas del modelo y revisión head registrada, como tras `alembic upgrade head`
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+        for revision in revisiones_head():
+            conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:r)"), {"r": revision})
+        conn.execute(text("INSERT INTO clientes (id_cliente, nombre) VALUES (1, 'Cliente 1')"))
+
+
+def _importtime(entorno: Dict[str, str], cantidad: int) -> None:
+    # -X importtime escribe en stderr: "import time: propio | acumulado | módulo"
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=entorno, check=True, capture_output=True, text=True,
+    ).stderr
+    filas = []
+    for linea in stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        modulo = partes[2][1:].rstrip()
+        # Sólo módulos de primer nivel del árbol de importación
+        if modulo.startswith("  ") and not modulo.startswith("   "):
+            filas.append((int(partes[1]), modulo.strip()))
+    filas.sort(reverse=True)
+    print("\nImportaciones más costosas de app.main (acumulado, -X importtime):")
+    for acumulado, modulo in filas[:cantidad]:
+        print(f"{acumulado / 1000:>9.1f} ms  {modulo}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corridas", type=int, default=7, help="procesos por modo; se informa la mediana")
+    parser.add_argument("--calentar", type=int, default=0, help="DB_CALENTAR de las corridas")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="mostrar las N importaciones más costosas")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        _medir_proceso()
+        return 0
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = f"sqlite:///{os.path.join(directorio, 'arranque.db')}"
+        _preparar(url)
+        entorno = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URI=url,
+            DB_CALENTAR=str(args.calentar),
+            # Sin trabajo de fondo al arrancar: se mide el arranque propio del worker
+            ANALITICA="0",
+            BUSQUEDA_INDICE="0",
+            ANALITICA_DIR=os.path.join(directorio, "analitica"),
+        )
+
+        medidas: Dict[str, List[dict]] = {}
+        for esquema in ("crear", "verificar"):
+            medidas[esquema] = []
+            for _ in range(args.corridas):
+                salida = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_arranque", "--hijo"],
+                    env={**entorno, "DB_ESQUEMA": esquema},
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                medidas[esquema].append(json.loads(salida.strip().splitlines()[-1]))
+
+        if args.importtime:
+            _importtime(entorno, args.importtime)
+
+    print(f"\n{'DB_ESQUEMA':>10} {'importación':>12} {'startup':>9} {'1.ª petición':>13} {'total':>9}  módulos cargados")
+    for esquema, corridas in medidas.items():
+        mediana = {
+            clave: statistics.median(c[clave] for c in corridas)
+            for clave in ("importacion", "arranque", "primera")
+        }
+        cargados = sorted({m for c in corridas for m in c["modulos"]})
+        print(
+            f"{esquema:>10} {mediana['importacion']:>10.1f}ms {mediana['arranque']:>7.1f}ms "
+            f"{mediana['primera']:>11.1f}ms {sum(mediana.values()):>7.1f}ms  {', '.join(cargados) or '-'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
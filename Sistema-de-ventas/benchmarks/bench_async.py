@@ -0,0 +1,140 @@
+# benchmarks/bench_async.py
+"""
+Compara la latencia (p50/p99) de las rutas en modo síncrono y asíncrono
+
+Cada modo corre en un proceso propio, porque DB_ASYNC se lee al importar la
+app. Las peticiones se hacen en proceso con httpx + ASGITransport, de modo
+que las rutas síncronas compiten por el threadpool igual que con uvicorn.
+Sin --url se usa un archivo SQLite temporal (aiosqlite en modo asíncrono).
+
+Uso:
+    python -m benchmarks.bench_async [--url mysql://...] [--concurrencia 10] [--peticiones 4000]
+
+Con más concurrencia que el pool (pool_size + max_overflow) el modo síncrono
+se queda esperando conexiones y termina en TimeoutError del pool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+RUTAS = ["/api/ventas/?limit=20", "/api/clientes/?limit=20", "/api/productos/?limit=20"]
+
+
+def _poblar(clientes: int, ventas: int) -> None:
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.models.cliente import Cliente
+    from app.models.detalle_venta import DetalleVenta
+    from app.models.producto import Producto
+    from app.models.venta import Venta, TipoVenta
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(Cliente.__table__.select().limit(1)).first():
+            return
+        conn.execute(Cliente.__table__.insert(), [{"nombre": f"Cliente {i}"} for i in range(clientes)])
+        conn.execute(Producto.__table__.insert(), [
+            {"nombre": f"Producto {i}", "precio_unitario": 10.0, "activo": True} for i in range(50)
+        ])
+        conn.execute(Venta.__table__.insert(), [
+            {
+                "id_venta": i + 1,
+                "id_cliente": i % clientes + 1,
+                "tipo_venta": TipoVenta.contado.name,
+                "total": 30.0,
+                "total_pagado": 0.0,
+                "saldo_pendiente": 30.0,
+            }
+            for i in range(ventas)
+        ])
+        conn.execute(DetalleVenta.__table__.insert(), [
+            {
+                "id_venta": i + 1,
+                "id_producto": i % 50 + 1,
+                "cantidad": 3,
+                "precio_unitario": 10.0,
+                "subtotal": 30.0,
+                "fecha_entrega": date(2024, 1, 1),
+            }
+            for i in range(ventas)
+        ])
+
+
+async def _disparar(concurrencia: int, peticiones: int) -> list:
+    import httpx
+    from app.main import app
+
+    latencias = []
+    semaforo = asyncio.Semaphore(concurrencia)
+    transporte = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        async def una(i: int) -> None:
+            async with semaforo:
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(RUTAS[i % len(RUTAS)])
+                latencias.append(time.perf_counter() - inicio)
+                respuesta.raise_for_status()
+
+        # Calentamiento: conexiones del pool e importaciones perezosas
+        await asyncio.gather(*(una(i) for i in range(min(concurrencia, 50))))
+        latencias.clear()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(una(i) for i in range(peticiones)))
+        duracion = time.perf_counter() - inicio
+    return latencias, duracion
+
+
+def _medir_modo(args) -> None:
+    _poblar(args.clientes, args.ventas)
+    latencias, duracion = asyncio.run(_disparar(args.concurrencia, args.peticiones))
+    cuantiles = statistics.quantiles(latencias, n=100)
+    print(json.dumps({
+        "modo": "async" if os.environ.get("DB_ASYNC") == "true" else "sync",
+        "p50_ms": cuantiles[49] * 1000,
+        "p99_ms": cuantiles[98] * 1000,
+        "rps": len(latencias) / duracion,
+    }))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL síncrona de la base (por defecto SQLite temporal)")
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--peticiones", type=int, default=4000)
+    parser.add_argument("--clientes", type=int, default=1000)
+    parser.add_argument("--ventas", type=int, default=5000)
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        _medir_modo(args)
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = args.url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+        print(f"{'modo':>6} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+        for modo in ("false", "true"):
+            entorno = dict(os.environ, SQLALCHEMY_DATABASE_URI=url, DB_ASYNC=modo, DB_ESQUEMA="nada")
+            salida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_async", "--hijo",
+                 "--concurrencia", str(args.concurrencia),
+                 "--peticiones", str(args.peticiones),
+                 "--clientes", str(args.clientes),
+                 "--ventas", str(args.ventas)],
+                env=entorno, check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(salida.strip().splitlines()[-1])
+            print(f"{r['modo']:>6} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['rps']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
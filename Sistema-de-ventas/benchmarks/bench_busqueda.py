@@ -0,0 +1,91 @@
+# benchmarks/bench_busqueda.py
+"""
+Compara el índice de búsqueda en memoria con LIKE '%texto%' sobre la tabla
+
+Genera clientes sintéticos con nombres en español (con tildes y eñes), email
+y teléfono, los carga en un SQLite temporal y mide: construcción del índice,
+memoria que ocupa (RSS) y latencia p50/p99 de cada consulta con el índice y
+con LIKE (limitado a 20 filas, como el autocompletado).
+
+Uso:
+    python -m benchmarks.bench_busqueda [--clientes 1000000] [--repeticiones 20]
+"""
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from app.services.busqueda_service import IndiceBusqueda
+
+NOMBRES = ["José", "María", "Ana", "Juan", "Andrés", "Lucía", "Sofía", "Martín", "Inés", "Ramón",
+           "Camila", "Nicolás", "Valentina", "Sebastián", "Mónica", "Óscar", "Raúl", "Julián"]
+APELLIDOS = ["Muñoz", "Pérez", "Gómez", "Rodríguez", "Díaz", "Hernández", "Núñez", "Ibáñez",
+             "Castaño", "López", "Martínez", "Sánchez", "Ramírez", "Peña", "Ospina", "Zuluaga"]
+CONSULTAS = ["j", "mu", "muñ", "munoz", "perez gomez", "sofia", "valentina ospina",
+             "cliente12345", "3104567", "zuluaga castaño", "xyz"]
+
+
+def clientes_sinteticos(cantidad: int):
+    azar = random.Random(42)
+    for i in range(1, cantidad + 1):
+        nombre = f"{azar.choice(NOMBRES)} {azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}"
+        yield i, nombre, f"cliente{i}@correo.com", f"3{azar.randrange(10**9):09d}"
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _latencias(funcion, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return statistics.median(tiempos) * 1000, tiempos[int(len(tiempos) * 0.99) - 1] * 1000
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        conexion = sqlite3.connect(os.path.join(directorio, "bench.db"))
+        conexion.execute(
+            "CREATE TABLE clientes (id_cliente INTEGER PRIMARY KEY, nombre TEXT, email TEXT, telefono TEXT)"
+        )
+        conexion.executemany("INSERT INTO clientes VALUES (?, ?, ?, ?)", clientes_sinteticos(args.clientes))
+        conexion.commit()
+
+        rss_antes = _rss_mb()
+        inicio = time.perf_counter()
+        indice = IndiceBusqueda(["nombre", "email", "telefono"])
+        for fila in conexion.execute("SELECT id_cliente, nombre, email, telefono FROM clientes"):
+            indice.agregar(fila[0], fila[1:])
+        construccion = time.perf_counter() - inicio
+        print(f"{args.clientes} clientes: índice en {construccion:.1f} s, "
+              f"~{_rss_mb() - rss_antes:.0f} MB de RSS adicional")
+
+        like = (
+            "SELECT id_cliente FROM clientes WHERE nombre LIKE ? OR email LIKE ? OR telefono LIKE ? LIMIT 20"
+        )
+        print(f"{'consulta':>18} {'índice p50':>11} {'p99':>8} {'LIKE p50':>9} {'p99':>8} {'filas':>6}")
+        for consulta in CONSULTAS:
+            patron = f"%{consulta}%"
+            i50, i99 = _latencias(lambda: indice.buscar(consulta, 20), args.repeticiones)
+            l50, l99 = _latencias(
+                lambda: conexion.execute(like, (patron, patron, patron)).fetchall(), args.repeticiones
+            )
+            filas = len(indice.buscar(consulta, 20))
+            print(f"{consulta:>18} {i50:>9.2f}ms {i99:>6.2f}ms {l50:>7.2f}ms {l99:>6.2f}ms {filas:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_metricas.py
+"""
+Mide el costo por petición del middleware de métricas (Server-Timing y /metrics)
+
+Levanta la app dos veces en procesos aparte, con METRICAS=0 y METRICAS=1,
+sobre el mismo SQLite temporal sembrado, y compara la latencia p50 y p99 de
+un endpoint liviano (una sentencia) y de uno pesado (listado de ventas).
+
+Uso:
+    python -m benchmarks.bench_metricas [--peticiones 3000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ENDPOINTS = {
+    "cliente por id": "/api/clientes/1",
+    "ventas (100)": "/api/ventas/?limit=100",
+}
+
+
+def _medir_proceso(peticiones: int) -> None:
+    # Proceso hijo: la configuración ya viene en el entorno
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    resultados = {}
+    with TestClient(app) as cliente:
+        for nombre, url in ENDPOINTS.items():
+            for _ in range(peticiones // 10):
+                cliente.get(url)
+            tiempos = []
+            for _ in range(peticiones):
+                inicio = time.perf_counter()
+                cliente.get(url)
+                tiempos.append(time.perf_counter() - inicio)
+            tiempos.sort()
+            resultados[nombre] = {
+                "p50": statistics.median(tiempos) * 1000,
+                "p99": tiempos[int(len(tiempos) * 0.99)] * 1000,
+            }
+    print(json.dumps(resultados))
+
+
+def _sembrar(url: str) -> None:
+    os.environ["SQLALCHEMY_DATABASE_URI"] = url
+    from app.db.base import Base
+    from app.db.session import engine
+    from benchmarks.verificar_planes import sembrar
+
+    Base.metadata.create_all(bind=engine)
+    sembrar(engine, 2_000, random.Random(3))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=3_000)
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        _medir_proceso(args.peticiones)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = f"sqlite:///{os.path.join(directorio, 'metricas.db')}"
+        _sembrar(url)
+        entorno = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URI=url,
+            CONSULTAS_CONTAR="0",
+            # Las tablas las crea _sembrar: la base no tiene revisión de Alembic
+            DB_ESQUEMA="nada",
+            # Sin trabajo de fondo al arrancar: sólo se miden las peticiones
+            ANALITICA="0",
+            BUSQUEDA_INDICE="0",
+            ANALITICA_DIR=os.path.join(directorio, "analitica"),
+        )
+        medidas = {}
+        for metricas in ("0", "1"):
+            salida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_metricas", "--hijo", "--peticiones", str(args.peticiones)],
+                env={**entorno, "METRICAS": metricas},
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            medidas[metricas] = json.loads(salida.strip().splitlines()[-1])
+
+    print(f"{'endpoint':>15} {'sin p50':>9} {'con p50':>9} {'sin p99':>9} {'con p99':>9} {'costo p50':>10}")
+    for nombre in ENDPOINTS:
+        sin, con = medidas["0"][nombre], medidas["1"][nombre]
+        print(
+            f"{nombre:>15} {sin['p50']:>7.2f}ms {con['p50']:>7.2f}ms {sin['p99']:>7.2f}ms {con['p99']:>7.2f}ms "
+            f"{(con['p50'] - sin['p50']) * 1000:>8.0f}µs"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
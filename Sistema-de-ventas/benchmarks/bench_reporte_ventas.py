@@ -0,0 +1,82 @@
+# benchmarks/bench_reporte_ventas.py
+"""
+Mide tiempo y memoria pico del PDF de ventas en streaming
+
+Las filas se generan sin base de datos, con la misma forma que devuelve el
+cursor del servidor, para aislar el costo de maquetación. Cada tamaño corre
+en un proceso nuevo para que la memoria pico (RSS) no arrastre la corrida
+anterior.
+
+Uso:
+    python -m benchmarks.bench_reporte_ventas [--filas 10000 100000 1000000]
+"""
+import argparse
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from tempfile import TemporaryFile
+
+from app.models.venta import EstadoVenta, TipoVenta
+from app.services.reporte_pdf import generar_pdf_ventas
+
+
+def filas_sinteticas(cantidad: int):
+    inicio = datetime(2024, 1, 1)
+    for i in range(1, cantidad + 1):
+        yield (
+            i,
+            inicio + timedelta(minutes=i),
+            f"Cliente {i % 5000}",
+            TipoVenta.contado if i % 3 else TipoVenta.credito,
+            EstadoVenta.pagada if i % 4 else EstadoVenta.pendiente,
+            float(i % 997) + 0.5,
+        )
+
+
+def medir(cantidad: int) -> dict:
+    resumen = {
+        "cantidad": cantidad,
+        "total_ventas": 0.0,
+        "total_contado": 0.0,
+        "total_credito": 0.0,
+    }
+    inicio = time.perf_counter()
+    with TemporaryFile() as destino:
+        generar_pdf_ventas(
+            filas_sinteticas(cantidad),
+            resumen,
+            date(2024, 1, 1),
+            date(2024, 12, 31),
+            destino=destino,
+        )
+        tamano = destino.tell()
+    segundos = time.perf_counter() - inicio
+    # ru_maxrss está en KB en Linux
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        "filas": cantidad,
+        "segundos": segundos,
+        "us_por_fila": segundos / cantidad * 1e6,
+        "pico_mb": pico / 2**20,
+        "pdf_mb": tamano / 2**20,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'filas':>10} {'segundos':>10} {'us/fila':>9} {'pico MB':>9} {'PDF MB':>8}")
+    for cantidad in args.filas:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            r = executor.submit(medir, cantidad).result()
+        print(
+            f"{r['filas']:>10} {r['segundos']:>10.2f} {r['us_por_fila']:>9.1f} "
+            f"{r['pico_mb']:>9.1f} {r['pdf_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/bench_serializacion.py
+"""
+Costo de CPU por fila de los listados: ORM + response_model contra proyección plana
+
+Para GET /api/ventas, GET /api/pagos y GET /api/ventas/con-saldo compara el
+camino anterior (objetos ORM con carga_venta/carga_pago, validados con
+from_attributes y serializados como lo hace FastAPI) con la proyección plana
+del crud serializada con json_rapido. Mide tiempo de CPU (process_time) por
+fila, separando consulta y serialización, y verifica que ambos caminos
+produzcan el mismo JSON.
+
+Uso:
+    python -m benchmarks.bench_serializacion [--ventas 20000] [--filas 100 1000] [--repeticiones 7]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, List, Tuple
+
+
+def _cpu(funcion: Callable[[], Any], repeticiones: int) -> Tuple[float, Any]:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        resultado = funcion()
+        tiempos.append(time.process_time() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def _como_fastapi(adaptador, objetos) -> bytes:
+    # serialize_response de FastAPI: validar, volcar a tipos JSON y json.dumps
+    validado = adaptador.validate_python(objetos, from_attributes=True)
+    contenido = adaptador.dump_python(validado, mode="json")
+    return json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _medir(args) -> int:
+    from pydantic import TypeAdapter
+    from sqlalchemy import func, select
+
+    from app.core.json_rapido import orjson, serializar
+    from app.crud import pago_crud, venta_crud
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.venta import Venta
+    from app.schemas.pago import Pago
+    from app.schemas.venta import Venta as VentaSchema, VentaConSaldo
+    from benchmarks.verificar_planes import sembrar
+
+    Base.metadata.create_all(bind=engine)
+    sembrar(engine, args.ventas, random.Random(19))
+    with SessionLocal() as db:
+        cliente = db.scalar(
+            select(Venta.id_cliente).group_by(Venta.id_cliente).order_by(func.count().desc()).limit(1)
+        )
+    print(f"json_rapido con {'orjson' if orjson else 'json (sin orjson)'}")
+
+    adaptadores = {
+        "ventas": TypeAdapter(List[VentaSchema]),
+        "pagos": TypeAdapter(List[Pago]),
+        "con-saldo": TypeAdapter(List[VentaConSaldo]),
+    }
+    casos = []
+    for filas in args.filas:
+        casos.append((f"ventas ({filas})", "ventas",
+                      lambda db, n=filas: venta_crud.get_ventas(db, limit=n),
+                      lambda db, n=filas: venta_crud.get_ventas_planas(db, limit=n)))
+        casos.append((f"pagos ({filas})", "pagos",
+                      lambda db, n=filas: pago_crud.get_pagos(db, limit=n),
+                      lambda db, n=filas: pago_crud.get_pagos_planos(db, limit=n)))
+    casos.append((f"con-saldo (cliente {cliente})", "con-saldo",
+                  lambda db: venta_crud.get_ventas_con_saldo(db, cliente),
+                  lambda db: venta_crud.get_ventas_con_saldo_planas(db, cliente)))
+
+    distintos = 0
+    print(f"{'listado':>24} {'filas':>6} {'ORM consulta':>13} {'ORM serial.':>12} "
+          f"{'plano consulta':>15} {'plano serial.':>14} {'total µs/fila':>18}")
+    for nombre, clave, orm, plano in casos:
+        with SessionLocal() as db:
+            # Sesión nueva en cada repetición: sin objetos ya cargados en el identity map
+            def consultar_orm():
+                db.expunge_all()
+                return orm(db)
+
+            c_orm, objetos = _cpu(consultar_orm, args.repeticiones)
+            s_orm, json_orm = _cpu(lambda: _como_fastapi(adaptadores[clave], objetos), args.repeticiones)
+            c_plano, dicts = _cpu(lambda: plano(db), args.repeticiones)
+            s_plano, json_plano = _cpu(lambda: serializar(dicts), args.repeticiones)
+
+        filas = max(len(dicts), 1)
+        antes = (c_orm + s_orm) / filas * 1e6
+        despues = (c_plano + s_plano) / filas * 1e6
+        igual = json.loads(json_orm) == json.loads(json_plano)
+        distintos += not igual
+        print(
+            f"{nombre:>24} {len(dicts):>6} {c_orm * 1000:>11.1f}ms {s_orm * 1000:>10.1f}ms "
+            f"{c_plano * 1000:>13.1f}ms {s_plano * 1000:>12.1f}ms "
+            f"{antes:>7.1f} -> {despues:>6.1f}" + ("" if igual else "  JSON DISTINTO")
+        )
+
+    if distintos:
+        print(f"{distintos} listados con JSON distinto entre ambos caminos")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ventas", type=int, default=20_000)
+    parser.add_argument("--filas", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeticiones", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La configuración se lee al importar app.core.config, antes de cargar la app
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(directorio, 'serializacion.db')}"
+        return _medir(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/bench_ventas_bulk.py
+"""
+Compara POST /api/ventas/ (una venta por petición) con POST /api/ventas/bulk
+
+Usa un archivo SQLite temporal salvo que se indique --url. Las peticiones se
+hacen en proceso con TestClient, así que la diferencia medida es la del
+camino de escritura (flush/refresh por venta contra INSERTs de varias filas).
+
+Uso:
+    python -m benchmarks.bench_ventas_bulk [--url mysql://...] [--ventas 2000] [--detalles 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def _payload(cantidad: int, detalles: int, clientes: int, productos: int) -> list:
+    return [
+        {
+            "id_cliente": i % clientes + 1,
+            "tipo_venta": "credito" if i % 2 else "contado",
+            "total": 10.0 * detalles,
+            "detalles": [
+                {
+                    "id_producto": (i + j) % productos + 1,
+                    "cantidad": 1,
+                    "precio_unitario": 10.0,
+                    "subtotal": 10.0,
+                    "fecha_entrega": "2024-01-01",
+                }
+                for j in range(detalles)
+            ],
+        }
+        for i in range(cantidad)
+    ]
+
+
+def _medir(args) -> None:
+    from fastapi.testclient import TestClient
+    from app.db.session import engine
+    from app.main import app
+    from app.models.cliente import Cliente
+    from app.models.producto import Producto
+
+    with TestClient(app) as cliente:
+        with engine.begin() as conn:
+            conn.execute(Cliente.__table__.insert(), [{"nombre": f"Cliente {i}"} for i in range(100)])
+            conn.execute(Producto.__table__.insert(), [
+                {"nombre": f"Producto {i}", "precio_unitario": 10.0, "activo": True} for i in range(50)
+            ])
+        ventas = _payload(args.ventas, args.detalles, 100, 50)
+
+        inicio = time.perf_counter()
+        for venta in ventas:
+            cliente.post("/api/ventas/", json=venta).raise_for_status()
+        individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        respuesta = cliente.post("/api/ventas/bulk", json=ventas, params={"lote": args.lote})
+        respuesta.raise_for_status()
+        masivo = time.perf_counter() - inicio
+        assert respuesta.json()["creadas"] == args.ventas, respuesta.json()["errores"][:5]
+
+    print(f"{'camino':>10} {'segundos':>9} {'ventas/s':>9}")
+    print(f"{'individual':>10} {individual:>9.2f} {args.ventas / individual:>9.0f}")
+    print(f"{'bulk':>10} {masivo:>9.2f} {args.ventas / masivo:>9.0f}")
+    print(f"aceleración: {individual / masivo:.1f}x")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL síncrona de la base (por defecto SQLite temporal)")
+    parser.add_argument("--ventas", type=int, default=2000)
+    parser.add_argument("--detalles", type=int, default=3)
+    parser.add_argument("--lote", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La URL se lee al importar app.core.config, antes de cargar la app
+        os.environ["SQLALCHEMY_DATABASE_URI"] = args.url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+        # Las tablas las crea el arranque de la app (create_all), sin migraciones
+        os.environ["DB_ESQUEMA"] = "crear"
+        _medir(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+# benchmarks/suite.py
+"""
+Suite de rendimiento: latencia y throughput de cada ruta de app/api
+
+Sobre una base generada con benchmarks.generador (se genera si está vacía)
+levanta la app en proceso y dispara cada escenario con httpx + ASGITransport,
+con la concurrencia indicada. Mide p50, p95, p99 y peticiones por segundo,
+escribe el resultado en JSON y, con --base, lo compara con una corrida
+anterior: termina con código 1 si algún escenario empeora más que la
+tolerancia (y más que --minimo-ms, para no fallar por ruido en rutas de
+microsegundos) o si alguna petición falla.
+
+La caché de reportes se desactiva para medir la generación. Los escenarios
+de escritura van al final y modifican la base: para comparar corridas,
+generar la base de nuevo o usar una copia.
+
+Uso:
+    python -m benchmarks.suite [--url mysql://...] [--ventas 200000] [--salida resultado.json]
+    python -m benchmarks.suite --base base.json [--tolerancia 0.2] [--filtro reportes] [--async]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+VERSION_FORMATO = 1
+
+
+class Escenario(NamedTuple):
+    nombre: str
+    # (cliente httpx, muestra, número de petición) -> respuesta
+    pedir: Callable[[Any, Dict[str, Any], int], Awaitable[Any]]
+    # Tope de peticiones para los escenarios costosos (reportes, cargas masivas)
+    maximo: Optional[int] = None
+
+
+def _venta(m: Dict[str, Any], i: int, detalles: int = 3) -> Dict[str, Any]:
+    return {
+        "id_cliente": m["clientes"][i % len(m["clientes"])],
+        "tipo_venta": "credito",
+        "total": 10.0 * detalles,
+        "detalles": [
+            {
+                "id_producto": m["productos"][(i + j) % len(m["productos"])], "cantidad": 1,
+                "precio_unitario": 10.0, "subtotal": 10.0, "fecha_entrega": m["hasta"],
+            }
+            for j in range(detalles)
+        ],
+    }
+
+
+def _pagos(m: Dict[str, Any], i: int, cantidad: int) -> List[Dict[str, Any]]:
+    return [
+        {"id_venta": m["pendientes"][(i * cantidad + j) % len(m["pendientes"])], "monto": 0.01, "metodo_pago": "efectivo"}
+        for j in range(cantidad)
+    ]
+
+
+def _csv_pagos(m: Dict[str, Any], i: int, cantidad: int) -> bytes:
+    filas = ["id_venta,monto,metodo_pago"] + [f"{p['id_venta']},0.01,transferencia" for p in _pagos(m, i, cantidad)]
+    return "\n".join(filas).encode()
+
+
+async def _ciclo_trabajo(c, m: Dict[str, Any], i: int):
+    # Encolar, esperar a que termine, descargar y descartar: el recorrido que ve el usuario
+    respuesta = await c.post("/api/reportes/jobs", json={
+        "tipo": "ventas", "formato": "csv", "fecha_inicio": m["desde"], "fecha_fin": m["hasta"],
+    })
+    respuesta.raise_for_status()
+    trabajo = respuesta.json()["id"]
+    while True:
+        estado = (await c.get(f"/api/reportes/jobs/{trabajo}")).json()["estado"]
+        if estado not in ("pendiente", "en_proceso"):
+            break
+        await asyncio.sleep(0.01)
+    respuesta = await c.get(f"/api/reportes/jobs/{trabajo}/descarga")
+    await c.delete(f"/api/reportes/jobs/{trabajo}")
+    return respuesta
+
+
+def escenarios() -> List[Escenario]:
+    """
+    Un escenario (o más) por ruta de app/api; los de escritura al final
+    """
+    def uno(lista: str):
+        # Recorre los ids de la muestra para no medir siempre la misma fila
+        return lambda m, i: m[lista][i % len(m[lista])]
+
+    cliente, venta, pago, producto = uno("clientes"), uno("ventas"), uno("pagos"), uno("productos")
+    rango = lambda m: {"fecha_inicio": m["desde"], "fecha_fin": m["hasta"]}  # noqa: E731
+
+    return [
+        Escenario("GET /", lambda c, m, i: c.get("/")),
+        # Clientes
+        Escenario("GET /clientes/", lambda c, m, i: c.get("/api/clientes/", params={"limit": 100})),
+        Escenario("GET /clientes/?nombre", lambda c, m, i: c.get("/api/clientes/", params={"nombre": "Cliente 1", "limit": 20})),
+        Escenario("GET /clientes/buscar", lambda c, m, i: c.get("/api/clientes/buscar", params={"q": f"cliente {i % 90 + 10}"})),
+        Escenario("GET /clientes/{id}", lambda c, m, i: c.get(f"/api/clientes/{cliente(m, i)}")),
+        Escenario("GET /clientes/{id}/resumen", lambda c, m, i: c.get(f"/api/clientes/{cliente(m, i)}/resumen")),
+        # Productos
+        Escenario("GET /productos/", lambda c, m, i: c.get("/api/productos/", params={"limit": 100})),
+        Escenario("GET /productos/ (304)", lambda c, m, i: c.get(
+            "/api/productos/", params={"limit": 100}, headers={"If-None-Match": m["etag_productos"]})),
+        Escenario("GET /productos/buscar", lambda c, m, i: c.get("/api/productos/buscar", params={"q": f"producto {i % 90 + 10}"})),
+        Escenario("GET /productos/{id}", lambda c, m, i: c.get(f"/api/productos/{producto(m, i)}")),
+        # Ventas
+        Escenario("GET /ventas/", lambda c, m, i: c.get("/api/ventas/", params={"limit": 100})),
+        Escenario("GET /ventas/?cliente_id", lambda c, m, i: c.get(
+            "/api/ventas/", params={"cliente_id": cliente(m, i), "limit": 100})),
+        Escenario("GET /ventas/?incluir_total", lambda c, m, i: c.get(
+            "/api/ventas/", params={"limit": 20, "incluir_total": True})),
+        Escenario("GET /ventas/{id}", lambda c, m, i: c.get(f"/api/ventas/{venta(m, i)}")),
+        Escenario("GET /ventas/{id}/saldo", lambda c, m, i: c.get(f"/api/ventas/{venta(m, i)}/saldo")),
+        Escenario("GET /ventas/{id}/resumen", lambda c, m, i: c.get(f"/api/ventas/{venta(m, i)}/resumen")),
+        Escenario("GET /ventas/con-saldo/", lambda c, m, i: c.get(
+            "/api/ventas/con-saldo/", params={"cliente_id": cliente(m, i)})),
+        # Pagos
+        Escenario("GET /pagos/", lambda c, m, i: c.get("/api/pagos/", params={"limit": 100})),
+        Escenario("GET /pagos/?venta_id", lambda c, m, i: c.get("/api/pagos/", params={"venta_id": venta(m, i)})),
+        Escenario("GET /pagos/?fecha_inicio&fecha_fin", lambda c, m, i: c.get(
+            "/api/pagos/", params={**rango(m), "limit": 100, "descendente": True})),
+        Escenario("GET /pagos/totales", lambda c, m, i: c.get("/api/pagos/totales", params=rango(m))),
+        Escenario("GET /pagos/{id}", lambda c, m, i: c.get(f"/api/pagos/{pago(m, i)}")),
+        # Reportes
+        Escenario("GET /reportes/cliente/{id} pdf", lambda c, m, i: c.get(
+            f"/api/reportes/cliente/{m['cliente_muchas']}", params={"formato": "pdf"}), maximo=20),
+        Escenario("GET /reportes/cliente/{id} csv", lambda c, m, i: c.get(
+            f"/api/reportes/cliente/{m['cliente_muchas']}", params={"formato": "csv"}), maximo=50),
+        Escenario("GET /reportes/ventas csv", lambda c, m, i: c.get(
+            "/api/reportes/ventas", params={**rango(m), "formato": "csv"}), maximo=20),
+        Escenario("GET /reportes/ventas pdf", lambda c, m, i: c.get(
+            "/api/reportes/ventas", params={**rango(m), "formato": "pdf"}), maximo=5),
+        Escenario("GET /reportes/resumen-diario", lambda c, m, i: c.get(
+            "/api/reportes/resumen-diario", params={"fecha_inicio": m["inicio_historial"], "fecha_fin": m["hasta"]})),
+        Escenario("GET /reportes/saldos", lambda c, m, i: c.get(
+            "/api/reportes/saldos", params={"estado_pago": "Pendiente", "orden": "saldo_pendiente", "descendente": True})),
+        Escenario("GET /reportes/saldos?cliente_id", lambda c, m, i: c.get(
+            "/api/reportes/saldos", params={"cliente_id": m["cliente_muchas"]})),
+        Escenario("GET /reportes/antiguedad", lambda c, m, i: c.get(
+            "/api/reportes/antiguedad", params={"corte": m["hasta"]})),
+        Escenario("GET /reportes/antiguedad csv", lambda c, m, i: c.get(
+            "/api/reportes/antiguedad", params={"corte": m["hasta"], "formato": "csv"}), maximo=20),
+        Escenario("GET /reportes/jobs", lambda c, m, i: c.get("/api/reportes/jobs")),
+        Escenario("GET /reportes/jobs/{id}", lambda c, m, i: c.get(f"/api/reportes/jobs/{m['trabajo']}")),
+        Escenario("GET /reportes/jobs/{id}/descarga", lambda c, m, i: c.get(
+            f"/api/reportes/jobs/{m['trabajo']}/descarga"), maximo=50),
+        Escenario("trabajo de reporte (ciclo)", _ciclo_trabajo, maximo=10),
+        # Analítica (instantánea columnar)
+        Escenario("GET /analytics/ventas-por-producto", lambda c, m, i: c.get(
+            "/api/analytics/ventas-por-producto", params={"limit": 20})),
+        Escenario("GET /analytics/ventas-por-cliente", lambda c, m, i: c.get(
+            "/api/analytics/ventas-por-cliente", params={"limit": 20})),
+        Escenario("GET /analytics/ventas-por-periodo", lambda c, m, i: c.get(
+            "/api/analytics/ventas-por-periodo", params={"periodo": "semana"})),
+        Escenario("GET /analytics/pagos-por-metodo", lambda c, m, i: c.get("/api/analytics/pagos-por-metodo")),
+        Escenario("GET /analytics/estado", lambda c, m, i: c.get("/api/analytics/estado")),
+        Escenario("POST /analytics/refrescar", lambda c, m, i: c.post("/api/analytics/refrescar"), maximo=10),
+        # Internas
+        Escenario("GET /_internal/pool", lambda c, m, i: c.get("/api/_internal/pool")),
+        Escenario("GET /_internal/cache-reportes", lambda c, m, i: c.get("/api/_internal/cache-reportes")),
+        Escenario("GET /metrics", lambda c, m, i: c.get("/metrics")),
+        # Escritura
+        Escenario("POST /clientes/", lambda c, m, i: c.post(
+            "/api/clientes/", json={"nombre": f"Bench {m['corrida']} {i}", "email": f"bench{m['corrida']}.{i}@ejemplo.com"})),
+        Escenario("PUT /clientes/{id}", lambda c, m, i: c.put(
+            f"/api/clientes/{cliente(m, i)}", json={"nombre": f"Cliente {cliente(m, i)}", "telefono": f"300{i:07d}"})),
+        Escenario("POST /productos/", lambda c, m, i: c.post(
+            "/api/productos/", json={"nombre": f"Bench {i}", "precio_unitario": 10.0})),
+        Escenario("PUT /productos/{id}", lambda c, m, i: c.put(
+            f"/api/productos/{producto(m, i)}",
+            json={"nombre": f"Producto {producto(m, i)}", "precio_unitario": 10.0, "descripcion": f"Revisión {i}"})),
+        Escenario("POST /ventas/", lambda c, m, i: c.post("/api/ventas/", json=_venta(m, i))),
+        Escenario("POST /ventas/bulk (200)", lambda c, m, i: c.post(
+            "/api/ventas/bulk", json=[_venta(m, i * 200 + j) for j in range(200)]), maximo=10),
+        Escenario("PUT /ventas/{id}", lambda c, m, i: c.put(
+            f"/api/ventas/{m['pendientes'][i % len(m['pendientes'])]}", json={"estado": "pendiente"})),
+        Escenario("POST /pagos/", lambda c, m, i: c.post("/api/pagos/", json=_pagos(m, i, 1)[0])),
+        Escenario("POST /pagos/bulk (500)", lambda c, m, i: c.post("/api/pagos/bulk", json=_pagos(m, i, 500)), maximo=10),
+        Escenario("POST /pagos/bulk/csv (500)", lambda c, m, i: c.post(
+            "/api/pagos/bulk/csv", files={"archivo": ("pagos.csv", _csv_pagos(m, i, 500), "text/csv")}), maximo=10),
+        Escenario("PUT /pagos/{id}", lambda c, m, i: c.put(
+            f"/api/pagos/{m['borrables']['pagos'][i]}", json={"observaciones": "conciliado"})),
+        Escenario("DELETE /pagos/{id}", lambda c, m, i: c.delete(f"/api/pagos/{m['borrables']['pagos'][i]}")),
+        Escenario("DELETE /ventas/{id}", lambda c, m, i: c.delete(f"/api/ventas/{m['borrables']['ventas'][i]}")),
+        Escenario("DELETE /productos/{id}", lambda c, m, i: c.delete(f"/api/productos/{m['borrables']['productos'][i]}")),
+        Escenario("DELETE /clientes/{id}", lambda c, m, i: c.delete(f"/api/clientes/{m['borrables']['clientes'][i]}")),
+    ]
+
+
+def _muestra(engine, borrables: int) -> Dict[str, Any]:
+    """
+    Ids con los que piden los escenarios, más filas propias para los DELETE
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.models.cliente import Cliente
+    from app.models.pago import Pago
+    from app.models.producto import Producto
+    from app.models.venta import Venta
+
+    corrida = datetime.now().strftime("%Y%m%d%H%M%S")
+    with engine.begin() as conn:
+        por_cliente = select(Venta.id_cliente).group_by(Venta.id_cliente)
+        hasta = conn.scalar(select(func.max(Venta.fecha_venta)))
+        inicio = conn.scalar(select(func.min(Venta.fecha_venta)))
+        muestra = {
+            "corrida": corrida,
+            "clientes": conn.scalars(por_cliente.order_by(func.count().desc()).limit(200)).all(),
+            "cliente_muchas": conn.scalar(por_cliente.order_by(func.count().desc()).limit(1)),
+            "ventas": conn.scalars(select(Venta.id_venta).order_by(Venta.id_venta.desc()).limit(200)).all(),
+            "pendientes": conn.scalars(
+                select(Venta.id_venta).where(Venta.saldo_pendiente > 100).order_by(Venta.id_venta).limit(5000)
+            ).all(),
+            "pagos": conn.scalars(select(Pago.id_pago).order_by(Pago.id_pago.desc()).limit(200)).all(),
+            "productos": conn.scalars(
+                select(Producto.id_producto).where(Producto.activo.is_(True)).order_by(Producto.id_producto).limit(200)
+            ).all(),
+            "inicio_historial": inicio.date().isoformat(),
+            "desde": (hasta.date() - timedelta(days=29)).isoformat(),
+            "hasta": hasta.date().isoformat(),
+        }
+
+        # Filas sin dependencias, para que cada DELETE borre una distinta
+        nuevos = {}
+        for modelo, clave, filas in (
+            (Cliente, Cliente.id_cliente, [{"nombre": f"Borrable {corrida} {i}"} for i in range(borrables)]),
+            (Producto, Producto.id_producto, [
+                {"nombre": f"Borrable {i}", "precio_unitario": 1.0, "activo": True} for i in range(borrables)
+            ]),
+            (Venta, Venta.id_venta, [
+                {"id_cliente": muestra["cliente_muchas"], "tipo_venta": "credito", "total": 1.0,
+                 "total_pagado": 0.0, "saldo_pendiente": 1.0}
+                for _ in range(borrables)
+            ]),
+        ):
+            desde = conn.scalar(select(func.coalesce(func.max(clave), 0)))
+            conn.execute(insert(modelo), filas)
+            nuevos[modelo.__tablename__] = conn.scalars(select(clave).where(clave > desde).order_by(clave)).all()
+        desde = conn.scalar(select(func.coalesce(func.max(Pago.id_pago), 0)))
+        conn.execute(insert(Pago), [
+            {"id_venta": muestra["pendientes"][i % len(muestra["pendientes"])], "monto": 0.0} for i in range(borrables)
+        ])
+        nuevos["pagos"] = conn.scalars(select(Pago.id_pago).where(Pago.id_pago > desde).order_by(Pago.id_pago)).all()
+    muestra["borrables"] = nuevos
+    return muestra
+
+
+async def _preparar_http(c, muestra: Dict[str, Any]) -> None:
+    # Lo que sólo se obtiene por HTTP: ETag del catálogo y un trabajo terminado
+    muestra["etag_productos"] = (await c.get("/api/productos/", params={"limit": 100})).headers.get("ETag", "")
+    respuesta = await c.post("/api/reportes/jobs", json={
+        "tipo": "cliente", "formato": "csv", "cliente_id": muestra["cliente_muchas"],
+    })
+    muestra["trabajo"] = respuesta.json()["id"]
+    while (await c.get(f"/api/reportes/jobs/{muestra['trabajo']}")).json()["estado"] in ("pendiente", "en_proceso"):
+        await asyncio.sleep(0.05)
+
+
+async def _correr(escenario: Escenario, c, muestra: Dict[str, Any], args) -> Dict[str, Any]:
+    iteraciones = min(args.iteraciones, escenario.maximo or args.iteraciones)
+    calentamiento = min(args.calentamiento, iteraciones)
+    semaforo = asyncio.Semaphore(args.concurrencia)
+    latencias: List[float] = []
+    errores: List[str] = []
+
+    async def una(i: int, medir: bool) -> None:
+        async with semaforo:
+            inicio = time.perf_counter()
+            respuesta = await escenario.pedir(c, muestra, i)
+            if medir:
+                latencias.append(time.perf_counter() - inicio)
+            if respuesta.status_code >= 400:
+                errores.append(f"{respuesta.status_code} {respuesta.text[:200]}")
+
+    # Calentamiento (índices de búsqueda, cachés, pool) con números propios:
+    # los escenarios que borran no repiten filas
+    await asyncio.gather(*(una(iteraciones + i, False) for i in range(calentamiento)))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una(i, True) for i in range(iteraciones)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    cuantiles = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) > 1 else latencias * 99
+    return {
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "primer_error": errores[0] if errores else None,
+        "p50_ms": round(cuantiles[49] * 1000, 3),
+        "p95_ms": round(cuantiles[94] * 1000, 3),
+        "p99_ms": round(cuantiles[98] * 1000, 3),
+        "media_ms": round(statistics.fmean(latencias) * 1000, 3),
+        "rps": round(len(latencias) / duracion, 1),
+    }
+
+
+async def _disparar(seleccion: List[Escenario], muestra: Dict[str, Any], args) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    from app.main import app
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=600) as c:
+        await _preparar_http(c, muestra)
+        for escenario in seleccion:
+            resultado = await _correr(escenario, c, muestra, args)
+            resultados[escenario.nombre] = resultado
+            estado = f"  {resultado['errores']} errores" if resultado["errores"] else ""
+            print(
+                f"{escenario.nombre:>38} {resultado['p50_ms']:>9.2f} {resultado['p95_ms']:>9.2f} "
+                f"{resultado['p99_ms']:>9.2f} {resultado['rps']:>8.1f}{estado}",
+                flush=True,
+            )
+    return resultados
+
+
+def comparar(
+    actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float, minimo_ms: float
+) -> List[str]:
+    """
+    Escenarios cuyo p50 o p95 empeoró respecto de la base
+
+    Un escenario regresa si la latencia crece más que la tolerancia relativa
+    y además más que minimo_ms en valor absoluto.
+
+    Returns:
+        Descripción de cada regresión (vacía si no hay)
+    """
+    regresiones = []
+    print(f"\n{'escenario':>38} {'p50 base':>9} {'p50':>9} {'Δ%':>7} {'p95 base':>9} {'p95':>9} {'Δ%':>7}")
+    for nombre, medido in actual["escenarios"].items():
+        anterior = base.get("escenarios", {}).get(nombre)
+        if anterior is None:
+            print(f"{nombre:>38} {'(nuevo)':>9}")
+            continue
+        columnas = []
+        for metrica in ("p50_ms", "p95_ms"):
+            antes, ahora = anterior[metrica], medido[metrica]
+            cambio = (ahora - antes) / antes if antes else 0.0
+            columnas.append(f"{antes:>9.2f} {ahora:>9.2f} {cambio * 100:>+6.0f}%")
+            if cambio > tolerancia and ahora - antes > minimo_ms:
+                regresiones.append(f"{nombre}: {metrica} {antes:.2f} -> {ahora:.2f} ms ({cambio * 100:+.0f}%)")
+        print(f"{nombre:>38} " + " ".join(columnas))
+    return regresiones
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _medir(args, url: str) -> Dict[str, Any]:
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.services import columnar_service, trabajos_reportes_service
+    from benchmarks.generador import generar, tiene_datos
+
+    Base.metadata.create_all(bind=engine)
+    if not tiene_datos(engine):
+        inicio = time.perf_counter()
+        conteos = generar(engine, args.ventas, args.semilla)
+        print(f"{conteos['ventas']} ventas generadas en {time.perf_counter() - inicio:.1f} s")
+    with SessionLocal() as db:
+        columnar_service.refrescar(db, completo=True)
+
+    seleccion = [e for e in escenarios() if not args.filtro or args.filtro.lower() in e.nombre.lower()]
+    muestra = _muestra(engine, args.iteraciones + args.calentamiento)
+    print(f"{'escenario':>38} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    try:
+        resultados = asyncio.run(_disparar(seleccion, muestra, args))
+    finally:
+        trabajos_reportes_service.cerrar()
+
+    return {
+        "version": VERSION_FORMATO,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "base": engine.dialect.name,
+            "modo": "async" if args.asincrono else "sync",
+        },
+        "parametros": {
+            "ventas": args.ventas,
+            "semilla": args.semilla,
+            "iteraciones": args.iteraciones,
+            "concurrencia": args.concurrencia,
+        },
+        "escenarios": resultados,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL síncrona de la base (por defecto SQLite temporal)")
+    parser.add_argument("--ventas", type=int, default=200_000, help="ventas a generar si la base está vacía")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--iteraciones", type=int, default=200, help="peticiones medidas por escenario")
+    parser.add_argument("--calentamiento", type=int, default=10)
+    parser.add_argument("--concurrencia", type=int, default=1)
+    parser.add_argument("--filtro", help="sólo escenarios cuyo nombre contiene el texto")
+    parser.add_argument("--async", dest="asincrono", action="store_true", help="rutas y crud asíncronos (DB_ASYNC)")
+    parser.add_argument("--salida", default="resultado_suite.json", help="archivo JSON con el resultado")
+    parser.add_argument("--base", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="empeoramiento relativo aceptado")
+    parser.add_argument("--minimo-ms", type=float, default=1.0, help="empeoramiento absoluto ignorado")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        url = args.url or f"sqlite:///{os.path.join(directorio, 'suite.db')}"
+        # La configuración se lee al importar app.core.config, antes de cargar la app
+        os.environ.update({
+            "SQLALCHEMY_DATABASE_URI": url,
+            "DB_ASYNC": "1" if args.asincrono else "0",
+            # Las tablas las crea create_all de la suite: la base no tiene revisión de Alembic
+            "DB_ESQUEMA": "nada",
+            "REPORTES_CACHE": "0",
+            "REPORTES_JOBS_DIR": os.path.join(directorio, "trabajos"),
+            # Sin trabajo de fondo al arrancar: la instantánea se construye antes de medir
+            "ANALITICA": "0",
+            "BUSQUEDA_INDICE": "0",
+            "ANALITICA_DIR": os.path.join(directorio, "analitica"),
+        })
+        resultado = _medir(args, url)
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultado en {args.salida}")
+
+    fallidos = [nombre for nombre, r in resultado["escenarios"].items() if r["errores"]]
+    for nombre in fallidos:
+        print(f"ERROR {nombre}: {resultado['escenarios'][nombre]['primer_error']}")
+
+    regresiones: List[str] = []
+    if args.base:
+        with open(args.base, encoding="utf-8") as archivo:
+            regresiones = comparar(resultado, json.load(archivo), args.tolerancia, args.minimo_ms)
+        for regresion in regresiones:
+            print(f"REGRESIÓN {regresion}")
+        if not regresiones:
+            print(f"Sin regresiones mayores a {args.tolerancia:.0%} respecto de {args.base}")
+    return 1 if fallidos or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# benchmarks/verificar_consultas.py
+"""
+Verifica que cada endpoint ejecuta una cantidad fija de sentencias SQL (sin N+1)
+
+Levanta la app con CONSULTAS_CONTAR sobre un SQLite temporal sembrado y pide
+cada endpoint con dos tamaños (página de 5 y de 100 filas, venta con 1 y con
+20 detalles, cliente con pocas y con muchas ventas). Falla con código 1 si
+algún endpoint supera PRESUPUESTO sentencias o si la cantidad crece con el
+tamaño de la respuesta.
+
+Uso:
+    python -m benchmarks.verificar_consultas [--ventas 5000] [--async]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date
+from typing import Any, Callable, Dict, List, NamedTuple
+
+# Sentencias máximas por petición, sea cual sea el tamaño de la respuesta
+PRESUPUESTO = 8
+
+TAMANOS = (5, 100)
+
+
+class Caso(NamedTuple):
+    nombre: str
+    # (cliente de prueba, muestra, tamaño) -> respuesta
+    pedir: Callable[[Any, Dict[str, Any], int], Any]
+
+
+def _venta(m: Dict[str, Any], detalles: int) -> Dict[str, Any]:
+    return {
+        "id_cliente": m["cliente_pocas"],
+        "tipo_venta": "credito",
+        "total": 10.0 * detalles,
+        "detalles": [
+            {
+                "id_producto": i % 200 + 1, "cantidad": 1, "precio_unitario": 10.0,
+                "subtotal": 10.0, "fecha_entrega": "2024-01-01",
+            }
+            for i in range(detalles)
+        ],
+    }
+
+
+def casos() -> List[Caso]:
+    def cliente(m, tamano):
+        # Los tamaños eligen un cliente con pocas o con muchas ventas
+        return m["cliente_pocas"] if tamano == TAMANOS[0] else m["cliente_muchas"]
+
+    def venta(m, tamano):
+        return m["venta_corta"] if tamano == TAMANOS[0] else m["venta_larga"]
+
+    return [
+        Caso("GET /ventas/", lambda c, m, t: c.get("/api/ventas/", params={"limit": t})),
+        Caso("GET /ventas/?cliente_id", lambda c, m, t: c.get(
+            "/api/ventas/", params={"limit": t, "cliente_id": m["cliente_muchas"]})),
+        Caso("GET /ventas/{id}", lambda c, m, t: c.get(f"/api/ventas/{venta(m, t)}")),
+        Caso("GET /ventas/{id}/saldo", lambda c, m, t: c.get(f"/api/ventas/{venta(m, t)}/saldo")),
+        Caso("GET /ventas/{id}/resumen", lambda c, m, t: c.get(f"/api/ventas/{venta(m, t)}/resumen")),
+        Caso("GET /ventas/con-saldo/", lambda c, m, t: c.get(
+            "/api/ventas/con-saldo/", params={"cliente_id": cliente(m, t)})),
+        Caso("POST /ventas/", lambda c, m, t: c.post("/api/ventas/", json=_venta(m, 1 if t == TAMANOS[0] else 20))),
+        Caso("PUT /ventas/{id}", lambda c, m, t: c.put(f"/api/ventas/{venta(m, t)}", json={"estado": "pendiente"})),
+        Caso("GET /pagos/", lambda c, m, t: c.get("/api/pagos/", params={"limit": t})),
+        Caso("GET /pagos/?venta_id", lambda c, m, t: c.get("/api/pagos/", params={"venta_id": venta(m, t)})),
+        Caso("GET /pagos/?cliente_id", lambda c, m, t: c.get(
+            "/api/pagos/", params={"cliente_id": cliente(m, t), "limit": t, "incluir_total": True})),
+        Caso("GET /pagos/totales", lambda c, m, t: c.get(
+            "/api/pagos/totales", params={"cliente_id": cliente(m, t)})),
+        Caso("GET /pagos/{id}", lambda c, m, t: c.get(f"/api/pagos/{m['pago']}")),
+        Caso("POST /pagos/", lambda c, m, t: c.post(
+            "/api/pagos/", json={"id_venta": venta(m, t), "monto": 1.0, "metodo_pago": "efectivo"})),
+        Caso("GET /reportes/saldos", lambda c, m, t: c.get(
+            "/api/reportes/saldos", params={"limit": t, "estado_pago": "Pendiente"})),
+        Caso("GET /clientes/", lambda c, m, t: c.get("/api/clientes/", params={"limit": t})),
+        Caso("GET /clientes/{id}/resumen", lambda c, m, t: c.get(f"/api/clientes/{cliente(m, t)}/resumen")),
+        Caso("GET /productos/", lambda c, m, t: c.get("/api/productos/", params={"limit": t})),
+    ]
+
+
+def preparar(ventas: int) -> Dict[str, Any]:
+    """
+    Crea las tablas, siembra la base de la app y devuelve la muestra que
+    usan los casos: clientes con pocas y muchas ventas, ventas con 1 y 20
+    detalles y un pago
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.detalle_venta import DetalleVenta
+    from app.models.pago import Pago
+    from app.models.venta import Venta
+    from benchmarks.verificar_planes import sembrar
+
+    Base.metadata.create_all(bind=engine)
+    sembrar(engine, ventas, random.Random(5))
+    with SessionLocal() as db:
+        por_cliente = select(Venta.id_cliente).group_by(Venta.id_cliente)
+        cliente_muchas = db.scalar(por_cliente.order_by(func.count().desc()).limit(1))
+        cliente_pocas = db.scalar(por_cliente.order_by(func.count()).limit(1))
+        # Una venta con un detalle y un pago, y otra con 20 detalles y 20 pagos
+        venta_larga = db.scalar(select(Pago.id_venta).limit(1))
+        venta_corta = db.scalar(select(Venta.id_venta).where(Venta.id_venta != venta_larga).limit(1))
+        db.execute(DetalleVenta.__table__.delete().where(DetalleVenta.id_venta == venta_corta))
+        db.execute(insert(DetalleVenta), [
+            {"id_venta": venta_corta, "id_producto": 1, "cantidad": 1, "precio_unitario": 1.0,
+             "subtotal": 1.0, "fecha_entrega": date(2024, 1, 1)},
+        ] + [
+            {"id_venta": venta_larga, "id_producto": i + 1, "cantidad": 1, "precio_unitario": 1.0,
+             "subtotal": 1.0, "fecha_entrega": date(2024, 1, 1)}
+            for i in range(20)
+        ])
+        db.execute(Pago.__table__.delete().where(Pago.id_venta == venta_corta))
+        db.execute(insert(Pago), [{"id_venta": venta_corta, "monto": 0.01}] + [
+            {"id_venta": venta_larga, "monto": 0.01} for _ in range(20)
+        ])
+        pago = db.scalar(select(Pago.id_pago).limit(1))
+        db.commit()
+    return {
+        "cliente_muchas": cliente_muchas,
+        "cliente_pocas": cliente_pocas,
+        "venta_corta": venta_corta,
+        "venta_larga": venta_larga,
+        "pago": pago,
+    }
+
+
+def medir(cliente, muestra: Dict[str, Any], caso: Caso) -> List[int]:
+    """
+    Sentencias del caso con cada uno de TAMANOS
+
+    Raises:
+        RuntimeError: Si el endpoint responde con error
+    """
+    from app.core.consultas import ENCABEZADO_CONSULTAS
+
+    conteos = []
+    for tamano in TAMANOS:
+        respuesta = caso.pedir(cliente, muestra, tamano)
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f"{caso.nombre}: {respuesta.status_code} {respuesta.text}")
+        conteos.append(int(respuesta.headers[ENCABEZADO_CONSULTAS]))
+    return conteos
+
+
+def problema(conteos: List[int]) -> str:
+    # Vacío si los conteos están dentro del presupuesto y no crecen con el tamaño
+    if max(conteos) > PRESUPUESTO:
+        return f"supera el presupuesto de {PRESUPUESTO}"
+    if conteos[-1] > conteos[0]:
+        return "crece con el tamaño (N+1)"
+    return ""
+
+
+def _verificar(args) -> int:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    muestra = preparar(args.ventas)
+    fallidos = 0
+    print(f"{'endpoint':>28} " + " ".join(f"{'n=' + str(t):>7}" for t in TAMANOS))
+    with TestClient(app) as cliente:
+        for caso in casos():
+            conteos = medir(cliente, muestra, caso)
+            detalle = problema(conteos)
+            fallidos += bool(detalle)
+            print(f"{caso.nombre:>28} " + " ".join(f"{n:>7}" for n in conteos) + f"  {detalle or 'ok'}")
+
+    if fallidos:
+        print(f"{fallidos} endpoints fuera de presupuesto")
+        return 1
+    print(f"Todos los endpoints dentro de {PRESUPUESTO} sentencias")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ventas", type=int, default=5_000)
+    parser.add_argument("--async", dest="asincrono", action="store_true", help="rutas y crud asíncronos (DB_ASYNC)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La configuración se lee al importar app.core.config, antes de cargar la app
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(directorio, 'consultas.db')}"
+        os.environ["CONSULTAS_CONTAR"] = "1"
+        os.environ["DB_ASYNC"] = "1" if args.asincrono else "0"
+        # Las tablas las crea create_all del script: la base no tiene revisión de Alembic
+        os.environ["DB_ESQUEMA"] = "nada"
+        # Sin trabajo de fondo al arrancar: sólo se miden las peticiones
+        os.environ["ANALITICA"] = "0"
+        os.environ["BUSQUEDA_INDICE"] = "0"
+        os.environ["ANALITICA_DIR"] = os.path.join(directorio, "analitica")
+        return _verificar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# benchmarks/verificar_planes.py
+"""
+Verifica con EXPLAIN que las consultas calientes del crud usan índices
+
+Siembra clientes, productos, ventas, detalles y pagos en un SQLite temporal
+(o en --url), actualiza las estadísticas del planificador y ejecuta cada
+consulta del catálogo capturando las sentencias que emite. Cada sentencia se
+vuelve a pedir con EXPLAIN y se marcan las tablas que el plan recorre
+completas. Termina con código 1 si alguna consulta hace un escaneo completo
+que no está permitido en el catálogo, para usarlo como control en CI.
+
+Uso:
+    python -m benchmarks.verificar_planes [--url mysql://...] [--ventas 20000] [-v]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Set, Tuple
+
+
+class Consulta(NamedTuple):
+    nombre: str
+    ejecutar: Callable[[Any, Dict[str, Any]], Any]
+    # Tablas que la consulta puede recorrer completas a propósito
+    permitidos: FrozenSet[str] = frozenset()
+
+
+def consultas() -> List[Consulta]:
+    from app.crud import antiguedad_crud, pago_crud, resumen_diario_crud, saldo_crud, venta_crud
+    from app.services import reporte_service
+
+    def consumir(reporte):
+        contenido, _ = reporte
+        for _ in contenido:
+            pass
+
+    return [
+        Consulta("venta por id", lambda db, m: venta_crud.get_venta(db, m["venta"])),
+        # Primera página: recorre ventas en orden de clave primaria y corta en LIMIT
+        Consulta("ventas (1ra página)", lambda db, m: venta_crud.get_ventas(db, limit=100), frozenset({"ventas"})),
+        Consulta("ventas de cliente", lambda db, m: venta_crud.get_ventas_cliente(db, m["cliente"], limit=100)),
+        Consulta("conteo ventas de cliente", lambda db, m: venta_crud.count_ventas(db, m["cliente"])),
+        Consulta("ventas con saldo de cliente", lambda db, m: venta_crud.get_ventas_con_saldo(db, m["cliente"])),
+        Consulta("resumen de cliente", lambda db, m: venta_crud.get_resumen_cliente(db, m["cliente"])),
+        Consulta("pago por id", lambda db, m: pago_crud.get_pago(db, m["pago"])),
+        Consulta("pagos de venta", lambda db, m: pago_crud.get_pagos_venta(db, m["venta"])),
+        Consulta("conteo pagos de venta", lambda db, m: pago_crud.count_pagos(db, m["venta"])),
+        Consulta(
+            "pagos de cliente",
+            lambda db, m: pago_crud.get_pagos_planos(db, filtros={"cliente_id": m["cliente"]}),
+        ),
+        Consulta(
+            "totales de pagos (30 días)",
+            lambda db, m: pago_crud.get_totales(db, filtros={"fecha_inicio": m["desde"], "fecha_fin": m["hasta"]}),
+        ),
+        Consulta(
+            "totales de pagos de cliente",
+            lambda db, m: pago_crud.get_totales(db, filtros={"cliente_id": m["cliente"]}),
+        ),
+        Consulta(
+            "recalcular saldos",
+            lambda db, m: db.execute(pago_crud.sentencia_recalcular_saldos(m["ventas"])),
+        ),
+        Consulta("foto de ventas", lambda db, m: resumen_diario_crud.foto_ventas(db, m["ventas"])),
+        Consulta(
+            "resumen diario (30 días)",
+            lambda db, m: resumen_diario_crud.get_resumen_diario(db, m["desde"], m["hasta"]),
+        ),
+        Consulta(
+            "reporte de ventas (30 días)",
+            lambda db, m: consumir(reporte_service.generar_reporte_ventas(db, m["desde"], m["hasta"], formato="csv")),
+        ),
+        # Agrega las ventas a crédito por el índice cubriente; el recorrido
+        # del resultado agrupado (subconsulta) no cuenta
+        Consulta(
+            "antigüedad de saldos (1ra página)",
+            lambda db, m: antiguedad_crud.get_antiguedad(db, m["hasta"], limit=100),
+        ),
+        Consulta(
+            "antigüedad de saldos de cliente",
+            lambda db, m: antiguedad_crud.get_antiguedad(db, m["hasta"], cliente_id=m["cliente"]),
+        ),
+        Consulta(
+            "saldos de cliente",
+            lambda db, m: saldo_crud.get_saldos(db, {"cliente_id": m["cliente"]}),
+        ),
+        Consulta(
+            "totales de saldos de cliente",
+            lambda db, m: saldo_crud.get_totales(db, {"cliente_id": m["cliente"]}),
+        ),
+        Consulta(
+            "saldos (30 días)",
+            lambda db, m: saldo_crud.get_saldos(db, {"fecha_inicio": m["desde"], "fecha_fin": m["hasta"]}, "fecha_venta"),
+        ),
+        Consulta(
+            "reporte de cliente",
+            lambda db, m: consumir(reporte_service.generar_reporte_cliente(db, m["cliente"], formato="csv")),
+        ),
+    ]
+
+
+def sembrar(engine, ventas: int, azar: random.Random) -> None:
+    """
+    Inserta ventas sintéticas con sus clientes, productos, dos detalles por
+    venta y entre cero y dos pagos
+    """
+    from app.models.cliente import Cliente
+    from app.models.detalle_venta import DetalleVenta
+    from app.models.pago import Pago
+    from app.models.producto import Producto
+    from app.models.venta import Venta
+
+    clientes = max(ventas // 20, 10)
+    productos = 200
+    origen = datetime(2024, 1, 1)
+    filas: Dict[Any, List[Dict[str, Any]]] = {
+        Cliente: [
+            {"id_cliente": i, "nombre": f"Cliente {i}", "email": f"cliente{i}@ejemplo.com"}
+            for i in range(1, clientes + 1)
+        ],
+        Producto: [
+            {"id_producto": i, "nombre": f"Producto {i}", "precio_unitario": 10.0, "activo": True}
+            for i in range(1, productos + 1)
+        ],
+        Venta: [], DetalleVenta: [], Pago: [],
+    }
+    for id_venta in range(1, ventas + 1):
+        total = float(azar.randint(10, 500))
+        pagos = [total / 2] * azar.choice((0, 1, 2))
+        filas[Venta].append({
+            "id_venta": id_venta,
+            "id_cliente": azar.randint(1, clientes),
+            "fecha_venta": origen + timedelta(minutes=azar.randrange(2 * 365 * 24 * 60)),
+            "tipo_venta": azar.choice(("contado", "credito")),
+            "estado": "pagada" if len(pagos) == 2 else "pendiente",
+            "total": total,
+            "total_pagado": sum(pagos),
+            "saldo_pendiente": total - sum(pagos),
+        })
+        for _ in range(2):
+            filas[DetalleVenta].append({
+                "id_venta": id_venta, "id_producto": azar.randint(1, productos), "cantidad": 1,
+                "precio_unitario": total / 2, "subtotal": total / 2, "fecha_entrega": origen.date(),
+            })
+        for monto in pagos:
+            filas[Pago].append({"id_venta": id_venta, "monto": monto, "metodo_pago": "efectivo"})
+
+    with engine.begin() as conn:
+        for modelo, lote in filas.items():
+            for inicio in range(0, len(lote), 10000):
+                conn.execute(modelo.__table__.insert(), lote[inicio:inicio + 10000])
+
+
+def analizar(engine) -> None:
+    # Estadísticas al día: sin ellas el planificador no distingue un índice selectivo
+    from app.db.base import Base
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            for tabla in Base.metadata.sorted_tables:
+                conn.exec_driver_sql(f"ANALYZE TABLE {tabla.name}")
+        else:
+            conn.exec_driver_sql("ANALYZE")
+
+
+def muestra(db) -> Dict[str, Any]:
+    from sqlalchemy import func, select
+
+    from app.models.pago import Pago
+    from app.models.venta import Venta
+
+    # Un cliente y una venta típicos (con datos), no los extremos
+    cliente = db.scalar(
+        select(Venta.id_cliente).group_by(Venta.id_cliente).order_by(func.count().desc()).limit(1)
+    )
+    venta, pago = db.execute(select(Pago.id_venta, Pago.id_pago).order_by(Pago.id_pago).limit(1)).one()
+    ventas = db.scalars(select(Venta.id_venta).where(Venta.id_cliente == cliente)).all()
+    hasta = db.scalar(select(func.max(Venta.fecha_venta))).date()
+    return {
+        "cliente": cliente,
+        "venta": venta,
+        "pago": pago,
+        "ventas": list(ventas),
+        "desde": hasta - timedelta(days=29),
+        "hasta": hasta,
+    }
+
+
+@contextmanager
+def _capturar(engine):
+    from sqlalchemy import event
+
+    sentencias: List[Tuple[str, Any]] = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            sentencias.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+def _tabla(nombre: str, tablas: Set[str]) -> str:
+    # Los joinedload usan alias como clientes_1
+    if nombre not in tablas:
+        nombre = re.sub(r"_\d+$", "", nombre)
+    return nombre
+
+
+def escaneos_completos(conn, sentencia: str, parametros: Any, tablas: Set[str]) -> Set[str]:
+    """
+    Tablas que el plan de la sentencia recorre completas
+
+    SQLite: pasos SCAN (con o sin índice: recorrer un índice entero también
+    es lineal). MySQL: accesos de tipo ALL o index. PostgreSQL: Seq Scan.
+    Los recorridos sobre subconsultas (anon_1) no cuentan.
+    """
+    dialecto = conn.dialect.name
+    encontrados = set()
+    if dialecto == "sqlite":
+        for fila in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sentencia, parametros):
+            coincidencia = re.match(r"SCAN (\w+)", fila[-1])
+            if coincidencia:
+                encontrados.add(_tabla(coincidencia.group(1), tablas))
+    elif dialecto == "mysql":
+        for fila in conn.exec_driver_sql("EXPLAIN " + sentencia, parametros).mappings():
+            if fila["type"] in ("ALL", "index") and fila["table"]:
+                encontrados.add(_tabla(fila["table"], tablas))
+    else:
+        for (linea,) in conn.exec_driver_sql("EXPLAIN " + sentencia, parametros):
+            encontrados.update(re.findall(r"Seq Scan on (\w+)", linea))
+    return encontrados & tablas
+
+
+def revisar(db, consulta: Consulta, muestra: Dict[str, Any]) -> Tuple[int, List[Tuple[List[str], str]]]:
+    """
+    Ejecuta la consulta y devuelve cuántas sentencias emitió y, por cada una
+    con escaneos completos no permitidos, las tablas recorridas y la sentencia
+    """
+    from app.db.base import Base
+
+    engine = db.get_bind()
+    tablas = set(Base.metadata.tables)
+    with _capturar(engine) as sentencias:
+        consulta.ejecutar(db, muestra)
+    conn = db.connection()
+    problemas = []
+    for sentencia, parametros in sentencias:
+        escaneadas = escaneos_completos(conn, sentencia, parametros, tablas) - consulta.permitidos
+        if escaneadas:
+            problemas.append((sorted(escaneadas), sentencia))
+    return len(sentencias), problemas
+
+
+def _verificar(args) -> int:
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    sembrar(engine, args.ventas, random.Random(11))
+    with SessionLocal() as db:
+        from app.crud import resumen_diario_crud
+        resumen_diario_crud.reconstruir(db)
+    analizar(engine)
+
+    fallidas = 0
+    with SessionLocal() as db:
+        datos = muestra(db)
+        for consulta in consultas():
+            sentencias, problemas = revisar(db, consulta, datos)
+            estado = "ESCANEO COMPLETO" if problemas else "ok"
+            print(f"{consulta.nombre:>30}: {estado} ({sentencias} sentencias)")
+            for escaneadas, sentencia in problemas:
+                print(f"{'':>32}{', '.join(escaneadas)}")
+                if args.verbose:
+                    print(f"{'':>32}{' '.join(sentencia.split())}")
+            fallidas += bool(problemas)
+        # Algunas consultas del catálogo escriben (recalcular saldos): no se confirman
+        db.rollback()
+
+    if fallidas:
+        print(f"{fallidas} consultas con escaneos completos")
+        return 1
+    print("Todas las consultas usan índices")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="URL síncrona de la base (por defecto SQLite temporal)")
+    parser.add_argument("--ventas", type=int, default=20_000)
+    parser.add_argument("-v", "--verbose", action="store_true", help="muestra las sentencias con escaneos")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # La configuración se lee al importar app.core.config, antes de cargar la app
+        os.environ["SQLALCHEMY_DATABASE_URI"] = args.url or f"sqlite:///{os.path.join(directorio, 'planes.db')}"
+        return _verificar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
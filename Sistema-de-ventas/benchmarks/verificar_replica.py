@@ -0,0 +1,186 @@
+# benchmarks/verificar_replica.py
+"""
+Verifica el enrutamiento de lecturas a la réplica, la lectura de escrituras propias y el respaldo al primario
+
+Usa dos bases independientes (dos SQLite temporales por defecto, o dos MySQL
+con --primario y --replica) sin replicación entre ellas: el mismo cliente
+de prueba tiene un nombre distinto en cada una, así cada respuesta muestra
+de qué base se leyó. Comprueba que:
+
+- los GET de lectura van a la réplica y las escrituras al primario;
+- tras una escritura, ese cliente lee del primario durante REPLICA_LEER_PROPIAS
+  segundos y después vuelve a la réplica;
+- con la réplica inalcanzable, las lecturas responden desde el primario y
+  la réplica se reintenta sólo tras REPLICA_REINTENTO segundos.
+
+Cada fase corre en un proceso aparte, porque los engines se crean al importar
+la app. Sale con código 1 si alguna comprobación falla.
+
+Uso:
+    python -m benchmarks.verificar_replica [--async]
+    python -m benchmarks.verificar_replica --primario mysql://u:c@db1/ventas --replica mysql://u:c@db2/ventas
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional, Tuple
+
+NOMBRE_PRIMARIO = "Cliente en primario"
+NOMBRE_REPLICA = "Cliente en réplica"
+VENTANA = 1  # REPLICA_LEER_PROPIAS de la verificación, en segundos
+
+
+def _preparar(url: str, nombre: str, id_cliente: Optional[int] = None) -> int:
+    # Proceso aparte por base: el engine de la app se crea con la URL del entorno
+    codigo = (
+        "import json, sys\n"
+        "from sqlalchemy import create_engine, insert\n"
+        "from app.db.base import Base\n"
+        "from app.models.cliente import Cliente\n"
+        "engine = create_engine(sys.argv[1])\n"
+        "Base.metadata.create_all(bind=engine)\n"
+        "valores = {'nombre': sys.argv[2]}\n"
+        "if sys.argv[3] != '-':\n"
+        "    valores['id_cliente'] = int(sys.argv[3])\n"
+        "with engine.begin() as conn:\n"
+        "    r = conn.execute(insert(Cliente).values(**valores))\n"
+        "print(json.dumps(r.inserted_primary_key[0]))\n"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo, url, nombre, "-" if id_cliente is None else str(id_cliente)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def _fase_normal(cliente, id_cliente: int) -> List[Tuple[str, bool, str]]:
+    resultados = []
+
+    def comprobar(nombre: str, condicion: Callable[[], Tuple[bool, str]]) -> None:
+        resultados.append((nombre, *condicion()))
+
+    def leer() -> str:
+        respuesta = cliente.get(f"/api/clientes/{id_cliente}")
+        respuesta.raise_for_status()
+        return respuesta.json()["nombre"]
+
+    comprobar("GET lee de la réplica", lambda: (leer() == NOMBRE_REPLICA, leer()))
+    for url in ("/api/ventas/", "/api/pagos/", f"/api/clientes/{id_cliente}/resumen", "/api/reportes/resumen-diario"):
+        comprobar(f"GET {url} responde", lambda url=url: (cliente.get(url).status_code == 200, url))
+
+    creado = cliente.post("/api/clientes/", json={"nombre": "Nuevo en primario"})
+    comprobar("POST escribe en el primario y marca al cliente", lambda: (
+        creado.status_code == 200 and "leer_primario" in creado.headers.get("set-cookie", ""),
+        f"{creado.status_code} {creado.headers.get('set-cookie')}",
+    ))
+    comprobar("tras escribir lee del primario", lambda: (leer() == NOMBRE_PRIMARIO, leer()))
+    nuevo = creado.json().get("id_cliente")
+    comprobar("tras escribir ve su propia escritura", lambda: (
+        cliente.get(f"/api/clientes/{nuevo}").status_code == 200, str(nuevo)
+    ))
+
+    time.sleep(VENTANA + 0.2)
+    comprobar(f"pasados {VENTANA} s vuelve a la réplica", lambda: (leer() == NOMBRE_REPLICA, leer()))
+
+    lecturas = cliente.get("/api/_internal/pool").json()["replica"]["lecturas"]
+    comprobar("sin fallos de la réplica", lambda: (lecturas["fallos"] == 0, json.dumps(lecturas)))
+    return resultados
+
+
+def _fase_caida(cliente, id_cliente: int) -> List[Tuple[str, bool, str]]:
+    resultados = []
+    nombres = []
+    for _ in range(5):
+        respuesta = cliente.get(f"/api/clientes/{id_cliente}")
+        nombres.append(respuesta.json().get("nombre") if respuesta.status_code == 200 else respuesta.status_code)
+    resultados.append((
+        "réplica caída: lee del primario", all(n == NOMBRE_PRIMARIO for n in nombres), str(nombres[0])
+    ))
+    listado = cliente.get("/api/ventas/")
+    resultados.append(("réplica caída: listados responden", listado.status_code == 200, str(listado.status_code)))
+
+    lecturas = cliente.get("/api/_internal/pool").json()["replica"]["lecturas"]
+    resultados.append((
+        "réplica caída: un solo intento hasta el reintento",
+        lecturas["fallos"] == 1 and not lecturas["disponible"],
+        json.dumps(lecturas),
+    ))
+    return resultados
+
+
+def _hijo(fase: str, id_cliente: int) -> None:
+    # Proceso hijo: la configuración ya viene en el entorno
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        resultados = (_fase_normal if fase == "normal" else _fase_caida)(cliente, id_cliente)
+    print(json.dumps(resultados))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--primario", help="URL síncrona del primario (por defecto SQLite temporal)")
+    parser.add_argument("--replica", help="URL síncrona de la réplica (por defecto SQLite temporal)")
+    parser.add_argument("--async", dest="asincrono", action="store_true", help="rutas y crud asíncronos (DB_ASYNC)")
+    parser.add_argument("--hijo", choices=("normal", "caida"), help=argparse.SUPPRESS)
+    parser.add_argument("--cliente", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo:
+        _hijo(args.hijo, args.cliente)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directorio:
+        primario = args.primario or f"sqlite:///{os.path.join(directorio, 'primario.db')}"
+        replica = args.replica or f"sqlite:///{os.path.join(directorio, 'replica.db')}"
+        id_cliente = _preparar(primario, NOMBRE_PRIMARIO)
+        _preparar(replica, NOMBRE_REPLICA, id_cliente)
+
+        entorno = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URI=primario,
+            DB_ASYNC="1" if args.asincrono else "0",
+            # Las tablas las crea _preparar: las bases no tienen revisión de Alembic
+            DB_ESQUEMA="nada",
+            REPLICA_LEER_PROPIAS=str(VENTANA),
+            REPORTES_CACHE="0",
+            # Sin trabajo de fondo al arrancar
+            ANALITICA="0",
+            BUSQUEDA_INDICE="0",
+            ANALITICA_DIR=os.path.join(directorio, "analitica"),
+        )
+        fases = {
+            "normal": replica,
+            # Directorio inexistente: la conexión falla como con un servidor caído
+            "caida": f"sqlite:///{os.path.join(directorio, 'no-existe', 'replica.db')}",
+        }
+        resultados = []
+        for fase, url_replica in fases.items():
+            salida = subprocess.run(
+                [sys.executable, "-m", "benchmarks.verificar_replica", "--hijo", fase, "--cliente", str(id_cliente)],
+                env={**entorno, "SQLALCHEMY_REPLICA_URI": url_replica},
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            resultados.extend(json.loads(salida.strip().splitlines()[-1]))
+
+    fallidos = 0
+    for nombre, correcto, detalle in resultados:
+        fallidos += not correcto
+        print(f"{nombre:>52}  {'ok' if correcto else 'FALLA: ' + detalle}")
+    if fallidos:
+        print(f"{fallidos} comprobaciones fallidas")
+        return 1
+    print("Réplica, lectura de escrituras propias y respaldo al primario verificados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# tests/conftest.py
+"""
+Base SQLite temporal compartida por todas las pruebas
+
+La configuración se lee al importar app.core.config, así que el entorno se
+fija aquí, antes de que cualquier prueba importe la app. DB_ASYNC se respeta
+si ya viene del entorno: DB_ASYNC=1 pytest prueba las rutas asíncronas.
+"""
+import os
+import tempfile
+
+import pytest
+
+# Ventas sembradas: suficientes para que los planes elijan índices
+VENTAS = 5_000
+
+_directorio = tempfile.TemporaryDirectory()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_directorio.name, 'pruebas.db')}"
+os.environ.setdefault("DB_ASYNC", "0")
+# Las tablas las crea la fixture: la base no tiene revisión de Alembic
+os.environ["DB_ESQUEMA"] = "nada"
+os.environ["CONSULTAS_CONTAR"] = "1"
+os.environ["ANALITICA"] = "0"
+os.environ["ANALITICA_DIR"] = os.path.join(_directorio.name, "analitica")
+os.environ["REPORTES_CACHE_DIR"] = os.path.join(_directorio.name, "cache")
+os.environ["REPORTES_JOBS_DIR"] = os.path.join(_directorio.name, "trabajos")
+
+
+@pytest.fixture(scope="session")
+def base():
+    """
+    Crea y siembra la base una sola vez; devuelve la muestra de
+    benchmarks.verificar_consultas.preparar (clientes, ventas y pago de referencia)
+    """
+    from app.crud import resumen_diario_crud
+    from app.db.session import SessionLocal
+    from benchmarks.verificar_consultas import preparar
+
+    muestra = preparar(VENTAS)
+    # La siembra escribe directo en las tablas: el resumen diario se arma después
+    with SessionLocal() as db:
+        resumen_diario_crud.reconstruir(db)
+    yield muestra
+    _directorio.cleanup()
+
+
+@pytest.fixture(scope="session")
+def cliente(base):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        yield cliente
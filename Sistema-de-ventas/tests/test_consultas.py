@@ -0,0 +1,13 @@
+# tests/test_consultas.py
+"""
+Sentencias SQL por endpoint: acotadas y sin N+1 (ver benchmarks/verificar_consultas)
+"""
+import pytest
+
+from benchmarks.verificar_consultas import casos, medir, problema
+
+
+@pytest.mark.parametrize("caso", casos(), ids=lambda caso: caso.nombre)
+def test_sentencias_por_endpoint(cliente, base, caso):
+    conteos = medir(cliente, base, caso)
+    assert not problema(conteos), f"{conteos}: {problema(conteos)}"
@@ -0,0 +1,26 @@
+# tests/test_planes.py
+"""
+Las consultas calientes del crud usan índices (ver benchmarks/verificar_planes)
+"""
+import pytest
+
+from benchmarks.verificar_planes import analizar, consultas, muestra, revisar
+
+
+@pytest.fixture(scope="module")
+def db(base):
+    from app.db.session import SessionLocal, engine
+
+    analizar(engine)
+    with SessionLocal() as db:
+        yield db
+
+
+@pytest.mark.parametrize("consulta", consultas(), ids=lambda consulta: consulta.nombre)
+def test_consulta_usa_indices(db, consulta):
+    try:
+        _, problemas = revisar(db, consulta, muestra(db))
+    finally:
+        # Algunas consultas del catálogo escriben (recalcular saldos): no se confirman
+        db.rollback()
+    assert not problemas, problemas
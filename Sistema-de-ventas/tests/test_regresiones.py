@@ -0,0 +1,13 @@
+# tests/test_regresiones.py
+"""
+Comportamientos que ya se rompieron alguna vez (ver benchmarks/verificar_regresiones)
+"""
+import pytest
+
+from benchmarks.verificar_regresiones import comprobaciones
+
+
+@pytest.mark.parametrize("comprobacion", comprobaciones(), ids=lambda comprobacion: comprobacion.nombre)
+def test_regresion(cliente, comprobacion):
+    correcto, detalle = comprobacion.correr(cliente)
+    assert correcto, detalle
@@ -1,10 +1,26 @@
 import React, { useEffect, useState } from 'react';
-import { crearPago, obtenerPagos, eliminarPago } from '../services/pagoService';
-import { obtenerVentas } from '../services/ventaService';
+import { crearPago, obtenerPagos, obtenerTotalesPagos, eliminarPago } from '../services/pagoService';
+import { obtenerAntiguedad, obtenerSaldos } from '../services/reporteService';
+
+const PAGOS_POR_PAGINA = 50;
+const VENTAS_POR_PAGINA = 20;
+const CLIENTES_POR_PAGINA = 20;
+
+const haceDias = (dias) => {
+  const fecha = new Date();
+  fecha.setDate(fecha.getDate() - dias);
+  return fecha.toISOString().slice(0, 10);
+};
 
 export default function Pagos() {
   const [pagos, setPagos] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [totales, setTotales] = useState(null);
   const [ventas, setVentas] = useState([]);
+  const [cursorVentas, setCursorVentas] = useState(null);
+  const [busquedaVenta, setBusquedaVenta] = useState('');
+  const [saldosClientes, setSaldosClientes] = useState([]);
+  const [cursorClientes, setCursorClientes] = useState(null);
   const [formulario, setFormulario] = useState({
     id_venta: '',
     monto: '',
@@ -12,16 +28,83 @@ export default function Pagos() {
     observaciones: '',
     fecha_pago: ''
   });
-  const [filtro, setFiltro] = useState({ nombre: '', fecha: '' });
+  // Por defecto los últimos 30 días: la carga no crece con el historial
+  const [filtro, setFiltro] = useState({
+    nombre: '',
+    fecha_inicio: haceDias(30),
+    fecha_fin: '',
+    metodo_pago: '',
+    monto_minimo: '',
+    monto_maximo: ''
+  });
+
+  // Sólo se envían los filtros con valor; el servidor filtra y agrega
+  const paramsFiltro = () => {
+    const params = {};
+    Object.entries(filtro).forEach(([clave, valor]) => {
+      if (valor !== '') params[clave] = valor;
+    });
+    return params;
+  };
+
+  const buscarPagos = async () => {
+    const params = paramsFiltro();
+    const [pagina, totalesData] = await Promise.all([
+      obtenerPagos({ ...params, limit: PAGOS_POR_PAGINA, descendente: true }),
+      obtenerTotalesPagos(params)
+    ]);
+    setPagos(pagina.pagos);
+    setCursor(pagina.cursor);
+    setTotales(totalesData);
+  };
+
+  const cargarMas = async () => {
+    const pagina = await obtenerPagos({
+      ...paramsFiltro(),
+      limit: PAGOS_POR_PAGINA,
+      descendente: true,
+      cursor
+    });
+    setPagos([...pagos, ...pagina.pagos]);
+    setCursor(pagina.cursor);
+  };
+
+  // Ventas con saldo para registrar pagos: el servidor busca por cliente y pagina
+  const paramsVentas = (cursor) => {
+    const params = { estado_pago: 'Pendiente', orden: 'id_venta', descendente: true, limit: VENTAS_POR_PAGINA };
+    if (busquedaVenta !== '') params.nombre = busquedaVenta;
+    if (cursor) params.cursor = cursor;
+    return params;
+  };
+
+  const buscarVentas = async () => {
+    const pagina = await obtenerSaldos(paramsVentas());
+    setVentas(pagina.items);
+    setCursorVentas(pagina.siguiente_cursor);
+  };
+
+  const cargarMasVentas = async () => {
+    const pagina = await obtenerSaldos(paramsVentas(cursorVentas));
+    setVentas([...ventas, ...pagina.items]);
+    setCursorVentas(pagina.siguiente_cursor);
+  };
+
+  // Saldos por cliente ya calculados en el servidor, por páginas
+  const buscarSaldosClientes = async () => {
+    const pagina = await obtenerAntiguedad({ limit: CLIENTES_POR_PAGINA });
+    setSaldosClientes(pagina.clientes);
+    setCursorClientes(pagina.cursor);
+  };
+
+  const cargarMasClientes = async () => {
+    const pagina = await obtenerAntiguedad({ limit: CLIENTES_POR_PAGINA, cursor: cursorClientes });
+    setSaldosClientes([...saldosClientes, ...pagina.clientes]);
+    setCursorClientes(pagina.cursor);
+  };
 
   const cargarDatos = async () => {
     try {
-      const [pagosData, ventasData] = await Promise.all([
-        obtenerPagos(),
-        obtenerVentas()
-      ]);
-      setPagos(pagosData);
-      setVentas(ventasData);
+      await Promise.all([buscarVentas(), buscarSaldosClientes(), buscarPagos()]);
     } catch (error) {
       console.error("Error al cargar datos", error);
     }
@@ -44,11 +127,7 @@ export default function Pagos() {
     const venta = ventas.find(v => v.id_venta == formulario.id_venta);
     if (!venta) return alert("Venta no encontrada");
 
-    const pagosCliente = pagos.filter(p => p.id_venta === venta.id_venta);
-    const totalPagado = pagosCliente.reduce((sum, p) => sum + p.monto, 0);
-    const saldoPendiente = venta.total - totalPagado;
-
-    if (saldoPendiente <= 0) {
+    if (venta.saldo_pendiente <= 0) {
       return alert("Este cliente no tiene saldo pendiente para esta venta.");
     }
 
@@ -84,33 +163,37 @@ export default function Pagos() {
     }
   };
 
-  const pagosFiltrados = pagos.filter((p) => {
-    const cliente = p.venta?.cliente;
-    const coincideNombre = cliente?.nombre
-      ?.toLowerCase()
-      .includes(filtro.nombre.toLowerCase());
-    const coincideFecha = filtro.fecha
-      ? new Date(p.fecha_pago).toISOString().startsWith(filtro.fecha)
-      : true;
-    return coincideNombre && coincideFecha;
-  });
-
-  const saldosPorCliente = {};
-  ventas.forEach((venta) => {
-    const cliente = venta.cliente;
-    if (!cliente) return;
-    const key = `${cliente.nombre} (${cliente.telefono || 'Sin teléfono'})`;
-    const pagosCliente = pagos.filter(p => p.id_venta === venta.id_venta);
-    const pagado = pagosCliente.reduce((s, p) => s + p.monto, 0);
-    const saldo = (saldosPorCliente[key] || 0) + (venta.total - pagado);
-    saldosPorCliente[key] = saldo;
-  });
-
   return (
     <div className="max-w-5xl mx-auto p-4">
       <h2 className="text-2xl font-bold mb-4 text-center">Registro de Pagos</h2>
 
       <form onSubmit={handleSubmit} className="bg-white p-4 rounded-xl shadow space-y-4 border">
+        <div className="flex gap-2">
+          <input
+            type="text"
+            placeholder="Buscar ventas pendientes por cliente"
+            className="flex-1 border rounded-lg px-3 py-2"
+            value={busquedaVenta}
+            onChange={(e) => setBusquedaVenta(e.target.value)}
+          />
+          <button
+            type="button"
+            onClick={buscarVentas}
+            className="bg-blue-600 text-white px-4 py-2 rounded-lg hover:bg-blue-700"
+          >
+            Buscar
+          </button>
+          {cursorVentas && (
+            <button
+              type="button"
+              onClick={cargarMasVentas}
+              className="bg-gray-200 px-4 py-2 rounded-lg hover:bg-gray-300"
+            >
+              Más ventas
+            </button>
+          )}
+        </div>
+
         <select
           name="id_venta"
           value={formulario.id_venta}
@@ -121,7 +204,7 @@ export default function Pagos() {
           <option value="">Seleccione cliente</option>
           {ventas.map((v) => (
             <option key={v.id_venta} value={v.id_venta}>
-              {`${v.cliente?.nombre || 'Sin nombre'} - ${v.cliente?.telefono || 'Sin teléfono'} - ${v.cliente?.direccion || 'Sin dirección'}`}
+              {`${v.nombre_cliente} - Venta #${v.id_venta} - Saldo $${v.saldo_pendiente.toFixed(2)}`}
             </option>
           ))}
         </select>
@@ -172,31 +255,99 @@ export default function Pagos() {
         </button>
       </form>
 
-      <div className="flex gap-4 mt-6 mb-4">
+      <div className="grid md:grid-cols-3 gap-4 mt-6 mb-4">
         <input
           type="text"
           placeholder="Buscar por cliente"
-          className="border px-3 py-2 rounded w-full"
+          className="border px-3 py-2 rounded"
           value={filtro.nombre}
           onChange={(e) => setFiltro({ ...filtro, nombre: e.target.value })}
         />
         <input
           type="date"
           className="border px-3 py-2 rounded"
-          value={filtro.fecha}
-          onChange={(e) => setFiltro({ ...filtro, fecha: e.target.value })}
+          value={filtro.fecha_inicio}
+          onChange={(e) => setFiltro({ ...filtro, fecha_inicio: e.target.value })}
+        />
+        <input
+          type="date"
+          className="border px-3 py-2 rounded"
+          value={filtro.fecha_fin}
+          onChange={(e) => setFiltro({ ...filtro, fecha_fin: e.target.value })}
+        />
+        <input
+          type="text"
+          placeholder="Método de pago"
+          className="border px-3 py-2 rounded"
+          value={filtro.metodo_pago}
+          onChange={(e) => setFiltro({ ...filtro, metodo_pago: e.target.value })}
+        />
+        <input
+          type="number"
+          placeholder="Monto mínimo"
+          className="border px-3 py-2 rounded"
+          value={filtro.monto_minimo}
+          onChange={(e) => setFiltro({ ...filtro, monto_minimo: e.target.value })}
+        />
+        <input
+          type="number"
+          placeholder="Monto máximo"
+          className="border px-3 py-2 rounded"
+          value={filtro.monto_maximo}
+          onChange={(e) => setFiltro({ ...filtro, monto_maximo: e.target.value })}
         />
       </div>
+      <button
+        onClick={buscarPagos}
+        className="mb-4 bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700"
+      >
+        Buscar
+      </button>
+
+      {totales && (
+        <div className="mb-6 bg-gray-100 p-4 rounded grid md:grid-cols-2 gap-4">
+          <div>
+            <h3 className="font-semibold mb-2">
+              {totales.cantidad} pagos por ${totales.total.toFixed(2)}
+            </h3>
+            <ul className="list-disc pl-6">
+              {totales.por_metodo.map((m) => (
+                <li key={m.metodo_pago || 'sin-metodo'}>
+                  {m.metodo_pago || 'Sin método'}: {m.cantidad} pagos, ${m.total.toFixed(2)}
+                </li>
+              ))}
+            </ul>
+          </div>
+          <div>
+            <h3 className="font-semibold mb-2">Por mes</h3>
+            <ul className="list-disc pl-6">
+              {totales.por_periodo.map((p) => (
+                <li key={p.periodo}>
+                  {p.periodo}: {p.cantidad} pagos, ${p.total.toFixed(2)}
+                </li>
+              ))}
+            </ul>
+          </div>
+        </div>
+      )}
 
       <div className="mb-6 bg-gray-100 p-4 rounded">
-        <h3 className="font-semibold mb-2">Saldos pendientes por cliente</h3>
+        <h3 className="font-semibold mb-2">Saldos pendientes por cliente (crédito)</h3>
         <ul className="list-disc pl-6">
-          {Object.entries(saldosPorCliente).map(([cliente, saldo]) => (
-            <li key={cliente}>
-              {cliente}: ${saldo.toFixed(2)}
+          {saldosClientes.map((c) => (
+            <li key={c.id_cliente}>
+              {c.nombre}: ${c.saldo_total.toFixed(2)}
             </li>
           ))}
         </ul>
+        {cursorClientes && (
+          <button
+            onClick={cargarMasClientes}
+            className="mt-3 bg-gray-200 px-4 py-2 rounded hover:bg-gray-300"
+          >
+            Cargar más
+          </button>
+        )}
       </div>
 
       <div>
@@ -214,7 +365,7 @@ export default function Pagos() {
               </tr>
             </thead>
             <tbody>
-              {pagosFiltrados.map((p) => (
+              {pagos.map((p) => (
                 <tr key={p.id_pago} className="border-t hover:bg-gray-50">
                   <td className="py-2 px-4">{p.id_pago}</td>
                   <td className="py-2 px-4">{p.venta?.cliente?.nombre || 'Desconocido'}</td>
@@ -237,6 +388,14 @@ export default function Pagos() {
             </tbody>
           </table>
         </div>
+        {cursor && (
+          <button
+            onClick={cargarMas}
+            className="mt-3 bg-gray-200 px-4 py-2 rounded hover:bg-gray-300"
+          >
+            Cargar más
+          </button>
+        )}
       </div>
     </div>
   );
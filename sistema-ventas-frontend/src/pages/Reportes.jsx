@@ -5,6 +5,16 @@ import { getClientes } from '../services/clienteService';
 export default function Reportes() {
   const [clientes, setClientes] = useState([]);
   const [saldos, setSaldos] = useState([]);
+  const [totalesSaldos, setTotalesSaldos] = useState(null);
+  const [cursorSaldos, setCursorSaldos] = useState(null);
+  const [filtrosSaldos, setFiltrosSaldos] = useState({
+    nombre: '',
+    tipo_venta: '',
+    estado_pago: 'Pendiente',
+    fecha_inicio: '',
+    fecha_fin: '',
+    saldo_minimo: ''
+  });
   const [filtros, setFiltros] = useState({
     fecha_inicio: '',
     fecha_fin: '',
@@ -13,9 +23,32 @@ export default function Reportes() {
   });
   const [idCliente, setIdCliente] = useState('');
 
+  // Sólo se envían los filtros con valor; el servidor filtra y pagina
+  const paramsSaldos = (cursor) => {
+    const params = { orden: 'saldo_pendiente', descendente: true, limit: 50 };
+    Object.entries(filtrosSaldos).forEach(([clave, valor]) => {
+      if (valor !== '') params[clave] = valor;
+    });
+    if (cursor) params.cursor = cursor;
+    return params;
+  };
+
+  const buscarSaldos = async () => {
+    const pagina = await obtenerSaldos(paramsSaldos());
+    setSaldos(pagina.items);
+    setTotalesSaldos(pagina.totales);
+    setCursorSaldos(pagina.siguiente_cursor);
+  };
+
+  const cargarMasSaldos = async () => {
+    const pagina = await obtenerSaldos(paramsSaldos(cursorSaldos));
+    setSaldos([...saldos, ...pagina.items]);
+    setCursorSaldos(pagina.siguiente_cursor);
+  };
+
   useEffect(() => {
     getClientes().then(setClientes);
-    obtenerSaldos().then(setSaldos);
+    buscarSaldos();
   }, []);
 
   const handleReporteVentas = async () => {
@@ -115,6 +148,59 @@ export default function Reportes() {
       {/* Vista de Saldos */}
       <div className="bg-white p-4 shadow rounded-xl border">
         <h3 className="text-lg font-semibold mb-2">Saldos Pendientes</h3>
+        <div className="grid md:grid-cols-3 gap-3 mb-3">
+          <input
+            type="text"
+            value={filtrosSaldos.nombre}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, nombre: e.target.value })}
+            className="border rounded px-3 py-2"
+            placeholder="Cliente"
+          />
+          <select
+            value={filtrosSaldos.tipo_venta}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, tipo_venta: e.target.value })}
+            className="border rounded px-3 py-2"
+          >
+            <option value="">Tipo de venta</option>
+            <option value="contado">Contado</option>
+            <option value="credito">Crédito</option>
+          </select>
+          <select
+            value={filtrosSaldos.estado_pago}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, estado_pago: e.target.value })}
+            className="border rounded px-3 py-2"
+          >
+            <option value="">Estado de pago</option>
+            <option value="Pendiente">Pendiente</option>
+            <option value="Pagado">Pagado</option>
+          </select>
+          <input
+            type="date"
+            value={filtrosSaldos.fecha_inicio}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, fecha_inicio: e.target.value })}
+            className="border rounded px-3 py-2"
+          />
+          <input
+            type="date"
+            value={filtrosSaldos.fecha_fin}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, fecha_fin: e.target.value })}
+            className="border rounded px-3 py-2"
+          />
+          <input
+            type="number"
+            min="0"
+            value={filtrosSaldos.saldo_minimo}
+            onChange={(e) => setFiltrosSaldos({ ...filtrosSaldos, saldo_minimo: e.target.value })}
+            className="border rounded px-3 py-2"
+            placeholder="Saldo mínimo"
+          />
+        </div>
+        <button
+          onClick={buscarSaldos}
+          className="mb-3 bg-blue-600 text-white px-4 py-2 rounded hover:bg-blue-700"
+        >
+          Buscar
+        </button>
         <div className="overflow-x-auto">
           <table className="min-w-full text-sm">
             <thead className="bg-gray-100">
@@ -141,8 +227,27 @@ export default function Reportes() {
                 </tr>
               ))}
             </tbody>
+            {totalesSaldos && (
+              <tfoot className="bg-gray-100 font-semibold">
+                <tr className="border-t">
+                  <td className="px-4 py-2" colSpan={3}>{totalesSaldos.ventas} ventas</td>
+                  <td className="px-4 py-2">${totalesSaldos.total_venta.toFixed(2)}</td>
+                  <td className="px-4 py-2">${totalesSaldos.total_pagado.toFixed(2)}</td>
+                  <td className="px-4 py-2">${totalesSaldos.saldo_pendiente.toFixed(2)}</td>
+                  <td className="px-4 py-2"></td>
+                </tr>
+              </tfoot>
+            )}
           </table>
         </div>
+        {cursorSaldos && (
+          <button
+            onClick={cargarMasSaldos}
+            className="mt-3 bg-gray-200 px-4 py-2 rounded hover:bg-gray-300"
+          >
+            Cargar más
+          </button>
+        )}
       </div>
     </div>
   );
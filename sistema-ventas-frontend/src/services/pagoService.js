@@ -1,7 +1,14 @@
 import api from './api';
 
-export const obtenerPagos = async () => {
-  const res = await api.get('/api/pagos/');
+// Una página de pagos filtrada en el servidor y el cursor de la siguiente
+export const obtenerPagos = async (params = {}) => {
+  const res = await api.get('/api/pagos/', { params });
+  return { pagos: res.data, cursor: res.headers['x-next-cursor'] || null };
+};
+
+// Cantidad y monto de los pagos filtrados: total, por método y por período
+export const obtenerTotalesPagos = async (params = {}) => {
+  const res = await api.get('/api/pagos/totales', { params });
   return res.data;
 };
 
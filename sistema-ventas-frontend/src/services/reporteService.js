@@ -1,7 +1,7 @@
 import api from './api';
 
 export const descargarReporteVentas = async (params) => {
-  const response = await api.get('/reportes/ventas', {
+  const response = await api.get('/api/reportes/ventas', {
     params,
     responseType: 'blob'
   });
@@ -9,13 +9,22 @@ export const descargarReporteVentas = async (params) => {
 };
 
 export const descargarReporteCliente = async (clienteId) => {
-  const response = await api.get(`/reportes/cliente/${clienteId}`, {
+  const response = await api.get(`/api/reportes/cliente/${clienteId}`, {
     responseType: 'blob'
   });
   return response.data;
 };
 
-export const obtenerSaldos = async () => {
-  const response = await api.get('/reportes/saldos');
+// Una página de saldos filtrada y ordenada en el servidor:
+// { items, totales (sólo en la primera página), siguiente_cursor }
+export const obtenerSaldos = async (params = {}) => {
+  const response = await api.get('/api/reportes/saldos', { params });
   return response.data;
 };
+
+// Saldo pendiente de ventas a crédito por cliente (antigüedad de saldos):
+// una página y el cursor de la siguiente
+export const obtenerAntiguedad = async (params = {}) => {
+  const response = await api.get('/api/reportes/antiguedad', { params });
+  return { clientes: response.data, cursor: response.headers['x-next-cursor'] || null };
+};